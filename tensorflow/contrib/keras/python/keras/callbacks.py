@@ -28,6 +28,7 @@ import time
 import warnings
 
 import numpy as np
+import six
 
 from tensorflow.contrib.keras.python.keras import backend as K
 from tensorflow.contrib.keras.python.keras.utils.generic_utils import Progbar
@@ -45,22 +46,66 @@ except ImportError:
 # pylint: enable=g-import-not-at-top
 
 
+_HOOKS = ('on_epoch_begin', 'on_epoch_end', 'on_batch_begin', 'on_batch_end',
+          'on_train_begin', 'on_train_end')
+
+
+def _implements_hook(callback, hook):
+  """Returns whether `callback` does anything in the method named `hook`.
+
+  A `Callback` declares the hooks it implements by overriding them, either in
+  its class or by setting them as instance attributes. Hooks inherited from
+  `Callback` itself are no-ops.
+
+  Arguments:
+      callback: The callback to inspect.
+      hook: Name of a `Callback` method, e.g. `'on_batch_end'`.
+
+  Returns:
+      False if calling the hook is known to be a no-op, True otherwise.
+  """
+  if not isinstance(callback, Callback) or hook in vars(callback):
+    return True
+  method = getattr(type(callback), hook)
+  return (six.get_unbound_function(method) is not
+          six.get_unbound_function(getattr(Callback, hook)))
+
+
 class CallbackList(object):
   """Container abstracting a list of callbacks.
 
+  Hooks that a callback does not override are skipped, so callbacks that only
+  act at the end of an epoch add no overhead to each batch.
+
   Arguments:
       callbacks: List of `Callback` instances.
       queue_length: Queue length for keeping
           running statistics over callback execution time.
+      timing_interval: The batch hooks are timed every `timing_interval`
+          batches, to warn about callbacks that are slow compared to the batch
+          update.
+      profile: Whether to record the time spent in each hook of each callback.
+          The result is available from `profile_report()`.
   """
 
-  def __init__(self, callbacks=None, queue_length=10):
+  def __init__(self, callbacks=None, queue_length=10, timing_interval=10,
+               profile=False):
     callbacks = callbacks or []
     self.callbacks = [c for c in callbacks]
     self.queue_length = queue_length
+    self.timing_interval = max(1, timing_interval)
+    self.profile = profile
+    # Maps (callback index, hook) to [number of calls, total seconds].
+    self.profile_stats = OrderedDict()
+    self._hook_methods = None
+    self._delta_t_batch = 0.
+    self._delta_ts_batch_begin = deque([], maxlen=self.queue_length)
+    self._delta_ts_batch_end = deque([], maxlen=self.queue_length)
+    self._timed_batch = False
 
   def append(self, callback):
     self.callbacks.append(callback)
+    self._hook_methods = None
 
   def set_params(self, params):
     for callback in self.callbacks:
@@ -70,6 +115,53 @@ class CallbackList(object):
     for callback in self.callbacks:
       callback.set_model(model)
 
+  def _get_hook_methods(self, hook):
+    """Returns the bound methods to call for `hook`, in callback order."""
+    if self._hook_methods is None:
+      self._hook_methods = {}
+      for h in _HOOKS:
+        methods = [(i, getattr(callback, h))
+                   for i, callback in enumerate(self.callbacks)
+                   if _implements_hook(callback, h)]
+        if self.profile:
+          methods = [(i, self._profiled(i, h, method))
+                     for i, method in methods]
+        self._hook_methods[h] = [method for _, method in methods]
+    return self._hook_methods[hook]
+
+  def _profiled(self, index, hook, method):
+    """Wraps `method` to accumulate its running time in `profile_stats`."""
+    stats = self.profile_stats.setdefault((index, hook), [0, 0.])
+
+    def wrapper(*args):
+      start = time.time()
+      try:
+        return method(*args)
+      finally:
+        stats[0] += 1
+        stats[1] += time.time() - start
+
+    return wrapper
+
+  def profile_report(self):
+    """Returns a summary of the time spent in each callback hook.
+
+    Only available if the `CallbackList` was created with `profile=True`.
+
+    Returns:
+        A string with one line per callback hook that was called, sorted by
+        decreasing total time.
+    """
+    lines = ['%-40s %-16s %10s %12s %12s' % ('Callback', 'Hook', 'Calls',
+                                            'Total (s)', 'Mean (ms)')]
+    stats = sorted(self.profile_stats.items(), key=lambda kv: -kv[1][1])
+    for (index, hook), (num_calls, total) in stats:
+      name = '%d: %s' % (index, type(self.callbacks[index]).__name__)
+      mean = 1000. * total / num_calls if num_calls else 0.
+      lines.append('%-40s %-16s %10d %12.4f %12.4f' % (name, hook, num_calls,
+                                                       total, mean))
+    return '\n'.join(lines)
+
   def on_epoch_begin(self, epoch, logs=None):
     """Called at the start of an epoch.
 
@@ -78,8 +170,8 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
-    for callback in self.callbacks:
-      callback.on_epoch_begin(epoch, logs)
+    for method in self._get_hook_methods('on_epoch_begin'):
+      method(epoch, logs)
     self._delta_t_batch = 0.
     self._delta_ts_batch_begin = deque([], maxlen=self.queue_length)
     self._delta_ts_batch_end = deque([], maxlen=self.queue_length)
@@ -92,8 +184,8 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
-    for callback in self.callbacks:
-      callback.on_epoch_end(epoch, logs)
+    for method in self._get_hook_methods('on_epoch_end'):
+      method(epoch, logs)
 
   def on_batch_begin(self, batch, logs=None):
     """Called right before processing a batch.
@@ -103,9 +195,15 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
+    methods = self._get_hook_methods('on_batch_begin')
+    self._timed_batch = batch % self.timing_interval == 0
+    if not self._timed_batch:
+      for method in methods:
+        method(batch, logs)
+      return
     t_before_callbacks = time.time()
-    for callback in self.callbacks:
-      callback.on_batch_begin(batch, logs)
+    for method in methods:
+      method(batch, logs)
     self._delta_ts_batch_begin.append(time.time() - t_before_callbacks)
     delta_t_median = np.median(self._delta_ts_batch_begin)
     if (self._delta_t_batch > 0. and
@@ -123,12 +221,18 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
+    methods = self._get_hook_methods('on_batch_end')
+    if not self._timed_batch:
+      for method in methods:
+        method(batch, logs)
+      return
+    self._timed_batch = False
     if not hasattr(self, '_t_enter_batch'):
       self._t_enter_batch = time.time()
     self._delta_t_batch = time.time() - self._t_enter_batch
     t_before_callbacks = time.time()
-    for callback in self.callbacks:
-      callback.on_batch_end(batch, logs)
+    for method in methods:
+      method(batch, logs)
     self._delta_ts_batch_end.append(time.time() - t_before_callbacks)
     delta_t_median = np.median(self._delta_ts_batch_end)
     if (self._delta_t_batch > 0. and
@@ -144,8 +248,8 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
-    for callback in self.callbacks:
-      callback.on_train_begin(logs)
+    for method in self._get_hook_methods('on_train_begin'):
+      method(logs)
 
   def on_train_end(self, logs=None):
     """Called at the end of training.
@@ -154,8 +258,8 @@ class CallbackList(object):
         logs: dictionary of logs.
     """
     logs = logs or {}
-    for callback in self.callbacks:
-      callback.on_train_end(logs)
+    for method in self._get_hook_methods('on_train_end'):
+      method(logs)
 
   def __iter__(self):
     return iter(self.callbacks)
@@ -987,27 +1091,17 @@ class LambdaCallback(Callback):
                **kwargs):
     super(LambdaCallback, self).__init__()
     self.__dict__.update(kwargs)
+    # Hooks that are not given fall back to the no-op methods of `Callback`,
+    # which `CallbackList` does not call.
     if on_epoch_begin is not None:
       self.on_epoch_begin = on_epoch_begin
-    else:
-      self.on_epoch_begin = lambda epoch, logs: None
     if on_epoch_end is not None:
       self.on_epoch_end = on_epoch_end
-    else:
-      self.on_epoch_end = lambda epoch, logs: None
     if on_batch_begin is not None:
       self.on_batch_begin = on_batch_begin
-    else:
-      self.on_batch_begin = lambda batch, logs: None
     if on_batch_end is not None:
       self.on_batch_end = on_batch_end
-    else:
-      self.on_batch_end = lambda batch, logs: None
     if on_train_begin is not None:
       self.on_train_begin = on_train_begin
-    else:
-      self.on_train_begin = lambda logs: None
     if on_train_end is not None:
       self.on_train_end = on_train_end
-    else:
-      self.on_train_end = lambda logs: None
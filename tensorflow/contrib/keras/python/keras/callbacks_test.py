@@ -614,6 +614,56 @@ class KerasCallbacksTest(test.TestCase):
 
       assert os.path.exists(temp_dir)
 
+  def test_CallbackList_skips_unimplemented_hooks(self):
+
+    class EpochEndCounter(keras.callbacks.Callback):
+
+      def __init__(self):
+        super(EpochEndCounter, self).__init__()
+        self.epochs = 0
+
+      def on_epoch_end(self, epoch, logs=None):
+        self.epochs += 1
+
+    batch_ends = []
+    counter = EpochEndCounter()
+    lambda_callback = keras.callbacks.LambdaCallback(
+        on_batch_end=lambda batch, logs: batch_ends.append(batch))
+    cbks = keras.callbacks.CallbackList([counter, lambda_callback])
+    self.assertEqual([counter.on_epoch_end],
+                     cbks._get_hook_methods('on_epoch_end'))
+    self.assertEqual([], cbks._get_hook_methods('on_batch_begin'))
+    self.assertEqual(1, len(cbks._get_hook_methods('on_batch_end')))
+
+    cbks.on_train_begin()
+    for epoch in range(2):
+      cbks.on_epoch_begin(epoch)
+      for batch in range(3):
+        cbks.on_batch_begin(batch, {})
+        cbks.on_batch_end(batch, {})
+      cbks.on_epoch_end(epoch)
+    cbks.on_train_end()
+    self.assertEqual(2, counter.epochs)
+    self.assertEqual([0, 1, 2, 0, 1, 2], batch_ends)
+
+  def test_CallbackList_profile(self):
+    lambda_callback = keras.callbacks.LambdaCallback(
+        on_batch_end=lambda batch, logs: None)
+    cbks = keras.callbacks.CallbackList(
+        [keras.callbacks.History(), lambda_callback], profile=True)
+    cbks.on_train_begin()
+    cbks.on_epoch_begin(0)
+    for batch in range(5):
+      cbks.on_batch_begin(batch, {})
+      cbks.on_batch_end(batch, {})
+    cbks.on_epoch_end(0)
+    self.assertEqual(5, cbks.profile_stats[(1, 'on_batch_end')][0])
+    self.assertEqual(1, cbks.profile_stats[(0, 'on_epoch_end')][0])
+    self.assertNotIn((0, 'on_batch_end'), cbks.profile_stats)
+    report = cbks.profile_report()
+    self.assertIn('1: LambdaCallback', report)
+    self.assertIn('on_batch_end', report)
+
 
 if __name__ == '__main__':
   test.main()
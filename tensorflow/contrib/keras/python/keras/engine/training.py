@@ -22,7 +22,7 @@ from __future__ import print_function
 import copy
 import multiprocessing
 import threading
-import time
+import traceback
 import warnings
 
 import numpy as np
@@ -34,6 +34,7 @@ from tensorflow.contrib.keras.python.keras import losses
 from tensorflow.contrib.keras.python.keras import metrics as metrics_module
 from tensorflow.contrib.keras.python.keras import optimizers
 from tensorflow.contrib.keras.python.keras.engine.topology import Container
+from tensorflow.contrib.keras.python.keras.utils import data_utils
 from tensorflow.contrib.keras.python.keras.utils.generic_utils import Progbar
 
 
@@ -587,6 +588,13 @@ class GeneratorEnqueuer(object):
 
   Used in `fit_generator`, `evaluate_generator`, `predict_generator`.
 
+  Workers block on a bounded queue instead of polling it, and calls to the
+  shared generator are serialized when using threads, since generators cannot
+  be advanced from several threads at once. Since workers race to advance the
+  generator, the order of the batches is only preserved with a single worker;
+  use a `Sequence` and the `OrderedEnqueuer` for deterministic ordering with
+  several workers.
+
   Arguments:
       generator: a generator function which endlessly yields data
       pickle_safe: use multiprocessing if True, otherwise threading
@@ -597,6 +605,7 @@ class GeneratorEnqueuer(object):
     self._pickle_safe = pickle_safe
     self._threads = []
     self._stop_event = None
+    self._stats = data_utils.QueueStats()
     self.queue = None
 
   def start(self, workers=1, max_q_size=10, wait_time=0.05):
@@ -604,39 +613,46 @@ class GeneratorEnqueuer(object):
 
     Arguments:
         workers: number of worker threads
-        max_q_size: queue size (when full, threads could block on put())
-        wait_time: time to sleep in-between calls to put()
+        max_q_size: queue size (when full, threads block on put())
+        wait_time: unused, kept for backwards compatibility.
     """
+    del wait_time  # Workers block on the queue instead of polling it.
+    generator_lock = threading.Lock()
 
     def data_generator_task():
+      if self._pickle_safe:
+        # Reset random seed else all children processes
+        # share the same seed
+        np.random.seed()
       while not self._stop_event.is_set():
         try:
-          if self._pickle_safe or self.queue.qsize() < max_q_size:
-            generator_output = next(self._generator)
-            self.queue.put(generator_output)
+          if self._pickle_safe:
+            item = (True, next(self._generator))
           else:
-            time.sleep(wait_time)
-        except Exception:
-          self._stop_event.set()
-          raise
+            with generator_lock:
+              item = (True, next(self._generator))
+        except Exception:  # pylint: disable=broad-except
+          item = (False, traceback.format_exc())
+        if (not data_utils.put_until_stopped(self.queue, item,
+                                             self._stop_event) or
+            not item[0]):
+          return
 
     try:
       if self._pickle_safe:
         self.queue = multiprocessing.Queue(maxsize=max_q_size)
         self._stop_event = multiprocessing.Event()
       else:
-        self.queue = queue.Queue()
+        self.queue = queue.Queue(maxsize=max_q_size)
         self._stop_event = threading.Event()
 
       for _ in range(workers):
         if self._pickle_safe:
-          # Reset random seed else all children processes
-          # share the same seed
-          np.random.seed()
           thread = multiprocessing.Process(target=data_generator_task)
           thread.daemon = True
         else:
           thread = threading.Thread(target=data_generator_task)
+          thread.daemon = True
         self._threads.append(thread)
         thread.start()
     except:
@@ -646,6 +662,30 @@ class GeneratorEnqueuer(object):
   def is_running(self):
     return self._stop_event is not None and not self._stop_event.is_set()
 
+  def _workers_alive(self):
+    return self.is_running() and any(t.is_alive() for t in self._threads)
+
+  def get(self):
+    """Yields the outputs of the generator as the workers produce them.
+
+    Yields:
+        The generator outputs.
+
+    Raises:
+        RuntimeError: if the generator raised an exception.
+    """
+    while self.is_running():
+      ok, value = data_utils.get_until_stopped(self.queue, self._workers_alive,
+                                               self._stats)
+      if not ok:
+        self.stop()
+        raise RuntimeError('The generator raised an exception:\n' + value)
+      yield value
+
+  def stats(self):
+    """Returns an `EnqueuerStats` tuple describing the queue so far."""
+    return self._stats.get()
+
   def stop(self, timeout=None):
     """Stop running threads and wait for them to exit, if necessary.
 
@@ -673,6 +713,13 @@ class GeneratorEnqueuer(object):
     self.queue = None
 
 
+def _make_enqueuer(generator, pickle_safe):
+  """Returns the enqueuer to use for a generator or a `Sequence`."""
+  if isinstance(generator, data_utils.Sequence):
+    return data_utils.OrderedEnqueuer(generator, pickle_safe=pickle_safe)
+  return GeneratorEnqueuer(generator, pickle_safe=pickle_safe)
+
+
 class Model(Container):
   """The `Model` class adds training & evaluation routines to a `Container`.
   """
@@ -1713,7 +1760,9 @@ class Model(Container):
     on images on CPU in parallel to training your model on GPU.
 
     Arguments:
-        generator: a generator.
+        generator: a generator, or an instance of `Sequence` (see
+            `keras.utils.Sequence`), whose batches are produced in order
+            even with several workers.
             The output of the generator must be either
             - a tuple (inputs, targets)
             - a tuple (inputs, targets, sample_weights).
@@ -1730,7 +1779,7 @@ class Model(Container):
         verbose: verbosity mode, 0, 1, or 2.
         callbacks: list of callbacks to be called during training.
         validation_data: this can be either
-            - a generator for the validation data
+            - a generator or a `Sequence` for the validation data
             - a tuple (inputs, targets)
             - a tuple (inputs, targets, sample_weights).
         validation_steps: Only relevant if `validation_data`
@@ -1752,7 +1801,10 @@ class Model(Container):
             (useful for resuming a previous training run)
 
     Returns:
-        A `History` object.
+        A `History` object. Statistics on how well the generator kept up
+        with training are stored as an `EnqueuerStats` tuple in
+        `self.generator_queue_stats`; many starved batches mean that the
+        model was waiting for data.
 
     Example:
 
@@ -1775,7 +1827,6 @@ class Model(Container):
         ValueError: In case the generator yields
             data in an invalid format.
     """
-    wait_time = 0.01  # in seconds
     epoch = initial_epoch
 
     do_validation = bool(validation_data)
@@ -1786,7 +1837,8 @@ class Model(Container):
     # python 2 has 'next', 3 has '__next__'
     # avoid any explicit version checks
     val_gen = (hasattr(validation_data, 'next') or
-               hasattr(validation_data, '__next__'))
+               hasattr(validation_data, '__next__') or
+               isinstance(validation_data, data_utils.Sequence))
     if val_gen and not validation_steps:
       raise ValueError('When using a generator for validation data, '
                        'you must specify a value for '
@@ -1834,8 +1886,9 @@ class Model(Container):
     enqueuer = None
 
     try:
-      enqueuer = GeneratorEnqueuer(generator, pickle_safe=pickle_safe)
+      enqueuer = _make_enqueuer(generator, pickle_safe)
       enqueuer.start(max_q_size=max_q_size, workers=workers)
+      output_generator = enqueuer.get()
 
       callback_model.stop_training = False
       while epoch < epochs:
@@ -1843,13 +1896,7 @@ class Model(Container):
         steps_done = 0
         batch_index = 0
         while steps_done < steps_per_epoch:
-          generator_output = None
-          while enqueuer.is_running():
-            if not enqueuer.queue.empty():
-              generator_output = enqueuer.queue.get()
-              break
-            else:
-              time.sleep(wait_time)
+          generator_output = next(output_generator)
 
           if not hasattr(generator_output, '__len__'):
             raise ValueError('output of generator should be '
@@ -1922,6 +1969,7 @@ class Model(Container):
 
     finally:
       if enqueuer is not None:
+        self.generator_queue_stats = enqueuer.stats()
         enqueuer.stop()
 
     callbacks.on_train_end()
@@ -1940,7 +1988,8 @@ class Model(Container):
 
     Arguments:
         generator: Generator yielding tuples (inputs, targets)
-            or (inputs, targets, sample_weights)
+            or (inputs, targets, sample_weights), or an instance of
+            `Sequence` returning them.
         steps: Total number of steps (batches of samples)
             to yield from `generator` before stopping.
         max_q_size: maximum size for the generator queue
@@ -1958,7 +2007,8 @@ class Model(Container):
         Scalar test loss (if the model has a single output and no metrics)
         or list of scalars (if the model has multiple outputs
         and/or metrics). The attribute `model.metrics_names` will give you
-        the display labels for the scalar outputs.
+        the display labels for the scalar outputs. The queue statistics
+        are stored in `self.generator_queue_stats`.
 
     Raises:
         ValueError: In case the generator yields
@@ -1967,23 +2017,17 @@ class Model(Container):
     self._make_test_function()
 
     steps_done = 0
-    wait_time = 0.01
     all_outs = []
     batch_sizes = []
     enqueuer = None
 
     try:
-      enqueuer = GeneratorEnqueuer(generator, pickle_safe=pickle_safe)
+      enqueuer = _make_enqueuer(generator, pickle_safe)
       enqueuer.start(workers=workers, max_q_size=max_q_size)
+      output_generator = enqueuer.get()
 
       while steps_done < steps:
-        generator_output = None
-        while enqueuer.is_running():
-          if not enqueuer.queue.empty():
-            generator_output = enqueuer.queue.get()
-            break
-          else:
-            time.sleep(wait_time)
+        generator_output = next(output_generator)
 
         if not hasattr(generator_output, '__len__'):
           raise ValueError('output of generator should be a tuple '
@@ -2013,6 +2057,7 @@ class Model(Container):
 
     finally:
       if enqueuer is not None:
+        self.generator_queue_stats = enqueuer.stats()
         enqueuer.stop()
 
     if not isinstance(outs, list):
@@ -2037,7 +2082,8 @@ class Model(Container):
     `predict_on_batch`.
 
     Arguments:
-        generator: Generator yielding batches of input samples.
+        generator: Generator yielding batches of input samples, or an
+            instance of `Sequence` returning them.
         steps: Total number of steps (batches of samples)
             to yield from `generator` before stopping.
         max_q_size: Maximum size for the generator queue.
@@ -2053,7 +2099,8 @@ class Model(Container):
         verbose: verbosity mode, 0 or 1.
 
     Returns:
-        Numpy array(s) of predictions.
+        Numpy array(s) of predictions. The queue statistics are stored in
+        `self.generator_queue_stats`.
 
     Raises:
         ValueError: In case the generator yields
@@ -2062,25 +2109,19 @@ class Model(Container):
     self._make_predict_function()
 
     steps_done = 0
-    wait_time = 0.01
     all_outs = []
     enqueuer = None
 
     try:
-      enqueuer = GeneratorEnqueuer(generator, pickle_safe=pickle_safe)
+      enqueuer = _make_enqueuer(generator, pickle_safe)
       enqueuer.start(workers=workers, max_q_size=max_q_size)
+      output_generator = enqueuer.get()
 
       if verbose == 1:
         progbar = Progbar(target=steps)
 
       while steps_done < steps:
-        generator_output = None
-        while enqueuer.is_running():
-          if not enqueuer.queue.empty():
-            generator_output = enqueuer.queue.get()
-            break
-          else:
-            time.sleep(wait_time)
+        generator_output = next(output_generator)
 
         if isinstance(generator_output, tuple):
           # Compatibility with the generators
@@ -2114,6 +2155,7 @@ class Model(Container):
 
     finally:
       if enqueuer is not None:
+        self.generator_queue_stats = enqueuer.stats()
         enqueuer.stop()
 
     if len(all_outs) == 1:
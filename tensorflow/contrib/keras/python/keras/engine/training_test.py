@@ -23,9 +23,34 @@ import numpy as np
 from tensorflow.contrib.keras.python import keras
 from tensorflow.contrib.keras.python.keras import testing_utils
 from tensorflow.contrib.keras.python.keras.engine.training import _weighted_masked_objective
+from tensorflow.contrib.keras.python.keras.engine.training import GeneratorEnqueuer
 from tensorflow.python.platform import test
 
 
+class IndexedSequence(keras.utils.Sequence):
+  """A `Sequence` whose batches are filled with their own index."""
+
+  def __init__(self, num_batches=7, batch_size=3):
+    self._num_batches = num_batches
+    self._batch_size = batch_size
+
+  def __len__(self):
+    return self._num_batches
+
+  def __getitem__(self, index):
+    x = np.full((self._batch_size, 2), index, dtype='float32')
+    y = np.full((self._batch_size,), index, dtype='float32')
+    return x, y
+
+
+class FailingSequence(IndexedSequence):
+
+  def __getitem__(self, index):
+    if index == 2:
+      raise ValueError('Bad batch')
+    return super(FailingSequence, self).__getitem__(index)
+
+
 class TrainingTest(test.TestCase):
 
   def test_fit_on_arrays(self):
@@ -690,6 +715,94 @@ class TestGeneratorMethods(test.TestCase):
                              max_q_size=10,
                              pickle_safe=False)
 
+  def test_generator_methods_with_sequence(self):
+    model = keras.models.Sequential()
+    model.add(keras.layers.Dense(1, input_shape=(2,)))
+    model.compile(loss='mse', optimizer='sgd')
+
+    model.fit_generator(IndexedSequence(),
+                        steps_per_epoch=5,
+                        epochs=2,
+                        workers=3,
+                        validation_data=IndexedSequence(),
+                        validation_steps=4)
+    self.assertEqual(model.generator_queue_stats.num_batches, 10)
+    model.evaluate_generator(IndexedSequence(), steps=5, workers=2,
+                             pickle_safe=True)
+    self.assertEqual(model.generator_queue_stats.num_batches, 5)
+    self.assertEqual(model.predict_generator(IndexedSequence(), steps=5,
+                                             workers=2).shape, (15, 1))
+
+
+class EnqueuerTest(test.TestCase):
+
+  def _get_batch_indices(self, enqueuer, num_batches):
+    output_generator = enqueuer.get()
+    return [int(next(output_generator)[1][0]) for _ in range(num_batches)]
+
+  def test_ordered_enqueuer_preserves_order(self):
+    for pickle_safe in (False, True):
+      enqueuer = keras.utils.data_utils.OrderedEnqueuer(
+          IndexedSequence(), pickle_safe=pickle_safe)
+      enqueuer.start(workers=3, max_q_size=6)
+      try:
+        self.assertEqual(self._get_batch_indices(enqueuer, 16),
+                         [i % 7 for i in range(16)])
+      finally:
+        enqueuer.stop()
+
+  def test_ordered_enqueuer_raises_worker_errors(self):
+    enqueuer = keras.utils.data_utils.OrderedEnqueuer(FailingSequence())
+    enqueuer.start(workers=2)
+    output_generator = enqueuer.get()
+    next(output_generator)
+    next(output_generator)
+    with self.assertRaisesRegexp(RuntimeError, 'Bad batch'):
+      next(output_generator)
+    self.assertFalse(enqueuer.is_running())
+
+  def test_ordered_enqueuer_stats(self):
+    enqueuer = keras.utils.data_utils.OrderedEnqueuer(IndexedSequence())
+    enqueuer.start(workers=2)
+    try:
+      self._get_batch_indices(enqueuer, 4)
+      stats = enqueuer.stats()
+    finally:
+      enqueuer.stop()
+    self.assertEqual(stats.num_batches, 4)
+    self.assertLessEqual(stats.num_starved, 4)
+    self.assertGreaterEqual(stats.wait_time, 0.)
+
+  def test_generator_enqueuer_raises_generator_errors(self):
+
+    def failing_generator():
+      yield np.zeros((1, 2)), np.zeros((1,))
+      raise ValueError('Bad generator')
+
+    enqueuer = GeneratorEnqueuer(failing_generator())
+    enqueuer.start(workers=1)
+    output_generator = enqueuer.get()
+    next(output_generator)
+    with self.assertRaisesRegexp(RuntimeError, 'Bad generator'):
+      next(output_generator)
+
+  def test_generator_enqueuer_shares_generator_between_threads(self):
+
+    def counting_generator():
+      i = 0
+      while True:
+        yield i
+        i += 1
+
+    enqueuer = GeneratorEnqueuer(counting_generator())
+    enqueuer.start(workers=4, max_q_size=5)
+    try:
+      output_generator = enqueuer.get()
+      values = [next(output_generator) for _ in range(50)]
+    finally:
+      enqueuer.stop()
+    self.assertEqual(len(set(values)), 50)
+
 
 if __name__ == '__main__':
   test.main()
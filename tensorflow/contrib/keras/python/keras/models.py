@@ -667,6 +667,11 @@ class Sequential(Model):
       self.build()
     return self.model.constraints
 
+  @property
+  def generator_queue_stats(self):
+    """`EnqueuerStats` of the latest call to a `*_generator` method."""
+    return getattr(self.model, 'generator_queue_stats', None)
+
   def get_weights(self):
     """Retrieves the weights of the model.
 
@@ -1012,7 +1017,9 @@ class Sequential(Model):
     on images on CPU in parallel to training your model on GPU.
 
     Arguments:
-        generator: A generator.
+        generator: A generator, or an instance of `Sequence` (see
+            `keras.utils.Sequence`), whose batches are produced in order
+            even with several workers.
             The output of the generator must be either
             - a tuple (inputs, targets)
             - a tuple (inputs, targets, sample_weights).
@@ -1104,7 +1111,8 @@ class Sequential(Model):
 
     Arguments:
         generator: Generator yielding tuples (inputs, targets)
-            or (inputs, targets, sample_weights)
+            or (inputs, targets, sample_weights), or an instance of
+            `Sequence` returning them.
         steps: Total number of steps (batches of samples)
             to yield from `generator` before stopping.
         max_q_size: maximum size for the generator queue
@@ -1146,7 +1154,8 @@ class Sequential(Model):
     `predict_on_batch`.
 
     Arguments:
-        generator: generator yielding batches of input samples.
+        generator: generator yielding batches of input samples, or an
+            instance of `Sequence` returning them.
         steps: Total number of steps (batches of samples)
             to yield from `generator` before stopping.
         max_q_size: maximum size for the generator queue
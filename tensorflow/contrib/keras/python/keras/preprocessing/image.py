@@ -21,6 +21,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import json
+from multiprocessing.pool import ThreadPool
 import os
 import re
 import threading
@@ -33,6 +36,13 @@ from tensorflow.contrib.keras.python.keras import backend as K
 
 
 # pylint: disable=g-import-not-at-top
+try:
+  from os import scandir
+except ImportError:
+  try:
+    from scandir import scandir
+  except ImportError:
+    scandir = None
 try:
   from PIL import Image as pil_image
 except ImportError:
@@ -251,6 +261,103 @@ def apply_transform(x,
   return x
 
 
+def _map_coordinates_to_indices(coords, size, fill_mode):
+  """Maps input coordinates along one axis to nearest-neighbour indices.
+
+  Matches the behaviour of `scipy.ndimage.affine_transform` with `order=0`.
+
+  Arguments:
+      coords: Numpy array of (fractional) input coordinates along the axis.
+      size: Size of the input along the axis.
+      fill_mode: One of `{'constant', 'nearest', 'reflect', 'wrap'}`.
+
+  Returns:
+      A tuple `(indices, outside)`, where `indices` is an integer array of
+      valid indices into the axis, and `outside` is a boolean array marking
+      the points that lie outside the input for `fill_mode='constant'`, or
+      None for the other modes.
+
+  Raises:
+      ValueError: if `fill_mode` is not supported.
+  """
+  outside = None
+  if fill_mode == 'constant':
+    outside = (coords < 0) | (coords > size - 1)
+  elif fill_mode == 'reflect':
+    coords = np.mod(coords + 0.5, 2 * size)
+    coords = np.where(coords >= size, 2 * size - coords, coords) - 0.5
+  elif fill_mode == 'wrap':
+    if size > 1:
+      coords = np.mod(coords, size - 1)
+  elif fill_mode != 'nearest':
+    raise ValueError('Invalid fill_mode: %s; expected one of "constant", '
+                     '"nearest", "reflect" or "wrap".' % fill_mode)
+  # Rounds to the nearest index; the coordinates are non-negative once
+  # clipped, so truncation rounds down.
+  coords = np.clip(coords, 0, size - 1)
+  coords += 0.5
+  indices = coords.astype(np.intp)
+  return indices, outside
+
+
+def apply_transform_batch(x,
+                          transform_matrices,
+                          channel_axis=3,
+                          fill_mode='nearest',
+                          cval=0.):
+  """Applies one image transformation per image to a batch of images.
+
+  This is the batch version of `apply_transform`: every image of the batch is
+  transformed by its own matrix, but the input coordinates of all images are
+  computed at once and the pixels of all channels are gathered with a single
+  indexing operation, instead of calling scipy once per image and channel.
+
+  Arguments:
+      x: 4D numpy array, batch of images.
+      transform_matrices: Numpy array of shape `(batch_size, 3, 3)` specifying
+          the geometric transformation of each image, as for
+          `apply_transform`.
+      channel_axis: Index of axis for channels in the input tensor, 1 or 3.
+      fill_mode: Points outside the boundaries of the input
+          are filled according to the given mode
+          (one of `{'constant', 'nearest', 'reflect', 'wrap'}`).
+      cval: Value used for points outside the boundaries
+          of the input if `mode='constant'`.
+
+  Returns:
+      The transformed version of the input.
+  """
+  x = np.rollaxis(x, channel_axis, 4)
+  n, h, w, channels = x.shape
+  transform_matrices = np.asarray(transform_matrices, dtype='float64')
+  a = transform_matrices[:, :2, :2]
+  offsets = transform_matrices[:, :2, 2]
+  rows = np.arange(h)
+  cols = np.arange(w)
+  # The input coordinates are affine in the output row and column, so they are
+  # computed as the sum of a row term and a column term.
+  in_rows = ((a[:, 0, 0, np.newaxis] * rows)[:, :, np.newaxis] +
+             (a[:, 0, 1, np.newaxis] * cols + offsets[:, 0, np.newaxis])
+             [:, np.newaxis, :])
+  in_cols = ((a[:, 1, 0, np.newaxis] * rows)[:, :, np.newaxis] +
+             (a[:, 1, 1, np.newaxis] * cols + offsets[:, 1, np.newaxis])
+             [:, np.newaxis, :])
+  row_indices, row_outside = _map_coordinates_to_indices(
+      in_rows, h, fill_mode)
+  col_indices, col_outside = _map_coordinates_to_indices(
+      in_cols, w, fill_mode)
+  # Gathering rows of the flattened batch is much faster than indexing with
+  # three index arrays.
+  flat_indices = row_indices * w + col_indices
+  flat_indices += (np.arange(n) * (h * w)).reshape((n, 1, 1))
+  transformed = np.take(
+      x.reshape((n * h * w, channels)), flat_indices.ravel(), axis=0)
+  if fill_mode == 'constant':
+    transformed[(row_outside | col_outside).ravel()] = cval
+  transformed = transformed.reshape((n, h, w, channels))
+  return np.rollaxis(transformed, 3, channel_axis)
+
+
 def flip_axis(x, axis):
   x = np.asarray(x).swapaxes(axis, 0)
   x = x[::-1, ...]
@@ -522,7 +629,11 @@ class ImageDataGenerator(object):
                           save_to_dir=None,
                           save_prefix='',
                           save_format='jpeg',
-                          follow_links=False):
+                          follow_links=False,
+                          decode_workers=1,
+                          cache_size=0,
+                          cache_path=None,
+                          index_path=None):
     return DirectoryIterator(
         directory,
         self,
@@ -537,7 +648,11 @@ class ImageDataGenerator(object):
         save_to_dir=save_to_dir,
         save_prefix=save_prefix,
         save_format=save_format,
-        follow_links=follow_links)
+        follow_links=follow_links,
+        decode_workers=decode_workers,
+        cache_size=cache_size,
+        cache_path=cache_path,
+        index_path=index_path)
 
   def standardize(self, x):
     """Apply the normalization configuration to a batch of inputs.
@@ -681,6 +796,101 @@ class ImageDataGenerator(object):
 
     return x
 
+  def _has_geometric_transform(self):
+    return bool(self.rotation_range or self.height_shift_range or
+                self.width_shift_range or self.shear_range or
+                self.zoom_range[0] != 1 or self.zoom_range[1] != 1)
+
+  def random_transform_matrices(self, batch_size, h, w):
+    """Samples the geometric transformations of a batch of images.
+
+    Arguments:
+        batch_size: number of images in the batch.
+        h: height of the images.
+        w: width of the images.
+
+    Returns:
+        A Numpy array of shape `(batch_size, 3, 3)`, with one transformation
+        matrix per image, centered on the image, as expected by
+        `apply_transform_batch`.
+    """
+    theta = np.pi / 180 * np.random.uniform(
+        -self.rotation_range, self.rotation_range, batch_size)
+    tx = np.random.uniform(-self.height_shift_range, self.height_shift_range,
+                           batch_size) * h
+    ty = np.random.uniform(-self.width_shift_range, self.width_shift_range,
+                           batch_size) * w
+    shear = np.random.uniform(-self.shear_range, self.shear_range, batch_size)
+    if self.zoom_range[0] == 1 and self.zoom_range[1] == 1:
+      zx = zy = np.ones(batch_size)
+    else:
+      zx, zy = np.random.uniform(self.zoom_range[0], self.zoom_range[1],
+                                 (2, batch_size))
+
+    # The composition rotation . shift . shear . zoom of `random_transform`,
+    # multiplied out.
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+    sin_shear, cos_shear = np.sin(shear), np.cos(shear)
+    matrices = np.zeros((batch_size, 3, 3))
+    matrices[:, 0, 0] = cos_theta * zx
+    matrices[:, 0, 1] = (-cos_theta * sin_shear - sin_theta * cos_shear) * zy
+    matrices[:, 0, 2] = cos_theta * tx - sin_theta * ty
+    matrices[:, 1, 0] = sin_theta * zx
+    matrices[:, 1, 1] = (-sin_theta * sin_shear + cos_theta * cos_shear) * zy
+    matrices[:, 1, 2] = sin_theta * tx + cos_theta * ty
+    matrices[:, 2, 2] = 1
+    # Same as `transform_matrix_offset_center`, for every matrix at once.
+    o_x = float(h) / 2 + 0.5
+    o_y = float(w) / 2 + 0.5
+    matrices[:, 0, 2] += o_x - matrices[:, 0, 0] * o_x - matrices[:, 0, 1] * o_y
+    matrices[:, 1, 2] += o_y - matrices[:, 1, 0] * o_x - matrices[:, 1, 1] * o_y
+    return matrices
+
+  def random_transform_batch(self, x):
+    """Randomly augments a batch of images.
+
+    Draws the same kinds of random transformations as `random_transform`,
+    but samples the parameters of all images at once and applies them with
+    vectorized operations over the whole batch.
+
+    Arguments:
+        x: 4D tensor, batch of images.
+
+    Returns:
+        A randomly transformed version of the input (same shape).
+    """
+    batch_size = x.shape[0]
+    if self._has_geometric_transform():
+      matrices = self.random_transform_matrices(
+          batch_size, x.shape[self.row_axis], x.shape[self.col_axis])
+      x = apply_transform_batch(
+          x,
+          matrices,
+          self.channel_axis,
+          fill_mode=self.fill_mode,
+          cval=self.cval)
+    else:
+      # The remaining transformations work in place.
+      x = np.array(x)
+
+    if self.channel_shift_range != 0:
+      broadcast_shape = [batch_size, 1, 1, 1]
+      broadcast_shape[self.channel_axis] = x.shape[self.channel_axis]
+      shifts = np.random.uniform(-self.channel_shift_range,
+                                 self.channel_shift_range, broadcast_shape)
+      min_x = np.min(x, axis=(1, 2, 3), keepdims=True)
+      max_x = np.max(x, axis=(1, 2, 3), keepdims=True)
+      x += shifts.astype(x.dtype)
+      np.clip(x, min_x, max_x, out=x)
+
+    for flip, axis in ((self.horizontal_flip, self.col_axis),
+                       (self.vertical_flip, self.row_axis)):
+      if flip:
+        flipped = np.random.random(batch_size) < 0.5
+        x[flipped] = flip_axis(x[flipped], axis)
+
+    return x
+
   def fit(self, x, augment=False, rounds=1, seed=None):
     """Fits internal statistics to some sample data.
 
@@ -722,8 +932,7 @@ class ImageDataGenerator(object):
       ax = np.zeros(
           tuple([rounds * x.shape[0]] + list(x.shape)[1:]), dtype=K.floatx())
       for r in range(rounds):
-        for i in range(x.shape[0]):
-          ax[i + r * x.shape[0]] = self.random_transform(x[i])
+        ax[r * x.shape[0]:(r + 1) * x.shape[0]] = self.random_transform_batch(x)
       x = ax
 
     if self.featurewise_center:
@@ -885,13 +1094,10 @@ class NumpyArrayIterator(Iterator):
           self.index_generator)
     # The transformation of images is not under thread lock
     # so it can be done in parallel
-    batch_x = np.zeros(
-        tuple([current_batch_size] + list(self.x.shape)[1:]), dtype=K.floatx())
-    for i, j in enumerate(index_array):
-      x = self.x[j]
-      x = self.image_data_generator.random_transform(x.astype(K.floatx()))
-      x = self.image_data_generator.standardize(x)
-      batch_x[i] = x
+    batch_x = self.image_data_generator.random_transform_batch(
+        self.x[index_array])
+    for i in range(current_batch_size):
+      batch_x[i] = self.image_data_generator.standardize(batch_x[i])
     if self.save_to_dir:
       for i in range(current_batch_size):
         img = array_to_img(batch_x[i], self.data_format, scale=True)
@@ -907,6 +1113,243 @@ class NumpyArrayIterator(Iterator):
     return batch_x, batch_y
 
 
+# Bump this whenever the layout of the directory index files changes.
+_DIRECTORY_INDEX_VERSION = 2
+# Maximum number of class directories listed in parallel.
+_INDEX_WORKERS = 8
+
+
+# Thread pools decoding `DirectoryIterator` batches, keyed by number of
+# workers and shared by all iterators of a process.
+_DECODE_POOLS = {}
+_DECODE_POOLS_PID = None
+_DECODE_POOLS_LOCK = threading.Lock()
+
+
+def _get_decode_pool(workers):
+  """Returns the process-wide thread pool with `workers` decoding threads.
+
+  Arguments:
+      workers: Integer, number of threads of the pool.
+
+  Returns:
+      A `ThreadPool`.
+  """
+  global _DECODE_POOLS_PID
+  with _DECODE_POOLS_LOCK:
+    # Pools inherited from a parent process have no threads, so every
+    # process creates its own.
+    if _DECODE_POOLS_PID != os.getpid():
+      _DECODE_POOLS.clear()
+      _DECODE_POOLS_PID = os.getpid()
+    if workers not in _DECODE_POOLS:
+      _DECODE_POOLS[workers] = ThreadPool(workers)
+    return _DECODE_POOLS[workers]
+
+
+def _list_directory(path):
+  """Lists a directory with a single system call where possible.
+
+  Arguments:
+      path: Path of the directory.
+
+  Returns:
+      A list of `(name, is_dir, is_symlink)` tuples.
+  """
+  if scandir is not None:
+    return [(entry.name, entry.is_dir(), entry.is_symlink())
+            for entry in scandir(path)]
+  entries = []
+  for name in os.listdir(path):
+    child = os.path.join(path, name)
+    entries.append((name, os.path.isdir(child), os.path.islink(child)))
+  return entries
+
+
+def _index_class_directory(directory, subdir, white_list_formats,
+                           follow_links):
+  """Finds the images of one class in a single pass over its subtree.
+
+  Arguments:
+      directory: Path of the root directory.
+      subdir: Name of the class subdirectory of `directory`.
+      white_list_formats: Set of lowercase image file extensions.
+      follow_links: Whether to descend into symlinked directories.
+
+  Returns:
+      A tuple `(filenames, mtimes)`, where `filenames` are the paths of the
+      images relative to `directory`, sorted by directory, and `mtimes` maps
+      the path of every directory visited to its modification time.
+  """
+  listings = []
+  mtimes = {}
+  stack = [subdir]
+  while stack:
+    relative_dir = stack.pop()
+    path = os.path.join(directory, relative_dir)
+    mtimes[path] = os.stat(path).st_mtime
+    files = []
+    for name, is_dir, is_symlink in _list_directory(path):
+      if is_dir:
+        if follow_links or not is_symlink:
+          stack.append(os.path.join(relative_dir, name))
+      else:
+        parts = name.lower().rsplit('.', 1)
+        if len(parts) == 2 and parts[1] in white_list_formats:
+          files.append(name)
+    listings.append((relative_dir, sorted(files)))
+  filenames = []
+  for relative_dir, files in sorted(listings):
+    filenames.extend(os.path.join(relative_dir, name) for name in files)
+  return filenames, mtimes
+
+
+def _index_directory(directory, classes, white_list_formats, follow_links):
+  """Lists the images of every class, listing the classes in parallel.
+
+  Arguments:
+      directory: Path of the root directory.
+      classes: List of class subdirectory names.
+      white_list_formats: Set of lowercase image file extensions.
+      follow_links: Whether to descend into symlinked directories.
+
+  Returns:
+      A tuple `(filenames, classes, mtimes)`, where `filenames` are the paths
+      of the images relative to `directory`, `classes` is an int32 Numpy array
+      of their class indices, and `mtimes` maps the path of every directory
+      visited to its modification time.
+  """
+
+  def index_class(subdir):
+    return _index_class_directory(directory, subdir, white_list_formats,
+                                  follow_links)
+
+  if len(classes) > 1:
+    pool = ThreadPool(min(len(classes), _INDEX_WORKERS))
+    try:
+      results = pool.map(index_class, classes)
+    finally:
+      pool.close()
+  else:
+    results = [index_class(subdir) for subdir in classes]
+
+  filenames = []
+  class_indices = []
+  mtimes = {directory: os.stat(directory).st_mtime}
+  for i, (class_filenames, class_mtimes) in enumerate(results):
+    filenames.extend(class_filenames)
+    class_indices.extend([i] * len(class_filenames))
+    mtimes.update(class_mtimes)
+  return filenames, np.array(class_indices, dtype='int32'), mtimes
+
+
+def _read_directory_index(index_path, key):
+  """Reads a directory index written by `_write_directory_index`.
+
+  Arguments:
+      index_path: Path of the index file.
+      key: The key the index must have been written with, made of JSON
+          types only.
+
+  Returns:
+      A tuple `(filenames, classes)`, or None if there is no valid index, if
+      it was written with a different key or if any directory it lists was
+      modified since.
+  """
+  try:
+    with open(index_path, 'r') as f:
+      index = json.load(f)
+  except (IOError, OSError, ValueError):
+    return None
+  if (not isinstance(index, dict) or
+      index.get('version') != _DIRECTORY_INDEX_VERSION or
+      index.get('key') != key):
+    return None
+  try:
+    for path, mtime in index['mtimes'].items():
+      if os.stat(path).st_mtime != mtime:
+        return None
+    return (list(index['filenames']),
+            np.array(index['classes'], dtype='int32'))
+  except (OSError, KeyError, TypeError, ValueError, AttributeError):
+    return None
+
+
+def _write_directory_index(index_path, key, filenames, classes, mtimes):
+  """Atomically writes a directory index to `index_path` as JSON."""
+  index = {
+      'version': _DIRECTORY_INDEX_VERSION,
+      'key': key,
+      'mtimes': mtimes,
+      'filenames': list(filenames),
+      'classes': [int(c) for c in classes],
+  }
+  temp_path = '%s.tmp%d' % (index_path, os.getpid())
+  with open(temp_path, 'w') as f:
+    json.dump(index, f)
+  os.rename(temp_path, index_path)
+
+
+ImageCacheStats = collections.namedtuple(
+    'ImageCacheStats', ['hits', 'misses', 'num_cached', 'capacity'])
+
+
+class DecodedImageCache(object):
+  """A bounded cache of decoded and resized images, indexed by sample.
+
+  Images are stored as uint8 arrays in a single preallocated buffer, which is
+  either in memory or, if `path` is given, a memory-mapped file. Once the
+  cache is full no more images are added; since every epoch reads every
+  sample once, evicting entries would only replace hits by other hits.
+
+  Arguments:
+      capacity: Integer, maximum number of images to cache.
+      image_shape: Tuple of integers, shape of each image.
+      path: Optional path of the file backing the cache.
+  """
+
+  def __init__(self, capacity, image_shape, path=None):
+    shape = (capacity,) + tuple(image_shape)
+    if path is None:
+      self._images = np.zeros(shape, dtype='uint8')
+    else:
+      self._images = np.memmap(path, dtype='uint8', mode='w+', shape=shape)
+    self._capacity = capacity
+    self._slots = {}
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+
+  def get(self, index):
+    """Returns the cached image of sample `index`, or None."""
+    with self._lock:
+      slot = self._slots.get(index)
+      if slot is None:
+        self._misses += 1
+        return None
+      self._hits += 1
+    return self._images[slot]
+
+  def put(self, index, x):
+    """Caches `x`, the image of sample `index`, if there is room left."""
+    with self._lock:
+      if index in self._slots or len(self._slots) >= self._capacity:
+        return
+      slot = len(self._slots)
+      self._images[slot] = x
+      # Only publish the slot once the image is written.
+      self._slots[index] = slot
+
+  def stats(self):
+    """Returns an `ImageCacheStats` tuple."""
+    with self._lock:
+      return ImageCacheStats(
+          hits=self._hits,
+          misses=self._misses,
+          num_cached=len(self._slots),
+          capacity=self._capacity)
+
+
 class DirectoryIterator(Iterator):
   """Iterator capable of reading images from a directory on disk.
 
@@ -940,6 +1383,18 @@ class DirectoryIterator(Iterator):
           images (if `save_to_dir` is set).
       save_format: Format to use for saving sample images
           (if `save_to_dir` is set).
+      follow_links: Whether to follow symlinks inside class subdirectories.
+      decode_workers: Integer, number of threads decoding and resizing the
+          images of a batch in parallel.
+      cache_size: Integer, maximum number of decoded and resized images to
+          keep, so that later epochs only pay for augmentation. 0 disables
+          the cache. See `cache_stats()` for its hit rate.
+      cache_path: Optional path of a file to memory-map the cache to,
+          instead of keeping it in memory.
+      index_path: Optional path of a file to save the list of images and
+          their classes to. The list is reused as long as no directory of
+          the tree was modified since, so that restarts do not need to list
+          the tree again.
   """
 
   def __init__(self,
@@ -956,7 +1411,11 @@ class DirectoryIterator(Iterator):
                save_to_dir=None,
                save_prefix='',
                save_format='jpeg',
-               follow_links=False):
+               follow_links=False,
+               decode_workers=1,
+               cache_size=0,
+               cache_path=None,
+               index_path=None):
     if data_format is None:
       data_format = K.image_data_format()
     self.directory = directory
@@ -989,57 +1448,72 @@ class DirectoryIterator(Iterator):
 
     white_list_formats = {'png', 'jpg', 'jpeg', 'bmp'}
 
-    # first, count the number of samples and classes
-    self.samples = 0
-
     if not classes:
-      classes = []
-      for subdir in sorted(os.listdir(directory)):
-        if os.path.isdir(os.path.join(directory, subdir)):
-          classes.append(subdir)
+      classes = sorted(name for name, is_dir, _ in _list_directory(directory)
+                       if is_dir)
     self.num_class = len(classes)
     self.class_indices = dict(zip(classes, range(len(classes))))
 
-    def _recursive_list(subpath):
-      return sorted(
-          os.walk(subpath, followlinks=follow_links), key=lambda tpl: tpl[0])
-
-    for subdir in classes:
-      subpath = os.path.join(directory, subdir)
-      for root, _, files in _recursive_list(subpath):
-        for fname in files:
-          is_valid = False
-          for extension in white_list_formats:
-            if fname.lower().endswith('.' + extension):
-              is_valid = True
-              break
-          if is_valid:
-            self.samples += 1
+    index = None
+    if index_path is not None:
+      index_key = [os.path.abspath(directory), list(classes), follow_links,
+                   sorted(white_list_formats)]
+      index = _read_directory_index(index_path, index_key)
+    if index is not None:
+      self.filenames, self.classes = index
+    else:
+      self.filenames, self.classes, mtimes = _index_directory(
+          directory, classes, white_list_formats, follow_links)
+      if index_path is not None:
+        _write_directory_index(index_path, index_key, self.filenames,
+                               self.classes, mtimes)
+    self.samples = len(self.filenames)
     print('Found %d images belonging to %d classes.' % (self.samples,
                                                         self.num_class))
 
-    # second, build an index of the images in the different class subfolders
-    self.filenames = []
-    self.classes = np.zeros((self.samples,), dtype='int32')
-    i = 0
-    for subdir in classes:
-      subpath = os.path.join(directory, subdir)
-      for root, _, files in _recursive_list(subpath):
-        for fname in files:
-          is_valid = False
-          for extension in white_list_formats:
-            if fname.lower().endswith('.' + extension):
-              is_valid = True
-              break
-          if is_valid:
-            self.classes[i] = self.class_indices[subdir]
-            i += 1
-            # add filename relative to directory
-            absolute_path = os.path.join(root, fname)
-            self.filenames.append(os.path.relpath(absolute_path, directory))
+    self.decode_workers = decode_workers
+    if cache_size:
+      self._cache = DecodedImageCache(
+          min(cache_size, self.samples), self.image_shape, cache_path)
+    else:
+      self._cache = None
     super(DirectoryIterator, self).__init__(self.samples, batch_size, shuffle,
                                             seed)
 
+  def cache_stats(self):
+    """Returns the `ImageCacheStats` of the decoded image cache, or None."""
+    if self._cache is None:
+      return None
+    return self._cache.stats()
+
+  def _load_image(self, index):
+    """Returns sample `index` decoded and resized, from the cache if possible.
+
+    Arguments:
+        index: Integer, index of the sample in `self.filenames`.
+
+    Returns:
+        A 3D Numpy array.
+    """
+    if self._cache is not None:
+      x = self._cache.get(index)
+      if x is not None:
+        return x
+    img = load_img(
+        os.path.join(self.directory, self.filenames[index]),
+        grayscale=self.color_mode == 'grayscale',
+        target_size=self.target_size)
+    x = img_to_array(img, data_format=self.data_format)
+    if self._cache is not None:
+      self._cache.put(index, x)
+    return x
+
+  def _load_images(self, index_array):
+    if self.decode_workers <= 1:
+      return [self._load_image(j) for j in index_array]
+    pool = _get_decode_pool(self.decode_workers)
+    return pool.map(self._load_image, index_array)
+
   def next(self):
     """For python 2.x.
 
@@ -1053,18 +1527,12 @@ class DirectoryIterator(Iterator):
     # so it can be done in parallel
     batch_x = np.zeros(
         (current_batch_size,) + self.image_shape, dtype=K.floatx())
-    grayscale = self.color_mode == 'grayscale'
     # build batch of image data
-    for i, j in enumerate(index_array):
-      fname = self.filenames[j]
-      img = load_img(
-          os.path.join(self.directory, fname),
-          grayscale=grayscale,
-          target_size=self.target_size)
-      x = img_to_array(img, data_format=self.data_format)
-      x = self.image_data_generator.random_transform(x)
-      x = self.image_data_generator.standardize(x)
+    for i, x in enumerate(self._load_images(index_array)):
       batch_x[i] = x
+    batch_x = self.image_data_generator.random_transform_batch(batch_x)
+    for i in range(current_batch_size):
+      batch_x[i] = self.image_data_generator.standardize(batch_x[i])
     # optionally save augmented images to disk for debugging purposes
     if self.save_to_dir:
       for i in range(current_batch_size):
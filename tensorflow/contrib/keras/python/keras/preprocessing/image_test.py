@@ -18,8 +18,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
 import shutil
+import time
 
 import numpy as np
 
@@ -190,6 +192,111 @@ class TestImage(test.TestCase):
     self.assertEqual(len(dir_iterator.classes), count)
     self.assertEqual(sorted(dir_iterator.filenames), sorted(filenames))
 
+  def test_directory_iterator_index(self):
+    if PIL is None:
+      return  # Skip test if PIL is not available.
+
+    temp_dir = self.get_temp_dir()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    image_dir = os.path.join(temp_dir, 'images')
+    for path in ('class-0', os.path.join('class-1', 'sub'), 'class-2'):
+      os.makedirs(os.path.join(image_dir, path))
+    rgb_images = _generate_test_images()[0]
+    filenames = [os.path.join('class-0', 'b.png'),
+                 os.path.join('class-0', 'a.JPG'),
+                 os.path.join('class-1', 'c.png'),
+                 os.path.join('class-1', 'sub', 'd.bmp')]
+    for im, filename in zip(rgb_images, filenames):
+      im.save(os.path.join(image_dir, filename))
+    with open(os.path.join(image_dir, 'class-2', 'notes.txt'), 'w') as f:
+      f.write('not an image')
+    index_path = os.path.join(temp_dir, 'index')
+
+    generator = keras.preprocessing.image.ImageDataGenerator()
+    dir_iterator = generator.flow_from_directory(
+        image_dir, index_path=index_path)
+    self.assertEqual(dir_iterator.filenames, sorted(filenames))
+    self.assertEqual(list(dir_iterator.classes), [0, 0, 1, 1])
+    self.assertEqual(dir_iterator.num_class, 3)
+    # The index is plain JSON: relative paths and class ids.
+    with open(index_path) as f:
+      index = json.load(f)
+    self.assertEqual(index['filenames'], sorted(filenames))
+    self.assertEqual(index['classes'], [0, 0, 1, 1])
+
+    # An unchanged tree is not listed again.
+    with test.mock.patch.object(keras.preprocessing.image,
+                                '_index_directory') as index_directory:
+      dir_iterator = generator.flow_from_directory(
+          image_dir, index_path=index_path)
+      self.assertFalse(index_directory.called)
+    self.assertEqual(dir_iterator.filenames, sorted(filenames))
+    self.assertEqual(list(dir_iterator.classes), [0, 0, 1, 1])
+
+    # Adding an image modifies its directory, which invalidates the index.
+    new_filename = os.path.join('class-1', 'sub', 'e.png')
+    rgb_images[4].save(os.path.join(image_dir, new_filename))
+    mtime = os.stat(os.path.join(image_dir, 'class-1', 'sub')).st_mtime + 10
+    os.utime(os.path.join(image_dir, 'class-1', 'sub'), (mtime, mtime))
+    dir_iterator = generator.flow_from_directory(
+        image_dir, index_path=index_path)
+    self.assertEqual(dir_iterator.filenames,
+                     sorted(filenames + [new_filename]))
+
+    # The index depends on the classes requested.
+    dir_iterator = generator.flow_from_directory(
+        image_dir, classes=['class-1'], index_path=index_path)
+    self.assertEqual(dir_iterator.samples, 3)
+
+  def test_directory_iterator_cache(self):
+    if PIL is None:
+      return  # Skip test if PIL is not available.
+
+    temp_dir = self.get_temp_dir()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    image_dir = os.path.join(temp_dir, 'images')
+    os.makedirs(os.path.join(image_dir, 'class-0'))
+    num_images = 0
+    for test_images in _generate_test_images():
+      for im in test_images:
+        im.save(os.path.join(image_dir, 'class-0',
+                             'image-{}.png'.format(num_images)))
+        num_images += 1
+
+    generator = keras.preprocessing.image.ImageDataGenerator()
+    uncached = generator.flow_from_directory(
+        image_dir, target_size=(10, 10), batch_size=5, shuffle=False)
+    self.assertIsNone(uncached.cache_stats())
+    expected = [next(uncached)[0] for _ in range(8)]
+
+    for cache_path in (None, os.path.join(temp_dir, 'cache')):
+      cached = generator.flow_from_directory(
+          image_dir,
+          target_size=(10, 10),
+          batch_size=5,
+          shuffle=False,
+          decode_workers=3,
+          cache_size=100,
+          cache_path=cache_path)
+      # Two epochs; the second one is served from the cache.
+      for i in range(8):
+        self.assertAllClose(next(cached)[0], expected[i])
+      stats = cached.cache_stats()
+      self.assertEqual(stats.misses, num_images)
+      self.assertEqual(stats.hits, num_images)
+      self.assertEqual(stats.num_cached, num_images)
+      self.assertEqual(stats.capacity, num_images)
+    # Both cached iterators decoded on the same process-wide pool.
+    self.assertEqual(len(keras.preprocessing.image._DECODE_POOLS), 1)
+
+    small = generator.flow_from_directory(
+        image_dir, target_size=(10, 10), batch_size=5, shuffle=False,
+        cache_size=3)
+    for i in range(8):
+      self.assertAllClose(next(small)[0], expected[i])
+    self.assertEqual(small.cache_stats().num_cached, 3)
+    self.assertEqual(small.cache_stats().hits, 3)
+
   def test_img_utils(self):
     if PIL is None:
       return  # Skip test if PIL is not available.
@@ -226,6 +333,115 @@ class TestImage(test.TestCase):
     x = keras.preprocessing.image.img_to_array(img, data_format='channels_last')
     self.assertEqual(x.shape, (height, width, 1))
 
+  def test_apply_transform_batch(self):
+    generator = keras.preprocessing.image.ImageDataGenerator(
+        rotation_range=30.,
+        width_shift_range=0.2,
+        height_shift_range=0.2,
+        shear_range=0.3,
+        zoom_range=0.2)
+    for data_format, channel_axis in (('channels_last', 3),
+                                      ('channels_first', 1)):
+      shape = [16, 12, 10, 12]
+      shape[channel_axis] = 3
+      x = np.random.random(shape)
+      for fill_mode in ('constant', 'nearest', 'reflect', 'wrap'):
+        matrices = generator.random_transform_matrices(16, 12, 10)
+        expected = np.stack([
+            keras.preprocessing.image.apply_transform(
+                x[i], matrices[i], channel_axis - 1, fill_mode, cval=0.5)
+            for i in range(16)])
+        result = keras.preprocessing.image.apply_transform_batch(
+            x, matrices, channel_axis, fill_mode, cval=0.5)
+        self.assertEqual(result.shape, x.shape)
+        # Nearest-neighbour lookups may round differently at exact ties.
+        mismatches = np.mean(~np.isclose(result, expected))
+        self.assertLess(mismatches, 0.01, msg=(data_format, fill_mode))
+
+  def test_random_transform_matrices(self):
+    generator = keras.preprocessing.image.ImageDataGenerator(
+        rotation_range=30.,
+        width_shift_range=0.2,
+        height_shift_range=0.1,
+        shear_range=0.3,
+        zoom_range=0.2)
+    np.random.seed(1)
+    matrices = generator.random_transform_matrices(4, 12, 10)
+    np.random.seed(1)
+    theta = np.pi / 180 * np.random.uniform(-30., 30., 4)
+    tx = np.random.uniform(-0.1, 0.1, 4) * 12
+    ty = np.random.uniform(-0.2, 0.2, 4) * 10
+    shear = np.random.uniform(-0.3, 0.3, 4)
+    zx, zy = np.random.uniform(0.8, 1.2, (2, 4))
+    for i in range(4):
+      rotation = np.array([[np.cos(theta[i]), -np.sin(theta[i]), 0],
+                           [np.sin(theta[i]), np.cos(theta[i]), 0],
+                           [0, 0, 1]])
+      shift = np.array([[1, 0, tx[i]], [0, 1, ty[i]], [0, 0, 1]])
+      shear_matrix = np.array([[1, -np.sin(shear[i]), 0],
+                               [0, np.cos(shear[i]), 0], [0, 0, 1]])
+      zoom = np.array([[zx[i], 0, 0], [0, zy[i], 0], [0, 0, 1]])
+      expected = np.dot(np.dot(np.dot(rotation, shift), shear_matrix), zoom)
+      expected = keras.preprocessing.image.transform_matrix_offset_center(
+          expected, 12, 10)
+      self.assertAllClose(matrices[i], expected)
+
+  def test_random_transform_batch(self):
+    x = np.random.random((32, 6, 5, 3))
+    generator = keras.preprocessing.image.ImageDataGenerator(
+        horizontal_flip=True, data_format='channels_last')
+    x_orig = x.copy()
+    result = generator.random_transform_batch(x)
+    # The input is left untouched.
+    self.assertTrue(np.array_equal(x, x_orig))
+    for i in range(32):
+      self.assertTrue(np.array_equal(result[i], x[i]) or
+                      np.array_equal(result[i], x[i, :, ::-1]))
+
+    generator = keras.preprocessing.image.ImageDataGenerator(
+        rotation_range=90.,
+        channel_shift_range=0.1,
+        data_format='channels_first')
+    x = np.random.random((8, 3, 6, 6))
+    result = generator.random_transform_batch(x)
+    self.assertEqual(result.shape, x.shape)
+    self.assertLessEqual(np.max(result), np.max(x))
+    self.assertGreaterEqual(np.min(result), np.min(x))
+
+
+class ImageDataGeneratorBenchmark(test.Benchmark):
+
+  def _benchmark_transform(self, name, transform, x, iters=5):
+    transform(x)
+    start = time.time()
+    for _ in range(iters):
+      transform(x)
+    wall_time = (time.time() - start) / iters
+    self.report_benchmark(
+        name=name,
+        iters=iters,
+        wall_time=wall_time,
+        extras={'images_per_second': x.shape[0] / wall_time})
+
+  def benchmarkRandomTransform(self):
+    generator = keras.preprocessing.image.ImageDataGenerator(
+        rotation_range=20.,
+        width_shift_range=0.1,
+        height_shift_range=0.1,
+        shear_range=0.1,
+        zoom_range=0.1,
+        channel_shift_range=0.1,
+        horizontal_flip=True,
+        data_format='channels_last')
+    x = np.random.random((64, 128, 128, 3)).astype('float32')
+
+    def per_image(x):
+      return np.stack([generator.random_transform(image) for image in x])
+
+    self._benchmark_transform('random_transform_per_image', per_image, x)
+    self._benchmark_transform('random_transform_batch',
+                              generator.random_transform_batch, x)
+
 
 if __name__ == '__main__':
   test.main()
@@ -18,7 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import random
+import itertools
 
 import numpy as np
 from six.moves import range  # pylint: disable=redefined-builtin
@@ -63,44 +63,64 @@ def pad_sequences(sequences,
       raise ValueError('`sequences` must be a list of iterables. '
                        'Found non-iterable: ' + str(x))
     lengths.append(len(x))
+  if truncating not in {'pre', 'post'}:
+    raise ValueError('Truncating type "%s" not understood' % truncating)
+  if padding not in {'pre', 'post'}:
+    raise ValueError('Padding type "%s" not understood' % padding)
 
   num_samples = len(sequences)
+  lengths = np.array(lengths, dtype='int64')
   if maxlen is None:
     maxlen = np.max(lengths)
 
   # take the sample shape from the first non empty sequence
-  # checking for consistency in the main loop below.
+  # checking for consistency below.
   sample_shape = tuple()
   for s in sequences:
     if len(s) > 0:  # pylint: disable=g-explicit-length-test
       sample_shape = np.asarray(s).shape[1:]
       break
 
-  x = (np.ones((num_samples, maxlen) + sample_shape) * value).astype(dtype)
-  for idx, s in enumerate(sequences):
-    if not len(s):  # pylint: disable=g-explicit-length-test
-      continue  # empty list/array was found
+  # Concatenates all sequences into one flat array. Sequences of numeric
+  # scalars are read in one pass; anything else goes through `np.asarray`,
+  # which also checks the shape of each sample.
+  flat = None
+  if not sample_shape and np.dtype(dtype).kind in 'biufc':
+    try:
+      flat = np.fromiter(itertools.chain.from_iterable(sequences),
+                         dtype=dtype, count=int(np.sum(lengths)))
+    except (TypeError, ValueError):
+      # A sample is not a scalar; the loop below reports which one.
+      pass
+  if flat is None:
+    samples = []
+    for idx, s in enumerate(sequences):
+      s = np.asarray(s, dtype=dtype)
+      if len(s) and s.shape[1:] != sample_shape:
+        raise ValueError(
+            'Shape of sample %s of sequence at position %s is different from '
+            'expected shape %s'
+            % (s.shape[1:], idx, sample_shape))
+      samples.append(s.reshape((len(s),) + sample_shape))
+    flat = (np.concatenate(samples) if samples
+            else np.zeros((0,) + sample_shape, dtype=dtype))
+
+  # Drops the truncated samples, then copies the remaining ones into place
+  # with a single masked assignment, which fills the rows in order.
+  kept = np.minimum(lengths, maxlen)
+  if np.any(kept < lengths):
+    positions = np.arange(len(flat)) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths)
     if truncating == 'pre':
-      trunc = s[-maxlen:]  # pylint: disable=invalid-unary-operand-type
-    elif truncating == 'post':
-      trunc = s[:maxlen]
-    else:
-      raise ValueError('Truncating type "%s" not understood' % truncating)
-
-    # check `trunc` has expected shape
-    trunc = np.asarray(trunc, dtype=dtype)
-    if trunc.shape[1:] != sample_shape:
-      raise ValueError(
-          'Shape of sample %s of sequence at position %s is different from '
-          'expected shape %s'
-          % (trunc.shape[1:], idx, sample_shape))
-
-    if padding == 'post':
-      x[idx, :len(trunc)] = trunc
-    elif padding == 'pre':
-      x[idx, -len(trunc):] = trunc
+      flat = flat[positions >= np.repeat(lengths - kept, lengths)]
     else:
-      raise ValueError('Padding type "%s" not understood' % padding)
+      flat = flat[positions < np.repeat(kept, lengths)]
+  columns = np.arange(maxlen)
+  starts = maxlen - kept if padding == 'pre' else np.zeros_like(kept)
+  mask = ((columns >= starts[:, np.newaxis]) &
+          (columns < (starts + kept)[:, np.newaxis]))
+  x = (np.ones((num_samples, maxlen) + sample_shape) * value).astype(dtype)
+  x[mask] = flat
   return x
 
 
@@ -137,6 +157,55 @@ def make_sampling_table(size, sampling_factor=1e-5):
   return np.minimum(1., f / np.sqrt(f))
 
 
+def _skipgram_arrays(sequence, vocabulary_size, window_size,
+                     negative_samples, shuffle, sampling_table):
+  """Generates the skipgram pairs of one sequence as Numpy arrays.
+
+  See `skipgrams` for a description of the arguments.
+
+  Returns:
+      A tuple `(couples, labels)` of an int64 array of shape `(n, 2)` and an
+      int64 array of shape `(n,)`.
+  """
+  sequence = np.asarray(sequence, dtype='int64').reshape((-1,))
+  n = len(sequence)
+  keep = sequence != 0
+  if sampling_table is not None:
+    keep &= np.asarray(sampling_table)[sequence] >= np.random.random(n)
+
+  # Row i holds the context positions of word i, in increasing order.
+  window = np.concatenate([np.arange(-window_size, 0),
+                           np.arange(1, window_size + 1)])
+  context = np.arange(n)[:, np.newaxis] + window
+  valid = keep[:, np.newaxis] & (context >= 0) & (context < n)
+  valid[valid] = sequence[context[valid]] != 0
+  targets = np.broadcast_to(sequence[:, np.newaxis], context.shape)[valid]
+  contexts = sequence[context[valid]]
+  labels = np.ones(len(targets), dtype='int64')
+
+  num_negative_samples = int(len(labels) * negative_samples)
+  if num_negative_samples > 0:
+    words = np.random.permutation(targets)
+    targets = np.concatenate(
+        [targets, words[np.arange(num_negative_samples) % len(words)]])
+    contexts = np.concatenate([
+        contexts,
+        np.random.randint(1, vocabulary_size, num_negative_samples)])
+    labels = np.concatenate(
+        [labels, np.zeros(num_negative_samples, dtype='int64')])
+
+  couples = np.stack([targets, contexts], axis=1).astype('int64')
+  if shuffle:
+    permutation = np.random.permutation(len(labels))
+    couples = couples[permutation]
+    labels = labels[permutation]
+  return couples, labels
+
+
+def _categorical_labels(labels):
+  return np.stack([1 - labels, labels], axis=1)
+
+
 def skipgrams(sequence,
               vocabulary_size,
               window_size=4,
@@ -151,6 +220,10 @@ def skipgrams(sequence,
   where label = 1 if 'other_word' belongs to the context of 'word',
   and label=0 if 'other_word' is randomly sampled
 
+  The pairs are computed with vectorized Numpy operations, and random
+  numbers are drawn from Numpy's random number generator. To stream the
+  pairs of a large corpus, see `skipgrams_generator`.
+
   Arguments:
       sequence: a word sequence (sentence), encoded as a list
           of word indices (integers). If using a `sampling_table`,
@@ -178,45 +251,71 @@ def skipgrams(sequence,
       By convention, index 0 in the vocabulary is
       a non-word and will be skipped.
   """
-  couples = []
-  labels = []
-  for i, wi in enumerate(sequence):
-    if not wi:
-      continue
-    if sampling_table is not None:
-      if sampling_table[wi] < random.random():
-        continue
-
-    window_start = max(0, i - window_size)
-    window_end = min(len(sequence), i + window_size + 1)
-    for j in range(window_start, window_end):
-      if j != i:
-        wj = sequence[j]
-        if not wj:
-          continue
-        couples.append([wi, wj])
-        if categorical:
-          labels.append([0, 1])
-        else:
-          labels.append(1)
-
-  if negative_samples > 0:
-    num_negative_samples = int(len(labels) * negative_samples)
-    words = [c[0] for c in couples]
-    random.shuffle(words)
-
-    couples += [[words[i % len(words)], random.randint(1, vocabulary_size - 1)]
-                for i in range(num_negative_samples)]
-    if categorical:
-      labels += [[1, 0]] * num_negative_samples
-    else:
-      labels += [0] * num_negative_samples
+  couples, labels = _skipgram_arrays(sequence, vocabulary_size, window_size,
+                                     negative_samples, shuffle, sampling_table)
+  if categorical:
+    labels = _categorical_labels(labels)
+  return couples.tolist(), labels.tolist()
+
+
+def skipgrams_generator(sequences,
+                        vocabulary_size,
+                        window_size=4,
+                        negative_samples=1.,
+                        shuffle=True,
+                        categorical=False,
+                        sampling_table=None,
+                        chunk_size=8192):
+  """Streams the skipgram word pairs of many sequences in fixed-size chunks.
+
+  Generates the same pairs as calling `skipgrams` on every sequence in turn,
+  without materializing the pairs of the whole corpus. Pairs are shuffled
+  within each sequence.
 
-  if shuffle:
-    seed = random.randint(0, 10e6)
-    random.seed(seed)
-    random.shuffle(couples)
-    random.seed(seed)
-    random.shuffle(labels)
+  Arguments:
+      sequences: an iterable of word sequences, e.g. a generator over the
+          sentences of a corpus.
+      vocabulary_size: int. maximum possible word index + 1
+      window_size: int. actually half-window.
+      negative_samples: float >= 0. 0 for no negative (=random) samples.
+          1 for same number as positive samples. etc.
+      shuffle: whether to shuffle the word couples of each sequence.
+      categorical: bool. if True, labels will be categorical.
+      sampling_table: 1D array of size `vocabulary_size` where the entry i
+          encodes the probabibily to sample a word of rank i.
+      chunk_size: int, number of pairs per chunk.
 
-  return couples, labels
+  Yields:
+      Tuples `(couples, labels)`, where `couples` is an int64 Numpy array of
+      shape `(chunk_size, 2)` and `labels` an array of shape `(chunk_size,)`,
+      or `(chunk_size, 2)` if `categorical`. The last chunk may be smaller.
+  """
+  pending_couples = []
+  pending_labels = []
+  num_pending = 0
+  for sequence in sequences:
+    couples, labels = _skipgram_arrays(sequence, vocabulary_size, window_size,
+                                       negative_samples, shuffle,
+                                       sampling_table)
+    if not len(labels):  # pylint: disable=g-explicit-length-test
+      continue
+    pending_couples.append(couples)
+    pending_labels.append(labels)
+    num_pending += len(labels)
+    if num_pending < chunk_size:
+      continue
+    couples = np.concatenate(pending_couples)
+    labels = np.concatenate(pending_labels)
+    num_full = num_pending - num_pending % chunk_size
+    for start in range(0, num_full, chunk_size):
+      chunk_labels = labels[start:start + chunk_size]
+      yield (couples[start:start + chunk_size],
+             _categorical_labels(chunk_labels) if categorical
+             else chunk_labels)
+    pending_couples = [couples[num_full:]]
+    pending_labels = [labels[num_full:]]
+    num_pending -= num_full
+  if num_pending:
+    labels = np.concatenate(pending_labels)
+    yield (np.concatenate(pending_couples),
+           _categorical_labels(labels) if categorical else labels)
@@ -47,6 +47,32 @@ class TestSequence(test.TestCase):
     b = keras.preprocessing.sequence.pad_sequences(a, maxlen=3, value=1)
     self.assertAllClose(b, [[1, 1, 1], [1, 1, 2], [1, 2, 3]])
 
+  def test_pad_sequences_mixed(self):
+    a = [np.array([1, 2, 3, 4]), [], (5,), [6, 7]]
+    b = keras.preprocessing.sequence.pad_sequences(
+        a, maxlen=3, padding='post', truncating='post', value=-1)
+    self.assertAllClose(b, [[1, 2, 3], [-1, -1, -1], [5, -1, -1],
+                            [6, 7, -1]])
+    b = keras.preprocessing.sequence.pad_sequences(a, dtype='float32')
+    self.assertEqual(b.dtype, np.float32)
+    self.assertAllClose(b, [[1, 2, 3, 4], [0, 0, 0, 0], [0, 0, 0, 5],
+                            [0, 0, 6, 7]])
+
+    with self.assertRaises(ValueError):
+      keras.preprocessing.sequence.pad_sequences(a, padding='middle')
+    with self.assertRaises(ValueError):
+      keras.preprocessing.sequence.pad_sequences(a, truncating='middle')
+    with self.assertRaises(ValueError):
+      keras.preprocessing.sequence.pad_sequences([[[1, 1]], [[1, 2, 3]]])
+    with self.assertRaisesRegexp(ValueError, 'Shape of sample'):
+      keras.preprocessing.sequence.pad_sequences([[1, 2], [[1, 2]]])
+
+  def test_pad_sequences_object(self):
+    b = keras.preprocessing.sequence.pad_sequences(
+        [[1, 'a'], [2]], dtype=object)
+    self.assertEqual(b.dtype, object)
+    self.assertEqual(b.tolist(), [[1, 'a'], [0, 2]])
+
   def test_pad_sequences_vector(self):
     a = [[[1, 1]], [[2, 1], [2, 2]], [[3, 1], [3, 2], [3, 3]]]
 
@@ -94,6 +120,38 @@ class TestSequence(test.TestCase):
     for l in labels:
       assert len(l) == 2
 
+  def test_skipgrams_pairs(self):
+    couples, labels = keras.preprocessing.sequence.skipgrams(
+        [1, 2, 0, 3], vocabulary_size=4, window_size=2, negative_samples=0.,
+        shuffle=False)
+    self.assertEqual(couples, [[1, 2], [2, 1], [2, 3], [3, 2]])
+    self.assertEqual(labels, [1, 1, 1, 1])
+
+    couples, labels = keras.preprocessing.sequence.skipgrams(
+        [1, 2, 0, 3], vocabulary_size=4, window_size=2, negative_samples=2.)
+    self.assertEqual(len(couples), 12)
+    self.assertEqual(sorted(labels), [0] * 8 + [1] * 4)
+    for couple, label in zip(couples, labels):
+      if not label:
+        self.assertIn(couple[0], [1, 2, 3])
+        self.assertIn(couple[1], [1, 2, 3])
+
+  def test_skipgrams_generator(self):
+    sequences = [np.arange(1, 10), [], np.arange(1, 4), np.arange(1, 30)]
+    chunks = list(keras.preprocessing.sequence.skipgrams_generator(
+        sequences, vocabulary_size=30, window_size=2, negative_samples=1.,
+        categorical=True, chunk_size=16))
+    total = sum(len(labels) for _, labels in chunks)
+    # Positive pairs: 4 per word, minus the 6 cut by the sequence ends.
+    self.assertEqual(total, 2 * ((9 * 4 - 6) + (3 * 4 - 6) + (29 * 4 - 6)))
+    for couples, labels in chunks[:-1]:
+      self.assertEqual(couples.shape, (16, 2))
+      self.assertEqual(labels.shape, (16, 2))
+    self.assertLessEqual(len(chunks[-1][1]), 16)
+    all_labels = np.concatenate([labels for _, labels in chunks])
+    self.assertAllClose(np.sum(all_labels, axis=1), np.ones(total))
+    self.assertEqual(np.sum(all_labels[:, 1]), total // 2)
+
 
 if __name__ == '__main__':
   test.main()
@@ -20,6 +20,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import itertools
+import multiprocessing
 import string
 import sys
 import warnings
@@ -28,6 +31,13 @@ import numpy as np
 from six.moves import range  # pylint: disable=redefined-builtin
 from six.moves import zip  # pylint: disable=redefined-builtin
 
+# pylint: disable=g-import-not-at-top
+try:
+  import scipy.sparse as sp
+except ImportError:
+  sp = None
+# pylint: enable=g-import-not-at-top
+
 
 if sys.version_info < (3,):
   maketrans = string.maketrans
@@ -66,6 +76,42 @@ def one_hot(text,
   return [(abs(hash(w)) % (n - 1) + 1) for w in seq]
 
 
+def _count_words(args):
+  """Counts the words of a chunk of texts.
+
+  A module-level function, so that it can be run in a worker process.
+
+  Arguments:
+      args: Tuple `(texts, filters, lower, split, char_level)`.
+
+  Returns:
+      A tuple `(document_count, word_counts, word_docs)`, where `word_counts`
+      and `word_docs` are `Counter`s of the number of occurrences of each word
+      and of the number of texts it occurs in.
+  """
+  texts, filters, lower, split, char_level = args
+  word_counts = collections.Counter()
+  word_docs = collections.Counter()
+  document_count = 0
+  for text in texts:
+    document_count += 1
+    seq = text if char_level else text_to_word_sequence(
+        text, filters, lower, split)
+    word_counts.update(seq)
+    word_docs.update(set(seq))
+  return document_count, word_counts, word_docs
+
+
+def _chunks(iterable, size):
+  """Splits an iterable into lists of up to `size` elements."""
+  iterator = iter(iterable)
+  while True:
+    chunk = list(itertools.islice(iterator, size))
+    if not chunk:
+      return
+    yield chunk
+
+
 class Tokenizer(object):
   """Text tokenization utility class.
 
@@ -84,6 +130,11 @@ class Tokenizer(object):
       lower: boolean. Whether to convert the texts to lowercase.
       split: character or string to use for token splitting.
       char_level: if True, every character will be treated as a word.
+      max_vocab_size: if set, the maximum number of distinct words counted
+          while fitting, to bound the memory used on large corpora. Whenever
+          the vocabulary grows past it, the rarest words are pruned (first
+          those seen once, then those seen at most twice, and so on), so the
+          counts of rare words are approximate, while frequent words are kept.
 
   By default, all punctuation is removed, turning the texts into
   space-separated sequences of words
@@ -99,6 +150,7 @@ class Tokenizer(object):
                lower=True,
                split=' ',
                char_level=False,
+               max_vocab_size=None,
                **kwargs):
     # Legacy support
     if 'nb_words' in kwargs:
@@ -116,31 +168,45 @@ class Tokenizer(object):
     self.num_words = num_words
     self.document_count = 0
     self.char_level = char_level
+    self.max_vocab_size = max_vocab_size
+    # Words seen at most this many times are dropped on the next pruning.
+    self._min_reduce = 1
 
-  def fit_on_texts(self, texts):
+  def fit_on_texts(self, texts, workers=1, chunk_size=10000):
     """Updates internal vocabulary based on a list of texts.
 
     Required before using `texts_to_sequences` or `texts_to_matrix`.
+    The texts are read in chunks, so a generator over a corpus that does
+    not fit in memory can be passed; combined with `max_vocab_size`, the
+    memory used is bounded.
 
     Arguments:
         texts: can be a list of strings,
             or a generator of strings (for memory-efficiency)
+        workers: number of processes counting the words of chunks of texts
+            in parallel. Their partial counts are merged in order.
+        chunk_size: number of texts handed to a worker at a time.
     """
     self.document_count = 0
-    for text in texts:
-      self.document_count += 1
-      seq = text if self.char_level else text_to_word_sequence(
-          text, self.filters, self.lower, self.split)
-      for w in seq:
-        if w in self.word_counts:
-          self.word_counts[w] += 1
-        else:
-          self.word_counts[w] = 1
-      for w in set(seq):
-        if w in self.word_docs:
-          self.word_docs[w] += 1
-        else:
-          self.word_docs[w] = 1
+    chunks = ((chunk, self.filters, self.lower, self.split, self.char_level)
+              for chunk in _chunks(texts, chunk_size))
+    if workers > 1:
+      # `Pool.imap` would read the whole generator ahead of the workers, so
+      # keep at most `2 * workers` chunks in flight and merge them in order.
+      pool = multiprocessing.Pool(workers)
+      try:
+        pending = collections.deque()
+        for chunk in chunks:
+          if len(pending) >= 2 * workers:
+            self._merge_counts(*pending.popleft().get())
+          pending.append(pool.apply_async(_count_words, (chunk,)))
+        while pending:
+          self._merge_counts(*pending.popleft().get())
+      finally:
+        pool.terminate()
+    else:
+      for chunk in chunks:
+        self._merge_counts(*_count_words(chunk))
 
     wcounts = list(self.word_counts.items())
     wcounts.sort(key=lambda x: x[1], reverse=True)
@@ -153,6 +219,25 @@ class Tokenizer(object):
     for w, c in list(self.word_docs.items()):
       self.index_docs[self.word_index[w]] = c
 
+  def _merge_counts(self, document_count, word_counts, word_docs):
+    """Adds partial counts to the vocabulary, pruning it if necessary."""
+    self.document_count += document_count
+    for w, c in word_counts.items():
+      self.word_counts[w] = self.word_counts.get(w, 0) + c
+    for w, c in word_docs.items():
+      self.word_docs[w] = self.word_docs.get(w, 0) + c
+    if self.max_vocab_size:
+      while len(self.word_counts) > self.max_vocab_size:
+        self._prune_vocab()
+
+  def _prune_vocab(self):
+    """Drops the words seen at most `self._min_reduce` times."""
+    for w, c in list(self.word_counts.items()):
+      if c <= self._min_reduce:
+        del self.word_counts[w]
+        del self.word_docs[w]
+    self._min_reduce += 1
+
   def fit_on_sequences(self, sequences):
     """Updates internal vocabulary based on a list of sequences.
 
@@ -216,33 +301,38 @@ class Tokenizer(object):
             vect.append(i)
       yield vect
 
-  def texts_to_matrix(self, texts, mode='binary'):
+  def texts_to_matrix(self, texts, mode='binary', sparse=False):
     """Convert a list of texts to a Numpy matrix.
 
     Arguments:
         texts: list of strings.
         mode: one of "binary", "count", "tfidf", "freq".
+        sparse: whether to return a `scipy.sparse.csr_matrix` instead of a
+            dense Numpy matrix, for large vocabularies.
 
     Returns:
-        A Numpy matrix.
+        A Numpy matrix, or a `scipy.sparse.csr_matrix` if `sparse` is True.
     """
     sequences = self.texts_to_sequences(texts)
-    return self.sequences_to_matrix(sequences, mode=mode)
+    return self.sequences_to_matrix(sequences, mode=mode, sparse=sparse)
 
-  def sequences_to_matrix(self, sequences, mode='binary'):
+  def sequences_to_matrix(self, sequences, mode='binary', sparse=False):
     """Converts a list of sequences into a Numpy matrix.
 
     Arguments:
         sequences: list of sequences
             (a sequence is a list of integer word indices).
         mode: one of "binary", "count", "tfidf", "freq"
+        sparse: whether to return a `scipy.sparse.csr_matrix` instead of a
+            dense Numpy matrix, for large vocabularies.
 
     Returns:
-        A Numpy matrix.
+        A Numpy matrix, or a `scipy.sparse.csr_matrix` if `sparse` is True.
 
     Raises:
         ValueError: In case of invalid `mode` argument,
             or if the Tokenizer requires to be fit to sample data.
+        ImportError: if `sparse` is True and Scipy is not available.
     """
     if not self.num_words:
       if self.word_index:
@@ -253,36 +343,51 @@ class Tokenizer(object):
     else:
       num_words = self.num_words
 
+    if mode not in {'binary', 'count', 'tfidf', 'freq'}:
+      raise ValueError('Unknown vectorization mode:', mode)
     if mode == 'tfidf' and not self.document_count:
       raise ValueError('Fit the Tokenizer on some data '
                        'before using tfidf mode.')
-
+    if sparse and sp is None:
+      raise ImportError('Scipy is required for sparse matrices.')
+
+    # Builds the matrix in compressed sparse row form: the nonzero entries of
+    # row i are indices[indptr[i]:indptr[i + 1]] and counts[...].
+    indptr = [0]
+    indices = []
+    counts = []
+    seq_lengths = []
+    for seq in sequences:
+      row_counts = collections.Counter(j for j in seq if j < num_words)
+      indices.extend(row_counts.keys())
+      counts.extend(row_counts.values())
+      indptr.append(len(indices))
+      seq_lengths.append(len(seq))
+    indptr = np.array(indptr, dtype='int64')
+    indices = np.array(indices, dtype='int64')
+    counts = np.array(counts, dtype='float64')
+
+    if mode == 'count':
+      values = counts
+    elif mode == 'freq':
+      row_lengths = np.repeat(np.array(seq_lengths, dtype='float64'),
+                              np.diff(indptr))
+      values = counts / row_lengths
+    elif mode == 'binary':
+      values = np.ones_like(counts)
+    else:
+      # Use weighting scheme 2 in
+      # https://en.wikipedia.org/wiki/Tf%E2%80%93idf
+      tf = 1 + np.log(counts)
+      index_docs = np.array([self.index_docs.get(j, 0) for j in indices],
+                            dtype='float64')
+      idf = np.log(1 + self.document_count / (1 + index_docs))
+      values = tf * idf
+
+    if sparse:
+      return sp.csr_matrix(
+          (values, indices, indptr), shape=(len(sequences), num_words))
     x = np.zeros((len(sequences), num_words))
-    for i, seq in enumerate(sequences):
-      if not seq:
-        continue
-      counts = {}
-      for j in seq:
-        if j >= num_words:
-          continue
-        if j not in counts:
-          counts[j] = 1.
-        else:
-          counts[j] += 1
-      for j, c in list(counts.items()):
-        if mode == 'count':
-          x[i][j] = c
-        elif mode == 'freq':
-          x[i][j] = c / len(seq)
-        elif mode == 'binary':
-          x[i][j] = 1
-        elif mode == 'tfidf':
-          # Use weighting scheme 2 in
-          # https://en.wikipedia.org/wiki/Tf%E2%80%93idf
-          tf = 1 + np.log(c)
-          idf = np.log(1 + self.document_count /
-                       (1 + self.index_docs.get(j, 0)))
-          x[i][j] = tf * idf
-        else:
-          raise ValueError('Unknown vectorization mode:', mode)
+    rows = np.repeat(np.arange(len(sequences)), np.diff(indptr))
+    x[rows, indices] = values
     return x
@@ -54,6 +54,85 @@ class TestText(test.TestCase):
       matrix = tokenizer.texts_to_matrix(texts, mode)
       self.assertEqual(matrix.shape, (3, 10))
 
+  def test_sequences_to_matrix(self):
+    tokenizer = keras.preprocessing.text.Tokenizer(num_words=5)
+    tokenizer.document_count = 3
+    tokenizer.index_docs = {1: 2, 2: 1}
+    sequences = [[1, 1, 2, 7], [], [3]]
+    self.assertAllClose(
+        tokenizer.sequences_to_matrix(sequences, mode='count'),
+        [[0, 2, 1, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 1, 0]])
+    self.assertAllClose(
+        tokenizer.sequences_to_matrix(sequences, mode='freq'),
+        [[0, 0.5, 0.25, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 1, 0]])
+    self.assertAllClose(
+        tokenizer.sequences_to_matrix(sequences, mode='binary'),
+        [[0, 1, 1, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 1, 0]])
+    tfidf = tokenizer.sequences_to_matrix(sequences, mode='tfidf')
+    self.assertAllClose(tfidf[0, 1], (1 + np.log(2)) * np.log(1 + 3 / 3))
+    self.assertAllClose(tfidf[2, 3], np.log(1 + 3 / 1))
+    with self.assertRaises(ValueError):
+      tokenizer.sequences_to_matrix(sequences, mode='unknown')
+
+  def test_sparse_matrix(self):
+    if keras.preprocessing.text.sp is None:
+      return  # Skip test if Scipy is not available.
+    texts = [
+        'The cat sat on the mat.',
+        'The dog sat on the log.',
+        'Dogs and cats living together.'
+    ]
+    tokenizer = keras.preprocessing.text.Tokenizer()
+    tokenizer.fit_on_texts(texts)
+    for mode in ['binary', 'count', 'tfidf', 'freq']:
+      matrix = tokenizer.texts_to_matrix(texts, mode, sparse=True)
+      self.assertEqual(matrix.format, 'csr')
+      self.assertAllClose(matrix.toarray(),
+                          tokenizer.texts_to_matrix(texts, mode))
+
+  def test_fit_on_texts_in_parallel(self):
+    texts = ['the cat sat on the mat', 'the dog sat on the log',
+             'dogs and cats living together'] * 3
+    tokenizer = keras.preprocessing.text.Tokenizer()
+    tokenizer.fit_on_texts(texts)
+    parallel_tokenizer = keras.preprocessing.text.Tokenizer()
+    parallel_tokenizer.fit_on_texts(iter(texts), workers=2, chunk_size=2)
+    self.assertEqual(parallel_tokenizer.document_count, 9)
+    self.assertEqual(parallel_tokenizer.word_counts, tokenizer.word_counts)
+    self.assertEqual(parallel_tokenizer.word_docs, tokenizer.word_docs)
+    self.assertEqual(parallel_tokenizer.word_index, tokenizer.word_index)
+
+  def test_fit_on_texts_in_parallel_is_bounded(self):
+    consumed = [0]
+
+    def texts():
+      for i in range(1000):
+        consumed[0] += 1
+        yield 'text number %d' % i
+
+    consumed_at_merge = []
+
+    class RecordingTokenizer(keras.preprocessing.text.Tokenizer):
+
+      def _merge_counts(self, *counts):
+        consumed_at_merge.append(consumed[0])
+        super(RecordingTokenizer, self)._merge_counts(*counts)
+
+    tokenizer = RecordingTokenizer()
+    tokenizer.fit_on_texts(texts(), workers=2, chunk_size=10)
+    self.assertEqual(tokenizer.document_count, 1000)
+    # At most 2 * workers chunks are in flight, plus the one being read.
+    self.assertLessEqual(consumed_at_merge[0], (2 * 2 + 1) * 10)
+
+  def test_max_vocab_size(self):
+    texts = ['common word%d' % i for i in range(100)]
+    tokenizer = keras.preprocessing.text.Tokenizer(max_vocab_size=10)
+    tokenizer.fit_on_texts(texts, chunk_size=7)
+    self.assertLessEqual(len(tokenizer.word_counts), 10)
+    self.assertEqual(tokenizer.word_index['common'], 1)
+    self.assertEqual(tokenizer.word_counts['common'], 100)
+    self.assertEqual(tokenizer.word_docs['common'], 100)
+
 
 if __name__ == '__main__':
   test.main()
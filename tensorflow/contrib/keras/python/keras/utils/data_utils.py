@@ -12,20 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-"""Utilities for file download and caching."""
+"""Utilities for file download and caching, and for feeding data."""
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import functools
 import hashlib
+import multiprocessing
 import os
 import shutil
 import sys
 import tarfile
+import threading
+import time
+import traceback
 import zipfile
 
+import numpy as np
 import six
+from six.moves import queue
 from six.moves.urllib.error import HTTPError
 from six.moves.urllib.error import URLError
 from six.moves.urllib.request import urlopen
@@ -294,3 +301,303 @@ def validate_file(fpath, file_hash, algorithm='auto', chunk_size=65535):
     return True
   else:
     return False
+
+
+class Sequence(object):
+  """Base object for fitting to a sequence of data, such as a dataset.
+
+  Every `Sequence` must implement the `__getitem__` and the `__len__` methods.
+  Unlike a generator, a `Sequence` can be read by several workers at once
+  without them producing duplicate batches, since each worker is handed
+  different batch indices, and the batches are returned in order.
+
+  Examples:
+
+  ```python
+      class CIFAR10Sequence(Sequence):
+
+          def __init__(self, x_set, y_set, batch_size):
+              self.x, self.y = x_set, y_set
+              self.batch_size = batch_size
+
+          def __len__(self):
+              return len(self.x) // self.batch_size
+
+          def __getitem__(self, idx):
+              start = idx * self.batch_size
+              stop = start + self.batch_size
+              return np.array(self.x[start:stop]), np.array(self.y[start:stop])
+  ```
+  """
+
+  def __getitem__(self, index):
+    """Gets batch at position `index`.
+
+    Arguments:
+        index: position of the batch in the Sequence.
+
+    Returns:
+        A batch
+    """
+    raise NotImplementedError
+
+  def __len__(self):
+    """Number of batches in the Sequence.
+
+    Returns:
+        The number of batches in the Sequence.
+    """
+    raise NotImplementedError
+
+
+EnqueuerStats = collections.namedtuple(
+    'EnqueuerStats',
+    ['num_batches', 'num_starved', 'wait_time', 'mean_queue_size'])
+
+
+class QueueStats(object):
+  """Tracks how well an enqueuer keeps up with its consumer.
+
+  A batch is counted as starved if the queue was empty when it was requested,
+  i.e. if the consumer had to wait for the workers.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._num_batches = 0
+    self._num_starved = 0
+    self._wait_time = 0.
+    self._queue_size_sum = 0
+    self._num_queue_sizes = 0
+
+  def record(self, wait_time, starved, queue_size):
+    """Records the retrieval of one batch.
+
+    Arguments:
+        wait_time: seconds spent waiting for the batch.
+        starved: whether the queue was empty when the batch was requested.
+        queue_size: number of batches in the queue when the batch was
+            requested, or None if unknown.
+    """
+    with self._lock:
+      self._num_batches += 1
+      self._num_starved += int(starved)
+      self._wait_time += wait_time
+      if queue_size is not None:
+        self._queue_size_sum += queue_size
+        self._num_queue_sizes += 1
+
+  def get(self):
+    """Returns the statistics recorded so far as an `EnqueuerStats` tuple."""
+    with self._lock:
+      mean_queue_size = (self._queue_size_sum / self._num_queue_sizes
+                         if self._num_queue_sizes else None)
+      return EnqueuerStats(
+          num_batches=self._num_batches,
+          num_starved=self._num_starved,
+          wait_time=self._wait_time,
+          mean_queue_size=mean_queue_size)
+
+
+def queue_size(q):
+  """Returns the approximate size of a queue, or None if it is unknown."""
+  try:
+    return q.qsize()
+  except NotImplementedError:
+    # multiprocessing queues do not implement qsize() on Mac OS X.
+    return None
+
+
+def put_until_stopped(q, item, stop_event, timeout=0.1):
+  """Blocks until `item` is put into `q`, or until `stop_event` is set.
+
+  Arguments:
+      q: a queue.
+      item: the item to put into the queue.
+      stop_event: an event telling the caller to give up.
+      timeout: how often to check `stop_event`, in seconds.
+
+  Returns:
+      Whether the item was put into the queue.
+  """
+  while not stop_event.is_set():
+    try:
+      q.put(item, timeout=timeout)
+      return True
+    except queue.Full:
+      pass
+  return False
+
+
+def get_until_stopped(q, is_running, stats, timeout=0.1):
+  """Blocks until an item can be taken from `q`, recording `stats`.
+
+  Arguments:
+      q: a queue filled by enqueuer workers.
+      is_running: function returning whether the workers are still running.
+      stats: a `QueueStats`.
+      timeout: how often to check `is_running`, in seconds.
+
+  Returns:
+      The item.
+
+  Raises:
+      RuntimeError: if the workers stopped before an item became available.
+  """
+  size = queue_size(q)
+  starved = size == 0 if size is not None else q.empty()
+  start = time.time()
+  while True:
+    try:
+      item = q.get(timeout=timeout)
+      break
+    except queue.Empty:
+      if not is_running():
+        raise RuntimeError('The enqueuer workers stopped before producing '
+                           'enough batches.')
+  stats.record(time.time() - start, starved, size)
+  return item
+
+
+def _ordered_enqueuer_task(sequence, worker_index, num_workers, output_queue,
+                           stop_event, reseed):
+  """Puts the batches of `sequence` assigned to one worker into its queue.
+
+  Worker `i` of `n` produces the batches at positions `i`, `i + n`, `i + 2n`,
+  and so on, cycling through the sequence indefinitely.
+
+  Arguments:
+      sequence: a `Sequence`.
+      worker_index: index of this worker.
+      num_workers: total number of workers.
+      output_queue: the queue of this worker.
+      stop_event: an event telling the worker to stop.
+      reseed: whether to reseed the NumPy random number generator, so that
+          worker processes forked from the same parent differ in their
+          random augmentations.
+  """
+  if reseed:
+    np.random.seed()
+  num_batches = len(sequence)
+  position = worker_index
+  while not stop_event.is_set():
+    try:
+      item = (True, sequence[position % num_batches])
+    except Exception:  # pylint: disable=broad-except
+      item = (False, traceback.format_exc())
+    if not put_until_stopped(output_queue, item, stop_event) or not item[0]:
+      return
+    position += num_workers
+
+
+class OrderedEnqueuer(object):
+  """Builds a queue out of a `Sequence`, preserving the order of its batches.
+
+  Every worker is assigned a disjoint subset of the batch indices and writes to
+  a queue of its own, and batches are read from the queues in turn, so the
+  batches come out in the order of the `Sequence` no matter how many workers
+  there are. Used in `fit_generator`, `evaluate_generator` and
+  `predict_generator` when they are given a `Sequence`.
+
+  Arguments:
+      sequence: a `Sequence` object.
+      pickle_safe: use multiprocessing if True, otherwise threading.
+  """
+
+  def __init__(self, sequence, pickle_safe=False):
+    if not len(sequence):  # pylint: disable=g-explicit-length-test
+      raise ValueError('Cannot enqueue an empty Sequence.')
+    self._sequence = sequence
+    self._pickle_safe = pickle_safe
+    self._workers = []
+    self._queues = []
+    self._stop_event = None
+    self._stats = QueueStats()
+
+  def start(self, workers=1, max_q_size=10):
+    """Starts the workers.
+
+    Arguments:
+        workers: number of worker threads or processes.
+        max_q_size: total number of batches the workers may produce ahead of
+            the consumer.
+    """
+    queue_size_per_worker = max(1, max_q_size // workers)
+    try:
+      if self._pickle_safe:
+        self._stop_event = multiprocessing.Event()
+      else:
+        self._stop_event = threading.Event()
+      for i in range(workers):
+        if self._pickle_safe:
+          worker_queue = multiprocessing.Queue(maxsize=queue_size_per_worker)
+          worker_class = multiprocessing.Process
+        else:
+          worker_queue = queue.Queue(maxsize=queue_size_per_worker)
+          worker_class = threading.Thread
+        worker = worker_class(
+            target=_ordered_enqueuer_task,
+            args=(self._sequence, i, workers, worker_queue, self._stop_event,
+                  self._pickle_safe))
+        worker.daemon = True
+        self._queues.append(worker_queue)
+        self._workers.append(worker)
+        worker.start()
+    except:
+      self.stop()
+      raise
+
+  def is_running(self):
+    return self._stop_event is not None and not self._stop_event.is_set()
+
+  def get(self):
+    """Yields the batches of the `Sequence` in order, cycling indefinitely.
+
+    Yields:
+        The batches.
+
+    Raises:
+        RuntimeError: if a worker failed to produce a batch.
+    """
+    position = 0
+    while self.is_running():
+      index = position % len(self._queues)
+      ok, value = get_until_stopped(
+          self._queues[index],
+          lambda i=index: self.is_running() and self._workers[i].is_alive(),
+          self._stats)
+      if not ok:
+        self.stop()
+        raise RuntimeError('An enqueuer worker failed:\n' + value)
+      position += 1
+      yield value
+
+  def stats(self):
+    """Returns an `EnqueuerStats` tuple describing the queue so far."""
+    return self._stats.get()
+
+  def stop(self, timeout=None):
+    """Stops the workers and waits for them to exit, if necessary.
+
+    Should be called by the same thread which called start().
+
+    Arguments:
+        timeout: maximum time to wait on thread.join()
+    """
+    if self.is_running():
+      self._stop_event.set()
+
+    for worker in self._workers:
+      if worker.is_alive():
+        if self._pickle_safe:
+          worker.terminate()
+        else:
+          worker.join(timeout)
+
+    if self._pickle_safe:
+      for worker_queue in self._queues:
+        worker_queue.close()
+
+    self._workers = []
+    self._queues = []
+    self._stop_event = None
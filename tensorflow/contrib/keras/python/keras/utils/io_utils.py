@@ -18,9 +18,12 @@ from __future__ import division
 from __future__ import print_function
 
 from collections import defaultdict
+from collections import OrderedDict
 import sys
+import threading
 
 import numpy as np
+import six
 
 
 try:
@@ -42,7 +45,14 @@ class HDF5Matrix(object):
   Providing `start` and `end` allows use of a slice of the dataset.
 
   Optionally, a normalizer function (or lambda) can be given. This will
-  be called on every slice of data retrieved.
+  be called on every block of rows read from the file, so it must work on any
+  slice of rows.
+
+  Rows are read in blocks aligned to the chunks of the HDF5 dataset, and the
+  most recently used blocks are cached. Requests for arbitrary indices, such
+  as shuffled batches, are grouped by block, so every block is read and
+  normalized once and the batch is assembled directly from the cached
+  blocks, instead of issuing one small read per index.
 
   Arguments:
       datapath: string, path to a HDF5 file
@@ -51,13 +61,19 @@ class HDF5Matrix(object):
       start: int, start of desired slice of the specified dataset
       end: int, end of desired slice of the specified dataset
       normalizer: function to be called on data when retrieved
+      block_rows: int, number of rows read at a time. Defaults to a multiple
+          of the chunk size of the dataset, of at least
+          `HDF5Matrix.min_block_bytes` bytes.
+      cache_blocks: int, maximum number of blocks to cache, at least 1.
 
   Returns:
       An array-like HDF5 dataset.
   """
   refs = defaultdict(int)
+  min_block_bytes = 2**20
 
-  def __init__(self, datapath, dataset, start=0, end=None, normalizer=None):
+  def __init__(self, datapath, dataset, start=0, end=None, normalizer=None,
+               block_rows=None, cache_blocks=32):
     if h5py is None:
       raise ImportError('The use of HDF5Matrix requires '
                         'HDF5 and h5py installed.')
@@ -75,36 +91,94 @@ class HDF5Matrix(object):
       self.end = end
     self.normalizer = normalizer
 
+    if block_rows is None:
+      chunk_rows = self.data.chunks[0] if self.data.chunks else 1
+      row_bytes = max(1, self.data.dtype.itemsize *
+                      int(np.prod(self.data.shape[1:])))
+      chunk_bytes = chunk_rows * row_bytes
+      block_rows = chunk_rows * max(
+          1, -(-self.min_block_bytes // chunk_bytes))
+    self.block_rows = block_rows
+    self.cache_blocks = max(1, cache_blocks)
+    self._blocks = OrderedDict()
+    self._lock = threading.Lock()
+
   def __len__(self):
     return self.end - self.start
 
+  def _get_block(self, block):
+    """Returns the rows of a block, normalized, reading it if needed.
+
+    Arguments:
+        block: int, index of the block in the dataset.
+
+    Returns:
+        A Numpy array of the rows `[block * block_rows, (block + 1) *
+        block_rows)` of the dataset, truncated to the dataset's length.
+    """
+    with self._lock:
+      rows = self._blocks.pop(block, None)
+      if rows is not None:
+        self._blocks[block] = rows
+        return rows
+    block_start = block * self.block_rows
+    rows = self.data[block_start:
+                     min(block_start + self.block_rows, self.data.shape[0])]
+    if self.normalizer is not None:
+      rows = self.normalizer(rows)
+    with self._lock:
+      self._blocks[block] = rows
+      while len(self._blocks) > self.cache_blocks:
+        self._blocks.popitem(last=False)
+    return rows
+
+  def _read_rows(self, idx):
+    """Reads arbitrary rows of the dataset, grouped by block.
+
+    Arguments:
+        idx: 1D Numpy array of int, indices of the rows in the dataset.
+
+    Returns:
+        A Numpy array with the rows, in the order of `idx`.
+    """
+    blocks = idx // self.block_rows
+    offsets = idx - blocks * self.block_rows
+    # Reads every block once, in file order.
+    order = np.argsort(blocks, kind='mergesort')
+    bounds = np.flatnonzero(np.diff(blocks[order])) + 1
+    output = None
+    for positions in np.split(order, bounds):
+      if not len(positions):  # pylint: disable=g-explicit-length-test
+        continue
+      rows = self._get_block(blocks[positions[0]])
+      if output is None:
+        output = np.empty((len(idx),) + rows.shape[1:], dtype=rows.dtype)
+      output[positions] = rows[offsets[positions]]
+    if output is None:
+      output = self._get_block(0)[:0]
+    return output
+
   def __getitem__(self, key):
     if isinstance(key, slice):
-      if key.stop + self.start <= self.end:
-        idx = slice(key.start + self.start, key.stop + self.start)
-      else:
+      if key.stop is not None and key.stop + self.start > self.end:
         raise IndexError
-    elif isinstance(key, int):
+      idx = np.arange(*key.indices(len(self))) + self.start
+    elif isinstance(key, six.integer_types + (np.integer,)):
       if key + self.start < self.end:
         idx = key + self.start
       else:
         raise IndexError
-    elif isinstance(key, np.ndarray):
-      if np.max(key) + self.start < self.end:
-        idx = (self.start + key).tolist()
-      else:
-        raise IndexError
-    elif isinstance(key, list):
-      if max(key) + self.start < self.end:
-        idx = [x + self.start for x in key]
-      else:
+    elif isinstance(key, (np.ndarray, list)):
+      idx = np.asarray(key, dtype='int64')
+      if len(idx) and np.max(idx) + self.start >= self.end:
         raise IndexError
+      idx = idx + self.start
     else:
       raise IndexError
-    if self.normalizer is not None:
-      return self.normalizer(self.data[idx])
-    else:
-      return self.data[idx]
+    if np.isscalar(idx):
+      # Copies the row, so that callers cannot modify the cache.
+      return self._read_rows(np.array([idx]))[0].copy()
+    return self._read_rows(idx)
 
   @property
   def shape(self):
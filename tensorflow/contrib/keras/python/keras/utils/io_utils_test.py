@@ -0,0 +1,101 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for io_utils."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+
+import numpy as np
+
+from tensorflow.contrib.keras.python import keras
+from tensorflow.python.platform import test
+
+try:
+  import h5py  # pylint:disable=g-import-not-at-top
+except ImportError:
+  h5py = None
+
+
+class HDF5MatrixTest(test.TestCase):
+
+  def setUp(self):
+    if h5py is None:
+      return
+    temp_dir = self.get_temp_dir()
+    self.addCleanup(shutil.rmtree, temp_dir)
+    self._path = os.path.join(temp_dir, 'data.h5')
+    self._data = np.arange(200 * 3, dtype='float32').reshape((200, 3))
+    with h5py.File(self._path, 'w') as f:
+      f.create_dataset('data', data=self._data, chunks=(8, 3))
+
+  def _matrix(self, **kwargs):
+    matrix = keras.utils.io_utils.HDF5Matrix(self._path, 'data', **kwargs)
+    self.addCleanup(keras.utils.io_utils.HDF5Matrix.refs.clear)
+    return matrix
+
+  def test_default_block_rows(self):
+    if h5py is None:
+      return  # Skip test if HDF5 is not available.
+    matrix = self._matrix()
+    self.assertEqual(matrix.block_rows % 8, 0)
+    self.assertGreaterEqual(matrix.block_rows * 3 * 4, matrix.min_block_bytes)
+
+  def test_getitem(self):
+    if h5py is None:
+      return  # Skip test if HDF5 is not available.
+    matrix = self._matrix(start=10, end=150, block_rows=16, cache_blocks=2)
+    self.assertEqual(len(matrix), 140)
+    self.assertEqual(matrix.shape, (140, 3))
+    self.assertAllEqual(matrix[5], self._data[15])
+    self.assertAllEqual(matrix[3:40], self._data[13:50])
+    self.assertAllEqual(matrix[:4], self._data[10:14])
+    shuffled = np.random.permutation(140)[:50]
+    self.assertAllEqual(matrix[shuffled], self._data[shuffled + 10])
+    self.assertAllEqual(matrix[[139, 0, 139]], self._data[[149, 10, 149]])
+    self.assertEqual(matrix[np.array([], dtype='int64')].shape, (0, 3))
+    with self.assertRaises(IndexError):
+      _ = matrix[140]
+    with self.assertRaises(IndexError):
+      _ = matrix[[3, 140]]
+    with self.assertRaises(IndexError):
+      _ = matrix[130:141]
+
+  def test_blocks_are_read_and_normalized_once(self):
+    if h5py is None:
+      return  # Skip test if HDF5 is not available.
+    normalized = []
+
+    def normalizer(x):
+      normalized.append(len(x))
+      return x * 2
+
+    matrix = self._matrix(normalizer=normalizer, block_rows=50,
+                          cache_blocks=4)
+    indices = np.random.permutation(200)
+    for batch in np.split(indices, 10):
+      self.assertAllEqual(matrix[batch], self._data[batch] * 2)
+    self.assertEqual(normalized, [50] * 4)
+    # Reading back a cached row does not expose the cache.
+    row = matrix[0]
+    row[:] = -1
+    self.assertAllEqual(matrix[0], self._data[0] * 2)
+
+
+if __name__ == '__main__':
+  test.main()
@@ -22,9 +22,12 @@ from __future__ import print_function
 
 import itertools
 import math
+import sys
+import threading
 
 import numpy as np
 import six
+from six.moves import queue
 from six.moves import xrange  # pylint: disable=redefined-builtin
 
 from tensorflow.python.framework import dtypes
@@ -274,6 +277,115 @@ def _check_dtype(dtype):
   return dtype
 
 
+def _take_rows(data, indices, out):
+  """Gathers the rows of `data` at `indices` into `out`.
+
+  Args:
+    data: array-like. The collection to gather from.
+    indices: 1-D array of `int`s. Row locations to gather.
+    out: Array of `len(indices)` rows to write the gathered rows into. Rows of
+      one-dimensional `data` are written as rows of length one.
+  """
+  if isinstance(data, np.ndarray) and data.dtype == out.dtype:
+    np.take(np.asarray(data), indices, axis=0,
+            out=out.reshape((len(indices),) + data.shape[1:]), mode='clip')
+  else:
+    out[...] = np.reshape(np.asarray(_access(data, indices)), out.shape)
+
+
+def _one_hot(labels, out):
+  """Writes the one-hot encoding of integer `labels` into `out`.
+
+  Args:
+    labels: Array of class ids, with as many elements as `out` has one-hot
+      vectors.
+    out: Contiguous array whose last dimension is the number of classes.
+  """
+  out.fill(0)
+  labels = np.ravel(labels).astype(np.intp, copy=False)
+  out.reshape(-1, out.shape[-1])[np.arange(labels.size), labels] = 1
+
+
+class _BatchPrefetcher(object):
+  """Builds feed dicts on a background thread ahead of the training loop.
+
+  Feed dicts are built into `num_batches + 2` sets of buffers that are reused
+  in turn: up to `num_batches` finished feed dicts wait for the caller, one is
+  being built and one was last returned by `get`. A set of buffers is reused
+  only once the caller asks for the following feed dict, so the arrays of a
+  feed dict stay valid until the next call to `get`.
+  """
+
+  def __init__(self, make_feed_dict, num_batches):
+    """Starts the background thread.
+
+    Args:
+      make_feed_dict: Function that takes a `dict` of buffers, which it may
+        allocate arrays into and reuse on later calls, and returns a feed dict.
+        It raises `StopIteration` when there is no more data.
+      num_batches: Number of feed dicts to build ahead of the caller.
+    """
+    self._make_feed_dict = make_feed_dict
+    self._ready = queue.Queue()
+    self._free = queue.Queue()
+    for _ in xrange(num_batches + 2):
+      self._free.put({})
+    self._held = None
+    self._done = False
+    self._stop_event = threading.Event()
+    self._thread = threading.Thread(target=self._run)
+    self._thread.daemon = True
+    self._thread.start()
+
+  def _run(self):
+    while True:
+      buffers = self._free.get()
+      if self._stop_event.is_set():
+        return
+      try:
+        item = True, self._make_feed_dict(buffers)
+      except StopIteration:
+        item = False, None
+      except Exception:  # pylint: disable=broad-except
+        item = False, sys.exc_info()
+      self._ready.put((buffers, item))
+      if not item[0]:
+        return
+
+  def get(self):
+    """Returns the next feed dict.
+
+    Returns:
+      The next feed dict built by `make_feed_dict`.
+
+    Raises:
+      StopIteration: If `make_feed_dict` ran out of data.
+      Exception: Any other exception raised by `make_feed_dict`.
+    """
+    if self._done:
+      raise StopIteration
+    if self._held is not None:
+      self._free.put(self._held)
+      self._held = None
+    buffers, (ok, value) = self._ready.get()
+    if not ok:
+      # The background thread exits after its last feed dict.
+      self._done = True
+      self._thread.join()
+      if value is None:
+        raise StopIteration
+      six.reraise(*value)
+    self._held = buffers
+    return value
+
+  def stop(self):
+    """Stops the background thread and waits for it to exit."""
+    self._done = True
+    self._stop_event.set()
+    self._free.put(None)
+    self._thread.join()
+
+
 class DataFeeder(object):
   """Data feeder is an example class to sample data for TF trainer."""
 
@@ -284,7 +396,8 @@ class DataFeeder(object):
                batch_size=None,
                shuffle=True,
                random_state=None,
-               epochs=None):
+               epochs=None,
+               prefetch_batches=0):
     """Initializes a DataFeeder instance.
 
     Args:
@@ -303,6 +416,12 @@ class DataFeeder(object):
       random_state: Numpy `RandomState` object to reproduce sampling.
       epochs: Number of times to iterate over input data before raising
         `StopIteration` exception.
+      prefetch_batches: Number of batches to build ahead on a background
+        thread. If 0, each batch is built when it is requested. If positive,
+        batches are built into reused buffers, so the arrays of a feed dict
+        are only valid until the next feed dict is requested, and `epoch` and
+        `offset` run ahead of the batches handed out. Call `close` to stop
+        the thread before the data is exhausted.
 
     Attributes:
       x: Input features (ndarray or dictionary of ndarrays).
@@ -370,6 +489,8 @@ class DataFeeder(object):
     self.offset = 0
     self.epoch = 0
     self._epoch_placeholder = None
+    self._prefetch_batches = prefetch_batches
+    self._prefetcher = None
 
   @property
   def x(self):
@@ -466,33 +587,34 @@ class DataFeeder(object):
     x_is_dict, y_is_dict = isinstance(
         self._x, dict), self._y is not None and isinstance(self._y, dict)
 
+    def get_buffer(buffers, key, shape, dtype, num_rows):
+      """Returns the first `num_rows` rows of a buffer, allocating it once."""
+      if key not in buffers:
+        buffers[key] = np.empty(shape, dtype=dtype)
+      return buffers[key][:num_rows]
+
     # Assign input features from random indices.
-    def extract(data, indices):
-      return (np.array(_access(data, indices)).reshape((indices.shape[0], 1)) if
-              len(data.shape) == 1 else _access(data, indices))
+    def extract(buffers, key, data, shape, dtype, indices):
+      out = get_buffer(buffers, key, shape, dtype, indices.shape[0])
+      _take_rows(data, indices, out)
+      return out
 
     # assign labels from random indices
-    def assign_label(data, shape, dtype, n_classes, indices):
-      shape[0] = indices.shape[0]
-      out = np.zeros(shape, dtype=dtype)
-      for i in xrange(out.shape[0]):
-        sample = indices[i]
-        # self.n_classes is None means we're passing in raw target indices
-        if n_classes is None:
-          out[i] = _access(data, sample)
+    def assign_label(buffers, key, data, shape, dtype, n_classes, indices):
+      out = get_buffer(buffers, key, shape, dtype, indices.shape[0])
+      # self.n_classes is None means we're passing in raw target indices
+      if n_classes is not None and n_classes > 1:
+        if isinstance(data, np.ndarray):
+          labels = np.take(np.asarray(data), indices, axis=0)
         else:
-          if n_classes > 1:
-            if len(shape) == 2:
-              out.itemset((i, int(_access(data, sample))), 1.0)
-            else:
-              for idx, value in enumerate(_access(data, sample)):
-                out.itemset(tuple([i, idx, value]), 1.0)
-          else:
-            out[i] = _access(data, sample)
+          labels = np.asarray(_access(data, indices))
+        _one_hot(labels, out)
+      else:
+        _take_rows(data, indices, out)
       return out
 
-    def _feed_dict_fn():
-      """Function that samples data into given placeholders."""
+    def _make_feed_dict(buffers):
+      """Samples data into given placeholders, reusing `buffers`."""
       if self.max_epochs is not None and self.epoch + 1 > self.max_epochs:
         raise StopIteration
       assert self._input_placeholder is not None
@@ -507,10 +629,15 @@ class DataFeeder(object):
       batch_indices = self.indices[self.offset:end]
 
       # adding input placeholder
-      feed_dict.update(
-          dict([(self._input_placeholder[k].name, extract(v, batch_indices))
-                for k, v in list(self._x.items())]) if x_is_dict else
-          {self._input_placeholder.name: extract(self._x, batch_indices)})
+      if x_is_dict:
+        for k, v in list(self._x.items()):
+          feed_dict[self._input_placeholder[k].name] = extract(
+              buffers, ('x', k), v, self.input_shape[k], self._input_dtype[k],
+              batch_indices)
+      else:
+        feed_dict[self._input_placeholder.name] = extract(
+            buffers, 'x', self._x, self.input_shape, self._input_dtype,
+            batch_indices)
 
       # move offset and reset it if necessary
       self.offset += self._batch_size
@@ -530,19 +657,47 @@ class DataFeeder(object):
           n_classes = (self.n_classes[k] if k in self.n_classes else
                        None) if self.n_classes is not None else None
           shape, dtype = self.output_shape[k], self._output_dtype[k]
-          feed_dict.update({
-              self._output_placeholder[k].name:
-                  assign_label(v, shape, dtype, n_classes, batch_indices)
-          })
+          feed_dict[self._output_placeholder[k].name] = assign_label(
+              buffers, ('y', k), v, shape, dtype, n_classes, batch_indices)
       else:
         shape, dtype, n_classes = self.output_shape, self._output_dtype, self.n_classes
-        feed_dict.update({
-            self._output_placeholder.name:
-                assign_label(self._y, shape, dtype, n_classes, batch_indices)
-        })
+        feed_dict[self._output_placeholder.name] = assign_label(
+            buffers, 'y', self._y, shape, dtype, n_classes, batch_indices)
 
       return feed_dict
 
+    return self._make_feed_dict_fn(_make_feed_dict)
+
+  def close(self):
+    """Stops the thread prefetching feed dicts, if any.
+
+    Feed functions returned by `get_feed_dict_fn` before the call raise
+    `StopIteration` afterwards.
+    """
+    if self._prefetcher is not None:
+      self._prefetcher.stop()
+      self._prefetcher = None
+
+  def _make_feed_dict_fn(self, make_feed_dict):
+    """Wraps `make_feed_dict` into a feed function, prefetching if enabled.
+
+    Args:
+      make_feed_dict: Function that takes a `dict` of buffers and returns a
+        feed dict.
+
+    Returns:
+      A function that takes no arguments and returns the next feed dict.
+    """
+    self.close()
+    if self._prefetch_batches:
+      self._prefetcher = _BatchPrefetcher(make_feed_dict,
+                                          self._prefetch_batches)
+      return self._prefetcher.get
+
+    def _feed_dict_fn():
+      """Function that samples data into given placeholders."""
+      return make_feed_dict({})
+
     return _feed_dict_fn
 
 
@@ -554,7 +709,7 @@ class StreamingDataFeeder(DataFeeder):
   the dataset, to allow control of how much to learn on the trainer side.
   """
 
-  def __init__(self, x, y, n_classes, batch_size):
+  def __init__(self, x, y, n_classes, batch_size, prefetch_batches=0):
     """Initializes a StreamingDataFeeder instance.
 
     Args:
@@ -571,6 +726,11 @@ class StreamingDataFeeder(DataFeeder):
         and no one-hot conversion will be applied to the label with that key.
       batch_size: Mini batch size to accumulate samples in one batch. If set
         `None`, then assumes that iterator to return already batched element.
+      prefetch_batches: Number of batches to read ahead from `x` and `y` on a
+        background thread. If 0, each batch is read when it is requested. If
+        positive, batches are built into reused buffers, so the arrays of a
+        feed dict are only valid until the next feed dict is requested. Call
+        `close` to stop the thread.
 
     Attributes:
       x: input features (or dictionary of input features).
@@ -592,6 +752,8 @@ class StreamingDataFeeder(DataFeeder):
       y_first_el = None
       self._y = None
     self.n_classes = n_classes
+    self._prefetch_batches = prefetch_batches
+    self._prefetcher = None
 
     x_is_dict = isinstance(x_first_el, dict)
     y_is_dict = y is not None and isinstance(y_first_el, dict)
@@ -661,33 +823,30 @@ class StreamingDataFeeder(DataFeeder):
     """
     self.stopped = False
 
-    def _feed_dict_fn():
-      """Samples data and provides it to placeholders.
+    def _make_feed_dict(buffers):
+      """Samples data and provides it to placeholders, reusing `buffers`.
 
       Returns:
         `dict` of input and output tensors.
       """
 
-      def init_array(shape, dtype):
-        """Initialize array of given shape or dict of shapes and dtype."""
+      def init_array(key, shape, dtype):
+        """Returns buffer of given shape or dict of shapes and dtype."""
         if shape is None:
           return None
         elif isinstance(shape, dict):
-          return dict([(k, np.zeros(shape[k], dtype[k]))
+          return dict([(k, init_array((key, k), shape[k], dtype[k]))
                        for k in list(shape.keys())])
-        else:
-          return np.zeros(shape, dtype=dtype)
+        if key not in buffers:
+          buffers[key] = np.zeros(shape, dtype=dtype)
+        return buffers[key]
 
       def put_data_array(dest, index, source=None, n_classes=None):
         """Puts data array into container."""
         if source is None:
           dest = dest[:index]
         elif n_classes is not None and n_classes > 1:
-          if len(self.output_shape) == 2:
-            dest.itemset((index, source), 1.0)
-          else:
-            for idx, value in enumerate(source):
-              dest.itemset(tuple([index, idx, value]), 1.0)
+          _one_hot(source, dest[index])
         else:
           if len(dest.shape) > 1:
             dest[index, :] = source
@@ -714,8 +873,8 @@ class StreamingDataFeeder(DataFeeder):
       if self.stopped:
         raise StopIteration
 
-      inp = init_array(self.input_shape, self._input_dtype)
-      out = init_array(self.output_shape, self._output_dtype)
+      inp = init_array('x', self.input_shape, self._input_dtype)
+      out = init_array('y', self.output_shape, self._output_dtype)
 
       for i in xrange(self._batch_size):
         # Add handling when queue ends.
@@ -750,7 +909,7 @@ class StreamingDataFeeder(DataFeeder):
 
       return feed_dict
 
-    return _feed_dict_fn
+    return self._make_feed_dict_fn(_make_feed_dict)
 
 
 class DaskDataFeeder(object):
@@ -240,6 +240,64 @@ class DataFeederTest(test.TestCase):
             n_classes=self._wrap_dict(5, 'out'),
             batch_size=2))
 
+  def test_data_feeder_prefetch(self):
+
+    def feed_values(df, num_batches):
+      inp, out = df.input_builder()
+      feed_dict_fn = df.get_feed_dict_fn()
+      values = []
+      for _ in xrange(num_batches):
+        feed_dict = feed_dict_fn()
+        # Copy, as prefetched feed dicts reuse their buffers.
+        values.append((np.array(feed_dict[inp.name]),
+                       np.array(feed_dict[out.name])))
+      return values
+
+    x = np.arange(40).reshape(20, 2)
+    y = np.arange(20) % 3
+    expected = feed_values(
+        data_feeder.DataFeeder(
+            x, y, n_classes=3, batch_size=3,
+            random_state=np.random.RandomState(1)), 10)
+    actual = feed_values(
+        data_feeder.DataFeeder(
+            x, y, n_classes=3, batch_size=3,
+            random_state=np.random.RandomState(1), prefetch_batches=2), 10)
+    for (expected_inp, expected_out), (inp, out) in zip(expected, actual):
+      self.assertAllEqual(expected_inp, inp)
+      self.assertAllEqual(expected_out, out)
+      self.assertAllEqual(np.ones(len(out)), out.sum(axis=1))
+
+  def test_data_feeder_prefetch_epochs(self):
+    df = data_feeder.DataFeeder(
+        np.matrix([[1, 2], [2, 3], [3, 4]]), np.array([0, 0, 1]),
+        n_classes=0, batch_size=2, epochs=2, prefetch_batches=3)
+    df.input_builder()
+    epoch = df.make_epoch_variable()
+    feed_dict_fn = df.get_feed_dict_fn()
+    epochs = [feed_dict_fn()[epoch.name] for _ in xrange(4)]
+    self.assertAllEqual([[0], [0], [1], [1]], epochs)
+    with self.assertRaises(StopIteration):
+      feed_dict_fn()
+    # The background thread exits once the data is exhausted.
+    self.assertFalse(df._prefetcher._thread.is_alive())
+    with self.assertRaises(StopIteration):
+      feed_dict_fn()
+
+  def test_data_feeder_prefetch_close(self):
+    df = data_feeder.DataFeeder(
+        np.arange(40).reshape(20, 2), np.arange(20) % 3, n_classes=3,
+        batch_size=3, prefetch_batches=2)
+    df.input_builder()
+    feed_dict_fn = df.get_feed_dict_fn()
+    feed_dict_fn()
+    thread = df._prefetcher._thread
+    df.close()
+    self.assertFalse(thread.is_alive())
+    with self.assertRaises(StopIteration):
+      feed_dict_fn()
+    df.close()
+
   def test_streaming_data_feeder(self):
 
     def func(df):
@@ -281,6 +339,36 @@ class DataFeederTest(test.TestCase):
             n_classes=self._wrap_dict(0, 'out'),
             batch_size=10))
 
+  def test_streaming_data_feeder_one_hot(self):
+
+    def func(df):
+      inp, out = df.input_builder()
+      feed_dict_fn = df.get_feed_dict_fn()
+      feed_dict = feed_dict_fn()
+      self.assertAllClose([[1, 1], [0, 0]], feed_dict[inp.name])
+      self.assertAllClose([[0, 1, 0], [1, 0, 0]], feed_dict[out.name])
+      feed_dict = feed_dict_fn()
+      self.assertAllClose([[2, 2]], feed_dict[inp.name])
+      self.assertAllClose([[0, 0, 1]], feed_dict[out.name])
+      with self.assertRaises(StopIteration):
+        feed_dict_fn()
+
+    def x_iter():
+      for value in [1, 0, 2]:
+        yield np.array([value, value])
+
+    def y_iter():
+      for value in [1, 0, 2]:
+        yield np.array([value])
+
+    func(
+        data_feeder.StreamingDataFeeder(
+            x_iter(), y_iter(), n_classes=3, batch_size=2))
+    func(
+        data_feeder.StreamingDataFeeder(
+            x_iter(), y_iter(), n_classes=3, batch_size=2,
+            prefetch_batches=1))
+
   def test_dask_data_feeder(self):
     if HAS_PANDAS and HAS_DASK:
       x = pd.DataFrame(
@@ -501,6 +501,95 @@ class _FetchHandler(object):
     return self._fetch_mapper.build_results(full_values)
 
 
+class _CallableFeeds(object):
+  """Precompiled feeds for a callable returned by `make_callable()`.
+
+  The feed keys are resolved to tensors, and their names, dtypes and static
+  shapes are looked up once, when the callable is made. Each call then only
+  has to convert the fed values to numpy arrays and check their shapes.
+  """
+
+  def __init__(self, graph, feed_list):
+    """Creates a _CallableFeeds.
+
+    Args:
+      graph: Graph of the feeds.
+      feed_list: A list of `tf.Tensor`s or tensor names to feed.
+
+    Raises:
+      TypeError: If an element of `feed_list` cannot be interpreted as a
+        tensor of `graph`.
+      ValueError: If an element of `feed_list` may not be fed.
+    """
+    self._feeds = []
+    for feed in feed_list:
+      try:
+        feed_t = graph.as_graph_element(feed, allow_tensor=True,
+                                        allow_operation=False)
+      except Exception as e:
+        raise TypeError('Cannot interpret feed_list key as Tensor: '
+                        + e.args[0])
+      if not graph.is_feedable(feed_t):
+        raise ValueError('Tensor %s may not be fed.' % feed_t)
+      shape = feed_t.get_shape()
+      dims = None if shape.ndims is None else shape.as_list()
+      self._feeds.append((compat.as_bytes(feed_t.name), feed_t,
+                          feed_t.dtype.as_numpy_dtype, dims))
+
+  @staticmethod
+  def supports(feed_list):
+    """Returns whether every element of `feed_list` feeds a single tensor."""
+    return all(isinstance(feed, (ops.Tensor,) + compat.bytes_or_text_types)
+               for feed in feed_list)
+
+  def names(self):
+    """Returns the names of the fed tensors, as bytes."""
+    return [name for name, _, _, _ in self._feeds]
+
+  def feed_dict(self, feed_args):
+    """Converts the arguments of a call to a feed dict for `TF_Run()`.
+
+    Args:
+      feed_args: The values to feed, in the order of the feed list.
+
+    Returns:
+      A dict from tensor names to numpy arrays, or None if a value is a
+      `TensorHandle`, which must be fed through `Session.run()`.
+
+    Raises:
+      TypeError: If the number of values does not match the feed list, or a
+        value is a `tf.Tensor` or an integer that overflows its tensor type.
+      ValueError: If a value does not match the shape of its tensor.
+    """
+    if len(feed_args) != len(self._feeds):
+      raise TypeError('Expected %d feed values, but got %d.'
+                      % (len(self._feeds), len(feed_args)))
+    feed_dict = {}
+    for (name, feed_t, dtype, dims), val in zip(self._feeds, feed_args):
+      if isinstance(val, ops.Tensor):
+        raise TypeError('The value of a feed cannot be a tf.Tensor object. '
+                        'Acceptable feed values include Python scalars, '
+                        'strings, lists, numpy ndarrays, or TensorHandles.')
+      if isinstance(val, session_ops.TensorHandle):
+        return None
+      if isinstance(val, int) and dtype(val) != val:
+        raise TypeError(
+            'Type of feed value ' + str(val) + ' is not'
+            ' compatible with Tensor type ' + str(dtype) + '.'
+            ' Try explicitly setting the type of the feed tensor'
+            ' to a larger type (e.g. int64).')
+      np_val = np.asarray(val, dtype=dtype)
+      if dims is not None and (
+          len(dims) != np_val.ndim or
+          any(d is not None and d != s for d, s in zip(dims, np_val.shape))):
+        raise ValueError(
+            'Cannot feed value of shape %r for Tensor %r, '
+            'which has shape %r'
+            % (np_val.shape, feed_t.name, str(feed_t.get_shape())))
+      feed_dict[name] = np_val
+    return feed_dict
+
+
 class BaseSession(SessionInterface):
   """A class for interacting with a TensorFlow computation.
 
@@ -1028,18 +1117,19 @@ class BaseSession(SessionInterface):
       TypeError: If `fetches` or `feed_list` cannot be interpreted
         as arguments to @{tf.Session.run}.
     """
+    callable_feeds = None
     if feed_list is not None:
       if not isinstance(feed_list, (list, tuple)):
         raise TypeError('`feed_list` must be a list or tuple.')
-      # Delegate any non-empty feed lists to the existing `run()` logic.
-      # TODO(mrry): Refactor the feed handling logic from
-      # `Session._run()` so that we can convert the feeds to a list of
-      # strings here.
       def _generic_run(*feed_args):
         feed_dict = {feed: feed_val
                      for feed, feed_val in zip(feed_list, feed_args)}
         return self.run(fetches, feed_dict=feed_dict)
-      return _generic_run
+      # Feed keys that expand to several tensors, such as `SparseTensor`s,
+      # are delegated to the existing `run()` logic.
+      if not _CallableFeeds.supports(feed_list):
+        return _generic_run
+      callable_feeds = _CallableFeeds(self._graph, feed_list)
 
     # Ensure any changes to the graph are reflected in the runtime.
     # Note that we don't need to do this on subsequent calls to the
@@ -1052,14 +1142,29 @@ class BaseSession(SessionInterface):
     fetch_list_as_strings = fetch_handler.fetches()
     target_list_as_strings = fetch_handler.targets()
 
+    if callable_feeds is None:
+      def _feed_dict(feed_args):
+        if feed_args:
+          raise TypeError('Expected 0 feed values, but got %d.'
+                          % len(feed_args))
+        return {}
+    else:
+      # A fetch of a fed tensor returns the fed value, which `run()` handles.
+      if set(callable_feeds.names()) & set(fetch_list_as_strings):
+        return _generic_run
+      _feed_dict = callable_feeds.feed_dict
+
     if isinstance(fetches, ops.Operation):
       # Special case for fetching a single operation, because the
       # function will have no return value.
       assert not fetch_list_as_strings
       assert len(target_list_as_strings) == 1
-      def _single_operation_run():
+      def _single_operation_run(*feed_args):
+        feed_dict = _feed_dict(feed_args)
+        if feed_dict is None:
+          return _generic_run(*feed_args)
         with errors.raise_exception_on_not_ok_status() as status:
-          tf_session.TF_Run(self._session, None, {}, [],
+          tf_session.TF_Run(self._session, None, feed_dict, [],
                             target_list_as_strings, status, None)
       return _single_operation_run
     elif isinstance(fetches, ops.Tensor):
@@ -1067,18 +1172,24 @@ class BaseSession(SessionInterface):
       # function can return the result of `TF_Run()` directly.
       assert len(fetch_list_as_strings) == 1
       assert not target_list_as_strings
-      def _single_tensor_run():
+      def _single_tensor_run(*feed_args):
+        feed_dict = _feed_dict(feed_args)
+        if feed_dict is None:
+          return _generic_run(*feed_args)
         with errors.raise_exception_on_not_ok_status() as status:
-          results = tf_session.TF_Run(self._session, None, {},
+          results = tf_session.TF_Run(self._session, None, feed_dict,
                                       fetch_list_as_strings, [], status, None)
         return results[0]
       return _single_tensor_run
     else:
       # In all other cases, we must use `fetch_handler` to build the
       # results for us.
-      def _fetch_handler_run():
+      def _fetch_handler_run(*feed_args):
+        feed_dict = _feed_dict(feed_args)
+        if feed_dict is None:
+          return _generic_run(*feed_args)
         with errors.raise_exception_on_not_ok_status() as status:
-          results = tf_session.TF_Run(self._session, None, {},
+          results = tf_session.TF_Run(self._session, None, feed_dict,
                                       fetch_list_as_strings,
                                       target_list_as_strings, status, None)
         return fetch_handler.build_results(self, results)
@@ -1156,14 +1267,18 @@ class BaseSession(SessionInterface):
     with self._extend_lock:
       if self._graph.version > self._current_version:
         # pylint: disable=protected-access
-        graph_def, self._current_version = self._graph._as_graph_def(
-            from_version=self._current_version,
-            add_shapes=self._add_shapes)
+        if self._add_shapes:
+          graph_def, self._current_version = self._graph._as_graph_def(
+              from_version=self._current_version, add_shapes=True)
+          graph_def_bytes = graph_def.SerializeToString()
+        else:
+          graph_def_bytes, self._current_version = (
+              self._graph._as_graph_def_bytes(
+                  from_version=self._current_version))
         # pylint: enable=protected-access
 
         with errors.raise_exception_on_not_ok_status() as status:
-          tf_session.TF_ExtendGraph(
-              self._session, graph_def.SerializeToString(), status)
+          tf_session.TF_ExtendGraph(self._session, graph_def_bytes, status)
         self._opened = True
 
   # The threshold to run garbage collection to delete dead tensors.
@@ -1213,6 +1213,51 @@ class SessionTest(test_util.TensorFlowTestCase):
       with self.assertRaisesRegexp(TypeError, 'cannot be a tf.Tensor object'):
         out_t.op.run(feed_dict={feed_t: feed_val})
 
+  def testMakeCallableWithFeeds(self):
+    with session.Session() as sess:
+      a = array_ops.placeholder(dtypes.float32, shape=[None, 2])
+      b = array_ops.placeholder(dtypes.int32, shape=[])
+      c = math_ops.cast(b, dtypes.float32) * a
+      v = variables.Variable(0.0)
+      assign = v.assign(math_ops.reduce_sum(c))
+      sess.run(v.initializer)
+
+      tensor_runner = sess.make_callable(c, [a, b.name])
+      self.assertAllEqual([[2.0, 4.0]], tensor_runner([[1, 2]], 2))
+      self.assertAllEqual([[3.0, 3.0], [0.0, 3.0]],
+                          tensor_runner(np.array([[1, 1], [0, 1]]), 3))
+      list_runner = sess.make_callable([c, assign], [a, b])
+      c_val, assign_val = list_runner([[1.0, 2.0]], 1)
+      self.assertAllEqual([[1.0, 2.0]], c_val)
+      self.assertEqual(3.0, assign_val)
+      op_runner = sess.make_callable(assign.op, [a, b])
+      self.assertIsNone(op_runner([[1.0, 2.0]], 2))
+      self.assertEqual(6.0, sess.run(v))
+
+      with self.assertRaisesRegexp(ValueError, 'Cannot feed value of shape'):
+        tensor_runner([1.0, 2.0], 2)
+      with self.assertRaisesRegexp(ValueError, 'Cannot feed value of shape'):
+        tensor_runner([[1.0, 2.0, 3.0]], 2)
+      with self.assertRaisesRegexp(TypeError, 'cannot be a tf.Tensor object'):
+        tensor_runner([[1.0, 2.0]], constant_op.constant(2))
+      with self.assertRaisesRegexp(TypeError, 'is not compatible'):
+        tensor_runner([[1.0, 2.0]], np.iinfo(np.int64).max)
+      with self.assertRaisesRegexp(TypeError, 'Expected 2 feed values'):
+        tensor_runner([[1.0, 2.0]])
+      with self.assertRaisesRegexp(TypeError, 'Expected 0 feed values'):
+        sess.make_callable(c)([[1.0, 2.0]])
+      with self.assertRaisesRegexp(ValueError, 'may not be fed'):
+        sess.graph.prevent_feeding(b)
+        sess.make_callable(c, [a, b])
+
+  def testMakeCallableWithSparseFeed(self):
+    with session.Session() as sess:
+      sp = array_ops.sparse_placeholder(dtype=np.float32, shape=[3])
+      sp_runner = sess.make_callable(sp.values, [sp])
+      sp_value = sparse_tensor.SparseTensorValue(
+          indices=[[0], [2]], values=[1.0, 2.0], dense_shape=[3])
+      self.assertAllEqual([1.0, 2.0], sp_runner(sp_value))
+
   def testFeedPrecisionLossError(self):
     with session.Session() as sess:
       largest_int64 = np.iinfo(np.int64).max
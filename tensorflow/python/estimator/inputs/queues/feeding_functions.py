@@ -20,6 +20,7 @@ from __future__ import print_function
 
 import collections
 import random
+import threading
 import types as tp
 import numpy as np
 import six
@@ -46,52 +47,83 @@ except ImportError:
   HAS_PANDAS = False
 
 
-def _get_integer_indices_for_next_batch(
-    batch_indices_start, batch_size, epoch_end, array_length,
-    current_epoch, total_epochs):
-  """Returns the integer indices for next batch.
+class _BatchIndexer(object):
+  """Hands out the row ranges of consecutive batches over an array.
 
-  If total epochs is not None and current epoch is the final epoch, the end
-  index of the next batch should not exceed the `epoch_end` (i.e., the final
-  batch might not have size `batch_size` to avoid overshooting the last epoch).
+  Batches walk the rows in order, starting from row 0 or from a random row, and
+  wrap around at the end of the array. One indexer may be shared by the feed
+  functions of several enqueueing threads, in which case each batch goes to
+  exactly one thread, so every row is emitted once per epoch no matter how many
+  threads there are.
+  """
+
+  def __init__(self, array_length, random_start=False, seed=None,
+               num_epochs=None):
+    """Creates a `_BatchIndexer`.
+
+    Args:
+      array_length: Integer, the number of rows of the array.
+      random_start: Whether to start the first epoch at a random row.
+      seed: Used to seed the choice of the first row.
+      num_epochs: Integer or `None`, the total number of epochs to emit. If
+        `None` will run forever.
+    """
+    self._max = array_length
+    self._num_epochs = num_epochs
+    self._epoch = 0
+    random.seed(seed)
+    self._trav = random.randrange(self._max) if random_start else 0
+    self._epoch_start = self._trav
+    self._lock = threading.Lock()
+
+  def next_batch(self, batch_size):
+    """Returns the row range of the next batch.
+
+    If `num_epochs` is not None and the final epoch ends within the next batch,
+    the batch is cut short at the end of that epoch.
+
+    Args:
+      batch_size: Integer, size of batches to return.
+
+    Returns:
+      A tuple `(start, size)`. The batch consists of rows `start` through
+      `start + size - 1`, modulo the length of the array.
+
+    Raises:
+      OutOfRangeError: if `num_epochs` epochs have already been emitted.
+    """
+    with self._lock:
+      if self._num_epochs is not None and self._epoch >= self._num_epochs:
+        raise errors.OutOfRangeError(None, None,
+                                     "Already emitted %s epochs." % self._epoch)
+      start = self._trav
+      offset = (start - self._epoch_start) % self._max
+      size = batch_size
+      if self._num_epochs is not None:
+        remaining = (self._num_epochs - self._epoch) * self._max - offset
+        size = min(size, remaining)
+      self._epoch += (offset + size) // self._max
+      self._trav = (start + size) % self._max
+      return start, size
+
+
+def _get_rows(array, start, size):
+  """Returns `size` consecutive rows of `array` from `start`, wrapping around.
+
+  Batches that do not wrap around the end of the array are returned as views,
+  without copying.
 
   Args:
-    batch_indices_start: Integer, the index to start next batch.
-    batch_size: Integer, size of batches to return.
-    epoch_end: Integer, the end index of the epoch. The epoch could start from a
-      random position, so `epoch_end` provides the end index for that.
-    array_length: Integer, the length of the array.
-    current_epoch: Integer, the epoch number has been emitted.
-    total_epochs: Integer or `None`, the total number of epochs to emit. If
-      `None` will run forever.
+    array: A numpy array.
+    start: Integer, the first row.
+    size: Integer, the number of rows.
 
   Returns:
-    A tuple of a list with integer indices for next batch and `current_epoch`
-    value after the next batch.
-
-  Raises:
-    OutOfRangeError if `current_epoch` is not less than `total_epochs`.
-
+    A numpy array of `size` rows.
   """
-  if total_epochs is not None and current_epoch >= total_epochs:
-    raise errors.OutOfRangeError(None, None,
-                                 "Already emitted %s epochs." % current_epoch)
-
-  batch_indices_end = batch_indices_start + batch_size
-  batch_indices = [j % array_length for j in
-                   range(batch_indices_start, batch_indices_end)]
-  epoch_end_indices = [i for i, x in enumerate(batch_indices) if x == epoch_end]
-  current_epoch += len(epoch_end_indices)
-
-  if total_epochs is None or current_epoch < total_epochs:
-    return (batch_indices, current_epoch)
-
-  # Now we might have emitted more data for expected epochs. Need to trim.
-  final_epoch_end_inclusive = epoch_end_indices[
-      -(current_epoch - total_epochs + 1)]
-  batch_indices = batch_indices[:final_epoch_end_inclusive + 1]
-
-  return (batch_indices, total_epochs)
+  if start + size <= len(array):
+    return array[start:start + size]
+  return np.take(array, np.arange(start, start + size) % len(array), axis=0)
 
 
 class _ArrayFeedFn(object):
@@ -103,7 +135,8 @@ class _ArrayFeedFn(object):
                batch_size,
                random_start=False,
                seed=None,
-               num_epochs=None):
+               num_epochs=None,
+               indexer=None):
     if len(placeholders) != 2:
       raise ValueError("_array_feed_fn expects 2 placeholders; got {}.".format(
           len(placeholders)))
@@ -111,25 +144,16 @@ class _ArrayFeedFn(object):
     self._array = array
     self._max = len(array)
     self._batch_size = batch_size
-    self._num_epochs = num_epochs
-    self._epoch = 0
-    random.seed(seed)
-    self._trav = random.randrange(self._max) if random_start else 0
-    self._epoch_end = (self._trav - 1) % self._max
+    if indexer is None:
+      indexer = _BatchIndexer(self._max, random_start, seed, num_epochs)
+    self._indexer = indexer
 
   def __call__(self):
-    integer_indexes, self._epoch = _get_integer_indices_for_next_batch(
-        batch_indices_start=self._trav,
-        batch_size=self._batch_size,
-        epoch_end=self._epoch_end,
-        array_length=self._max,
-        current_epoch=self._epoch,
-        total_epochs=self._num_epochs)
-
-    self._trav = (integer_indexes[-1] + 1) % self._max
+    start, size = self._indexer.next_batch(self._batch_size)
     return {
-        self._placeholders[0]: integer_indexes,
-        self._placeholders[1]: self._array[integer_indexes]
+        self._placeholders[0]:
+            np.arange(start, start + size, dtype=np.int64) % self._max,
+        self._placeholders[1]: _get_rows(self._array, start, size)
     }
 
 
@@ -142,7 +166,8 @@ class _OrderedDictNumpyFeedFn(object):
                batch_size,
                random_start=False,
                seed=None,
-               num_epochs=None):
+               num_epochs=None,
+               indexer=None):
     if len(placeholders) != len(ordered_dict_of_arrays) + 1:
       raise ValueError("Expected {} placeholders; got {}.".format(
           len(ordered_dict_of_arrays), len(placeholders)))
@@ -154,25 +179,18 @@ class _OrderedDictNumpyFeedFn(object):
       if len(v) != self._max:
         raise ValueError("Array lengths must match.")
     self._batch_size = batch_size
-    self._num_epochs = num_epochs
-    self._epoch = 0
-    random.seed(seed)
-    self._trav = random.randrange(self._max) if random_start else 0
-    self._epoch_end = (self._trav - 1) % self._max
+    if indexer is None:
+      indexer = _BatchIndexer(self._max, random_start, seed, num_epochs)
+    self._indexer = indexer
 
   def __call__(self):
-    integer_indexes, self._epoch = _get_integer_indices_for_next_batch(
-        batch_indices_start=self._trav,
-        batch_size=self._batch_size,
-        epoch_end=self._epoch_end,
-        array_length=self._max,
-        current_epoch=self._epoch,
-        total_epochs=self._num_epochs)
-
-    self._trav = (integer_indexes[-1] + 1) % self._max
-    feed_dict = {self._index_placeholder: integer_indexes}
+    start, size = self._indexer.next_batch(self._batch_size)
+    feed_dict = {
+        self._index_placeholder:
+            np.arange(start, start + size, dtype=np.int64) % self._max
+    }
     cols = [
-        column[integer_indexes]
+        _get_rows(column, start, size)
         for column in self._ordered_dict_of_arrays.values()
     ]
     feed_dict.update(dict(zip(self._col_placeholders, cols)))
@@ -188,35 +206,30 @@ class _PandasFeedFn(object):
                batch_size,
                random_start=False,
                seed=None,
-               num_epochs=None):
+               num_epochs=None,
+               indexer=None):
     if len(placeholders) != len(dataframe.columns) + 1:
       raise ValueError("Expected {} placeholders; got {}.".format(
           len(dataframe.columns), len(placeholders)))
     self._index_placeholder = placeholders[0]
     self._col_placeholders = placeholders[1:]
-    self._dataframe = dataframe
+    # Convert the index and columns to numpy arrays once, so that batches are
+    # sliced from them directly rather than through `DataFrame.iloc`.
+    self._index = dataframe.index.values
+    self._columns = [
+        dataframe.iloc[:, i].values for i in range(len(dataframe.columns))
+    ]
     self._max = len(dataframe)
     self._batch_size = batch_size
-    self._num_epochs = num_epochs
-    self._epoch = 0
-    random.seed(seed)
-    self._trav = random.randrange(self._max) if random_start else 0
-    self._epoch_end = (self._trav - 1) % self._max
+    if indexer is None:
+      indexer = _BatchIndexer(self._max, random_start, seed, num_epochs)
+    self._indexer = indexer
 
   def __call__(self):
-    integer_indexes, self._epoch = _get_integer_indices_for_next_batch(
-        batch_indices_start=self._trav,
-        batch_size=self._batch_size,
-        epoch_end=self._epoch_end,
-        array_length=self._max,
-        current_epoch=self._epoch,
-        total_epochs=self._num_epochs)
-
-    self._trav = (integer_indexes[-1] + 1) % self._max
-    result = self._dataframe.iloc[integer_indexes]
-    cols = [result[col].values for col in result.columns]
+    start, size = self._indexer.next_batch(self._batch_size)
+    cols = [_get_rows(column, start, size) for column in self._columns]
     feed_dict = dict(zip(self._col_placeholders, cols))
-    feed_dict[self._index_placeholder] = result.index.values
+    feed_dict[self._index_placeholder] = _get_rows(self._index, start, size)
     return feed_dict
 
 
@@ -293,7 +306,10 @@ def _enqueue_data(data,
     min_after_dequeue: minimum number of elements that can remain in the queue
     after a dequeue operation. Only used when `shuffle` is true. If not set,
     defaults to `capacity` / 4.
-    num_threads: number of threads used for reading and enqueueing.
+    num_threads: number of threads used for reading and enqueueing. Threads
+      reading an array or `DataFrame` share one read position, so each row is
+      enqueued once per epoch; threads reading a generator each iterate over
+      it separately.
     seed: used to seed shuffling and reader starting points.
     name: a scope name identifying the data.
     enqueue_size: the number of rows to enqueue per step.
@@ -312,12 +328,14 @@ def _enqueue_data(data,
       types = [dtypes.int64, dtypes.as_dtype(data.dtype)]
       queue_shapes = [(), data.shape[1:]]
       get_feed_fn = _ArrayFeedFn
+      num_rows = len(data)
     elif isinstance(data, collections.OrderedDict):
       types = [dtypes.int64] + [
           dtypes.as_dtype(col.dtype) for col in data.values()
       ]
       queue_shapes = [()] + [col.shape[1:] for col in data.values()]
       get_feed_fn = _OrderedDictNumpyFeedFn
+      num_rows = len(next(iter(data.values())))
     elif isinstance(data, tp.FunctionType):
       x_first_el = six.next(data())
       x_first_keys = sorted(x_first_el.keys())
@@ -325,12 +343,14 @@ def _enqueue_data(data,
       types = [dtypes.as_dtype(col.dtype) for col in x_first_values]
       queue_shapes = [col.shape for col in x_first_values]
       get_feed_fn = _GeneratorFeedFn
+      num_rows = None
     elif HAS_PANDAS and isinstance(data, pd.DataFrame):
       types = [
           dtypes.as_dtype(dt) for dt in [data.index.dtype] + list(data.dtypes)
       ]
       queue_shapes = [() for _ in types]
       get_feed_fn = _PandasFeedFn
+      num_rows = len(data)
     else:
       raise TypeError(
           "data must be either a numpy array or pandas DataFrame if pandas is "
@@ -338,27 +358,27 @@ def _enqueue_data(data,
 
     # TODO(jamieas): TensorBoard warnings for all warnings below once available.
 
-    if num_threads > 1 and num_epochs is not None:
+    if num_rows is None and num_threads > 1 and num_epochs is not None:
       logging.warning(
-          "enqueue_data was called with num_epochs and num_threads > 1. "
-          "num_epochs is applied per thread, so this will produce more "
-          "epochs than you probably intend. "
+          "enqueue_data was called with a generator, num_epochs and "
+          "num_threads > 1. num_epochs is applied per thread, so this will "
+          "produce more epochs than you probably intend. "
           "If you want to limit epochs, use one thread.")
 
-    if shuffle and num_threads > 1 and num_epochs is not None:
-      logging.warning(
-          "enqueue_data was called with shuffle=True, num_threads > 1, and "
-          "num_epochs. This will create multiple threads, all reading the "
-          "array/dataframe in order adding to the same shuffling queue; the "
-          "results will likely not be sufficiently shuffled.")
-
     if not shuffle and num_threads > 1:
       logging.warning(
           "enqueue_data was called with shuffle=False and num_threads > 1. "
-          "This will create multiple threads, all reading the "
-          "array/dataframe in order. If you want examples read in order, use"
+          "This will create multiple threads, whose batches may be enqueued "
+          "out of order. If you want examples read in order, use"
           " one thread; if you want multiple threads, enable shuffling.")
 
+    # Arrays and `DataFrame`s are read through one indexer shared by all
+    # threads, so that each row is enqueued once per epoch.
+    feed_fn_kwargs = {}
+    if num_rows is not None:
+      feed_fn_kwargs["indexer"] = _BatchIndexer(
+          num_rows, random_start=shuffle, seed=seed, num_epochs=num_epochs)
+
     if shuffle:
       min_after_dequeue = int(capacity / 4 if min_after_dequeue is None else
                               min_after_dequeue)
@@ -390,7 +410,8 @@ def _enqueue_data(data,
               enqueue_size,
               random_start=shuffle,
               seed=seed_i,
-              num_epochs=num_epochs))
+              num_epochs=num_epochs,
+              **feed_fn_kwargs))
 
     runner = fqr._FeedingQueueRunner(  # pylint: disable=protected-access
         queue=queue, enqueue_ops=enqueue_ops, feed_fns=feed_fns)
@@ -19,10 +19,13 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import threading
+import time
 
 import numpy as np
 
 from tensorflow.python.estimator.inputs.queues import feeding_functions as ff
+from tensorflow.python.framework import errors
 from tensorflow.python.platform import test
 
 try:
@@ -290,6 +293,109 @@ class _FeedingFunctionsTestCase(test.TestCase):
     actual = aff()
     self.assertEqual(expected, vals_to_list(actual))
 
+  def testArrayFeedFnReturnsViewsForContiguousBatches(self):
+    array = np.arange(32).reshape([16, 2])
+    placeholders = ["index_placeholder", "value_placeholder"]
+    aff = ff._ArrayFeedFn(placeholders, array, 5)
+
+    for _ in range(3):
+      self.assertTrue(np.may_share_memory(array, aff()["value_placeholder"]))
+    # The fourth batch wraps around the end of the array.
+    self.assertEqual([15, 0, 1, 2, 3], aff()["index_placeholder"].tolist())
+
+  def testPandasFeedFnReturnsViewsForContiguousBatches(self):
+    if not HAS_PANDAS:
+      return
+    df = pd.DataFrame({"a": np.arange(32, 64)}, index=np.arange(96, 128))
+    placeholders = ["index_placeholder", "a_placeholder"]
+    aff = ff._PandasFeedFn(placeholders, df, 5)
+
+    actual = aff()
+    self.assertEqual([32, 33, 34, 35, 36], actual["a_placeholder"].tolist())
+    self.assertTrue(
+        np.may_share_memory(aff._columns[0], actual["a_placeholder"]))
+
+  def testSharedIndexerEmitsEachRowOncePerEpoch(self):
+    array = np.arange(100) + 10
+    indexer = ff._BatchIndexer(len(array), random_start=True, seed=3,
+                               num_epochs=2)
+    placeholders = ["index_placeholder", "value_placeholder"]
+    feed_fns = [
+        ff._ArrayFeedFn(placeholders, array, batch_size=7, indexer=indexer)
+        for _ in range(4)
+    ]
+    emitted = []
+    lock = threading.Lock()
+
+    def feed(feed_fn):
+      while True:
+        try:
+          values = feed_fn()["value_placeholder"].tolist()
+        except errors.OutOfRangeError:
+          return
+        with lock:
+          emitted.extend(values)
+
+    threads = [threading.Thread(target=feed, args=(feed_fn,))
+               for feed_fn in feed_fns]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+    self.assertEqual(sorted(array.tolist() * 2), sorted(emitted))
+
+
+class FeedingFunctionsBenchmark(test.Benchmark):
+  """Benchmarks feed functions against gathering rows by integer indices."""
+
+  def _benchmark(self, name, feed_fn, num_iters=2000):
+    for _ in range(10):
+      feed_fn()
+    start = time.time()
+    for _ in range(num_iters):
+      feed_fn()
+    wall_time = (time.time() - start) / num_iters
+    self.report_benchmark(iters=num_iters, wall_time=wall_time, name=name)
+
+  def _gather_feed_fn(self, num_rows, batch_size, gather):
+    """Returns a feed function that gathers rows by integer indices."""
+    position = [0]
+
+    def feed_fn():
+      indices = [j % num_rows
+                 for j in range(position[0], position[0] + batch_size)]
+      position[0] = (indices[-1] + 1) % num_rows
+      return gather(indices)
+
+    return feed_fn
+
+  def benchmarkArrayFeedFn(self):
+    array = np.random.rand(100000, 32).astype(np.float32)
+    batch_size = 1024
+    aff = ff._ArrayFeedFn(["index", "value"], array, batch_size)
+    gather_fn = self._gather_feed_fn(
+        len(array), batch_size, lambda indices: array[indices])
+    self._benchmark("array_feed_fn", aff)
+    self._benchmark("array_gather", gather_fn)
+
+  def benchmarkPandasFeedFn(self):
+    if not HAS_PANDAS:
+      return
+    df = pd.DataFrame(np.random.rand(100000, 8),
+                      columns=["c%d" % i for i in range(8)])
+    batch_size = 1024
+    placeholders = ["index"] + list(df.columns)
+    pff = ff._PandasFeedFn(placeholders, df, batch_size)
+
+    def iloc_gather(indices):
+      result = df.iloc[indices]
+      return [result.index.values] + [
+          result[col].values for col in result.columns]
+
+    gather_fn = self._gather_feed_fn(len(df), batch_size, iloc_gather)
+    self._benchmark("pandas_feed_fn", pff, num_iters=500)
+    self._benchmark("pandas_iloc_gather", gather_fn, num_iters=500)
+
 
 if __name__ == "__main__":
   test.main()
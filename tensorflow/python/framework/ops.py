@@ -19,14 +19,17 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
 import copy
 import linecache
+import os
 import re
 import sys
 import threading
 
 import six
+from six.moves import xrange  # pylint: disable=redefined-builtin
 from tensorflow.core.framework import attr_value_pb2
 from tensorflow.core.framework import function_pb2
 from tensorflow.core.framework import graph_pb2
@@ -71,7 +74,7 @@ def _override_helper(clazz_object, operator, func):
 
 
 def _convert_stack(stack, include_func_start_lineno=False):
-  """Converts a stack extracted using _extract_stack() to a traceback stack.
+  """Converts a stack of frames recorded by a graph to a traceback stack.
 
   Args:
     stack: A list of n 5-tuples,
@@ -100,38 +103,131 @@ def _convert_stack(stack, include_func_start_lineno=False):
   return ret
 
 
-# pylint: disable=line-too-long
-def _extract_stack():
-  """A lightweight re-implementation of traceback.extract_stack.
+# The directory of the tensorflow package. Frames of files under it, other
+# than tests, are considered to be part of the library rather than user code.
+_TENSORFLOW_BASEDIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.normpath(os.path.abspath(__file__)))))
+
+# Maps the filename of a code object to whether it is part of the library.
+_is_library_file_cache = {}
+
+
+def _is_library_frame(f):
+  """Returns whether frame `f` runs code of the tensorflow library."""
+  filename = f.f_code.co_filename
+  is_library = _is_library_file_cache.get(filename)
+  if is_library is None:
+    path = os.path.normpath(os.path.abspath(filename))
+    is_library = (path.startswith(_TENSORFLOW_BASEDIR + os.sep) and
+                  not path.endswith("_test.py"))
+    _is_library_file_cache[filename] = is_library
+  return is_library
+
+
+# Traceback policies; see `Graph.set_traceback_policy()`.
+_TRACEBACK_FULL = "full"
+_TRACEBACK_SAMPLED = "sampled"
+_TRACEBACK_USER_FRAME = "user_frame"
+_TRACEBACK_POLICIES = (_TRACEBACK_FULL, _TRACEBACK_SAMPLED,
+                       _TRACEBACK_USER_FRAME)
+
+
+class _TracebackRecorder(object):
+  """Records the call stacks from which the ops of a graph are constructed.
+
+  This is a lightweight re-implementation of traceback.extract_stack.
 
   NOTE(mrry): traceback.extract_stack eagerly retrieves the line of code for
     each stack frame using linecache, which results in an abundance of stat()
     calls. This implementation does not retrieve the code, and any consumer
-    should apply _convert_stack to the result to obtain a traceback that can
-    be formatted etc. using traceback methods.
+    should apply _convert_stack to the result of `frames()` to obtain a
+    traceback that can be formatted etc. using traceback methods.
 
-  Returns:
-    A list of 5-tuples
-    (filename, lineno, name, frame_globals, func_start_lineno) corresponding to
-    the call stack of the current thread.
+  Frames are interned in a table shared by all the ops of the graph, and each
+  stack is recorded as a tuple of indices into that table. Identical stacks
+  are interned as well, so ops constructed from the same call site share a
+  single tuple.
   """
-  # pylint: enable=line-too-long
-  try:
-    raise ZeroDivisionError
-  except ZeroDivisionError:
-    f = sys.exc_info()[2].tb_frame.f_back
-  ret = []
-  while f is not None:
-    lineno = f.f_lineno
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._policy = _TRACEBACK_FULL
+    self._sample_interval = 1
+    self._num_recorded = 0
+    # List of 5-tuples
+    # (filename, lineno, name, frame_globals, func_start_lineno).
+    self._frames = []  # GUARDED_BY(self._lock)
+    # Maps (code object, lineno) to an index into `self._frames`.
+    self._frame_ids = {}  # GUARDED_BY(self._lock)
+    # Maps a recorded stack to itself, to intern it.
+    self._stacks = {}  # GUARDED_BY(self._lock)
+
+  def set_policy(self, policy, sample_interval):
+    with self._lock:
+      self._policy = policy
+      self._sample_interval = sample_interval
+      self._num_recorded = 0
+
+  def record(self):
+    """Records the call stack of the caller, according to the policy.
+
+    Returns:
+      An opaque, interned stack to pass to `frames()`.
+    """
+    try:
+      raise ZeroDivisionError
+    except ZeroDivisionError:
+      f = sys.exc_info()[2].tb_frame.f_back
+    with self._lock:
+      if self._policy == _TRACEBACK_SAMPLED:
+        full = self._num_recorded % self._sample_interval == 0
+        self._num_recorded += 1
+      else:
+        full = self._policy == _TRACEBACK_FULL
+      if full:
+        frame_ids = []
+        get_frame_id = self._frame_ids.get
+        while f is not None:
+          frame_id = get_frame_id((f.f_code, f.f_lineno))
+          if frame_id is None:
+            frame_id = self._add_frame(f)
+          frame_ids.append(frame_id)
+          f = f.f_back
+        frame_ids.reverse()
+        stack = tuple(frame_ids)
+      else:
+        # Only record the innermost frame of user code, or the outermost frame
+        # if the whole stack is in the library.
+        while _is_library_frame(f) and f.f_back is not None:
+          f = f.f_back
+        frame_id = self._frame_ids.get((f.f_code, f.f_lineno))
+        if frame_id is None:
+          frame_id = self._add_frame(f)
+        stack = (frame_id,)
+      return self._stacks.setdefault(stack, stack)
+
+  def _add_frame(self, f):
+    """Adds frame `f` to the frame table and returns its index."""
     co = f.f_code
-    filename = co.co_filename
-    name = co.co_name
-    frame_globals = f.f_globals
-    func_start_lineno = co.co_firstlineno
-    ret.append((filename, lineno, name, frame_globals, func_start_lineno))
-    f = f.f_back
-  ret.reverse()
-  return ret
+    frame_id = len(self._frames)
+    self._frames.append((co.co_filename, f.f_lineno, co.co_name, f.f_globals,
+                         co.co_firstlineno))
+    self._frame_ids[(co, f.f_lineno)] = frame_id
+    return frame_id
+
+  def frames(self, stack):
+    """Returns the frames of a stack returned by `record()`.
+
+    Args:
+      stack: A stack returned by `record()`.
+
+    Returns:
+      A list of 5-tuples
+      (filename, lineno, name, frame_globals, func_start_lineno), from the
+      outermost to the innermost frame.
+    """
+    frames = self._frames
+    return [frames[i] for i in stack]
 
 
 def _as_graph_element(obj):
@@ -1195,6 +1291,12 @@ class Operation(object):
     if not isinstance(g, Graph):
       raise TypeError("g needs to be a Graph: %s" % g)
     self._node_def = copy.deepcopy(node_def)
+    # Serialized `GraphDef` holding only `self._node_def`, computed lazily by
+    # `_graph_def_bytes()` and cleared whenever the `NodeDef` changes. It is not
+    # cached once the `NodeDef` has been handed out by the `node_def` property,
+    # since the caller may modify it at any time.
+    self._node_def_bytes = None
+    self._node_def_exposed = False
     self._graph = g
     if inputs is None:
       inputs = []
@@ -1218,7 +1320,7 @@ class Operation(object):
                  for i, x in zip(self._inputs, input_types)):
         raise TypeError("In op '%s', input types (%s) are not compatible "
                         "with expected types (%s)" % (
-                            self.node_def.name,
+                            self._node_def.name,
                             [i.dtype for i in self._inputs],
                             input_types))
     self._input_types = input_types
@@ -1239,7 +1341,7 @@ class Operation(object):
 
     self._original_op = original_op
     self._op_def = op_def
-    self._traceback = _extract_stack()
+    self._traceback = g._traceback_recorder.record()
     # Add this op to the current control flow context:
     self._control_flow_context = g._get_control_flow_context()
     if self._control_flow_context is not None:
@@ -1317,6 +1419,7 @@ class Operation(object):
       device: string or device..  The device to set.
     """
     self._node_def.device = _device_string(device)
+    self._node_def_bytes = None
 
   def _add_input(self, tensor, dtype=None):
     """Add a new input to this operation.
@@ -1413,6 +1516,7 @@ class Operation(object):
 
   # Methods below are used when building the NodeDef and Graph proto.
   def _recompute_node_def(self):
+    self._node_def_bytes = None
     del self._node_def.input[:]
     self._node_def.input.extend([t._as_node_def_input() for t in self._inputs])
     if self._control_inputs:
@@ -1497,8 +1601,32 @@ class Operation(object):
       [`NodeDef`](https://www.tensorflow.org/code/tensorflow/core/framework/node_def.proto)
       protocol buffer.
     """
+    # The caller may modify the returned proto at any time.
+    self._node_def_bytes = None
+    self._node_def_exposed = True
     return self._node_def
 
+  def _graph_def_bytes(self):
+    """Returns a serialized `GraphDef` whose only node is this operation.
+
+    Serialized protos concatenate like `MergeFrom`, so the serialized
+    `GraphDef` of several operations is the concatenation of their results.
+    The result is cached until the `NodeDef` is modified through the methods of
+    this class. Once the `NodeDef` has been returned by the `node_def` property,
+    it is serialized on every call instead.
+
+    Returns:
+      A byte string.
+    """
+    if self._node_def_bytes is not None:
+      return self._node_def_bytes
+    graph = graph_pb2.GraphDef()
+    graph.node.extend([self._node_def])
+    data = graph.SerializeToString()
+    if not self._node_def_exposed:
+      self._node_def_bytes = data
+    return data
+
   @property
   def op_def(self):
     """Returns the `OpDef` proto that represents the type of this op.
@@ -1512,8 +1640,13 @@ class Operation(object):
 
   @property
   def traceback(self):
-    """Returns the call stack from when this operation was constructed."""
-    return _convert_stack(self._traceback)
+    """Returns the call stack from when this operation was constructed.
+
+    Depending on the traceback policy of the graph, the stack may be reduced
+    to a single frame; see `Graph.set_traceback_policy()`.
+    """
+    return _convert_stack(self._graph._traceback_recorder.frames(
+        self._traceback))
 
   @property
   def traceback_with_start_lines(self):
@@ -1522,7 +1655,9 @@ class Operation(object):
     Returns:
       A list of 5-tuples (filename, lineno, name, code, func_start_lineno).
     """
-    return _convert_stack(self._traceback, include_func_start_lineno=True)
+    return _convert_stack(
+        self._graph._traceback_recorder.frames(self._traceback),
+        include_func_start_lineno=True)
 
   def get_attr(self, name):
     """Returns the value of the attr of this op with the given `name`.
@@ -1911,6 +2046,106 @@ def _name_from_scope_name(name):
   return name[:-1] if name[-1] == "/" else name
 
 
+# Characters with a special meaning in a regular expression. `re.match` of a
+# scope without any of them matches exactly the names that start with it.
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _filter_by_scope(values, scope):
+  """Returns the values whose `name` attribute matches `scope`."""
+  if (isinstance(scope, six.string_types) and
+      _REGEX_SPECIAL_CHARS.isdisjoint(scope)):
+    return [item for item in values
+            if hasattr(item, "name") and item.name.startswith(scope)]
+  regex = re.compile(scope)
+  return [item for item in values
+          if hasattr(item, "name") and regex.match(item.name)]
+
+
+class _CollectionIndex(object):
+  """Answers `Graph.get_collection()` queries with a scope for a collection.
+
+  The index is only used for collections that are modified through
+  `Graph.add_to_collection()`, so that values are only ever appended to them,
+  and it is brought up to date with the values added since the last query.
+  Scopes without regex special characters are answered from a sorted list of
+  the names in the collection. The results of other scopes are cached.
+  """
+
+  # Above this many cached regex scopes, the cache is cleared.
+  _MAX_CACHED_SCOPES = 100
+
+  # Above this many new names, the sorted names are re-sorted instead of
+  # inserting each new name.
+  _MAX_INSERTIONS = 64
+
+  def __init__(self):
+    # Sorted list of (name, position in the collection) tuples of the first
+    # `_num_sorted` values in the collection.
+    self._sorted_names = []
+    self._num_sorted = 0
+    # Maps a scope to a list [compiled regex, number of values scanned,
+    # matching values].
+    self._regex_results = {}
+
+  def get(self, values, scope):
+    """Returns the values whose `name` attribute matches `scope`.
+
+    Args:
+      values: The collection list. It must only have grown since the last call.
+      scope: The scope to filter by, as for `Graph.get_collection()`.
+
+    Returns:
+      A new list of the matching values, in collection order.
+    """
+    if (isinstance(scope, six.string_types) and
+        _REGEX_SPECIAL_CHARS.isdisjoint(scope)):
+      return self._get_prefix(values, scope)
+    return self._get_regex(values, scope)
+
+  def _get_prefix(self, values, prefix):
+    """Returns the values whose name starts with `prefix`."""
+    new_names = []
+    for i in xrange(self._num_sorted, len(values)):
+      item = values[i]
+      if hasattr(item, "name"):
+        new_names.append((item.name, i))
+    self._num_sorted = len(values)
+    if len(new_names) > self._MAX_INSERTIONS:
+      self._sorted_names.extend(new_names)
+      self._sorted_names.sort()
+    else:
+      for name_and_position in new_names:
+        bisect.insort(self._sorted_names, name_and_position)
+
+    sorted_names = self._sorted_names
+    positions = []
+    for j in xrange(bisect.bisect_left(sorted_names, (prefix,)),
+                    len(sorted_names)):
+      name, i = sorted_names[j]
+      if not name.startswith(prefix):
+        break
+      positions.append(i)
+    positions.sort()
+    return [values[i] for i in positions]
+
+  def _get_regex(self, values, scope):
+    """Returns the values whose name matches the regex `scope`."""
+    entry = self._regex_results.get(scope)
+    if entry is None:
+      if len(self._regex_results) >= self._MAX_CACHED_SCOPES:
+        self._regex_results.clear()
+      entry = [re.compile(scope), 0, []]
+      self._regex_results[scope] = entry
+    regex, num_scanned, matches = entry
+    for i in xrange(num_scanned, len(values)):
+      item = values[i]
+      if hasattr(item, "name") and regex.match(item.name):
+        matches.append(item)
+    entry[1] = len(values)
+    return list(matches)
+
+
 class Graph(object):
   """A TensorFlow computation, represented as a dataflow graph.
 
@@ -1972,6 +2207,11 @@ class Graph(object):
     self._next_id_counter = 0  # GUARDED_BY(self._lock)
     self._nodes_by_name = dict()  # GUARDED_BY(self._lock)
     self._version = 0  # GUARDED_BY(self._lock)
+    # Append-only log of the added ops, and of `self._version` after each was
+    # added. `self._version_log` is non-decreasing, so the ops added since the
+    # graph had a given version can be found by bisection.
+    self._op_log = []  # GUARDED_BY(self._lock)
+    self._version_log = []  # GUARDED_BY(self._lock)
     # Current name stack: uniquified names
     self._name_stack = ""
     # Maps a name used in the graph to the next id to use for that name.
@@ -1985,8 +2225,15 @@ class Graph(object):
     self._control_flow_context = None
     # A new node will depend of the union of all of the nodes in the stack.
     self._control_dependencies_stack = []
+    # Records the call stacks from which ops are constructed.
+    self._traceback_recorder = _TracebackRecorder()
     # Arbritrary collections of objects.
     self._collections = {}
+    # Maps a collection name to the `_CollectionIndex` used to filter it by
+    # scope. Collections returned by `get_collection_ref()` may be modified in
+    # place, so they are not indexed and are always scanned.
+    self._collection_indices = {}  # GUARDED_BY(self._lock)
+    self._collections_by_ref = set()  # GUARDED_BY(self._lock)
     # The graph-level random seed
     self._seed = None
     # A dictionary of attributes that should be applied to all ops.
@@ -2057,6 +2304,8 @@ class Graph(object):
       self._nodes_by_id[op._id] = op
       self._nodes_by_name[op.name] = op
       self._version = max(self._version, op._id)
+      self._op_log.append(op)
+      self._version_log.append(self._version)
       # pylint: enable=protected-access
 
   @property
@@ -2108,6 +2357,40 @@ class Graph(object):
     """
     self._finalized = True
 
+  def set_traceback_policy(self, policy, sample_interval=100):
+    """Sets how the call stacks of new operations are recorded.
+
+    Every `tf.Operation` records the call stack from which it was constructed,
+    which is reported by `Operation.traceback` and used in error messages and
+    by the debugger. Recording every frame of every stack costs time and memory
+    in very large graphs, so the policy can be one of:
+
+    * `"full"` (the default): Record every frame.
+    * `"sampled"`: Record every frame for one in `sample_interval` operations,
+      and only the innermost frame of user code for the others.
+    * `"user_frame"`: Only record the innermost frame of user code, i.e. the
+      frame outside of the TensorFlow library from which the operation was
+      constructed.
+
+    The policy only applies to operations created after this call.
+
+    Args:
+      policy: One of `"full"`, `"sampled"` or `"user_frame"`.
+      sample_interval: (Optional.) With the `"sampled"` policy, the number of
+        operations per operation with a full call stack.
+
+    Raises:
+      ValueError: If `policy` is not a known policy, or `sample_interval` is
+        not positive.
+    """
+    if policy not in _TRACEBACK_POLICIES:
+      raise ValueError("Unknown traceback policy %r, expected one of %s" %
+                       (policy, ", ".join(_TRACEBACK_POLICIES)))
+    if sample_interval < 1:
+      raise ValueError("sample_interval must be positive, but is %d" %
+                       sample_interval)
+    self._traceback_recorder.set_policy(policy, sample_interval)
+
   def _unsafe_unfinalize(self):
     """Opposite of `finalize`. Internal interface.
 
@@ -2164,30 +2447,97 @@ class Graph(object):
       graph = graph_pb2.GraphDef()
       graph.versions.CopyFrom(self._graph_def_versions)
       bytesize = 0
-      for op_id in sorted(self._nodes_by_id):
-        op = self._nodes_by_id[op_id]
-        if from_version is None or op_id > from_version:
-          graph.node.extend([op.node_def])
-          if op.outputs and add_shapes:
-            assert "_output_shapes" not in graph.node[-1].attr
-            graph.node[-1].attr["_output_shapes"].list.shape.extend([
-                output.get_shape().as_proto() for output in op.outputs])
-          bytesize += op.node_def.ByteSize()
-          if bytesize >= (1 << 31) or bytesize < 0:
-            raise ValueError("GraphDef cannot be larger than 2GB.")
-      if self._functions:
-        for f in self._functions.values():
-          bytesize += f.definition.ByteSize()
-          if bytesize >= (1 << 31) or bytesize < 0:
-            raise ValueError("GraphDef cannot be larger than 2GB.")
-          graph.library.function.extend([f.definition])
-          if f.grad_func_name:
-            grad_def = function_pb2.GradientDef()
-            grad_def.function_name = f.name
-            grad_def.gradient_func = f.grad_func_name
-            graph.library.gradient.extend([grad_def])
+      for op in self._ops_since(from_version):
+        graph.node.extend([op._node_def])  # pylint: disable=protected-access
+        if op.outputs and add_shapes:
+          assert "_output_shapes" not in graph.node[-1].attr
+          graph.node[-1].attr["_output_shapes"].list.shape.extend([
+              output.get_shape().as_proto() for output in op.outputs])
+        bytesize += op._node_def.ByteSize()  # pylint: disable=protected-access
+        if bytesize >= (1 << 31) or bytesize < 0:
+          raise ValueError("GraphDef cannot be larger than 2GB.")
+      self._add_functions_to_graph_def(graph, bytesize)
       return graph, self._version
 
+  def _as_graph_def_bytes(self, from_version=None):
+    """Returns a serialized `GraphDef` representation of this graph.
+
+    This is equivalent to serializing the result of `_as_graph_def()`, but
+    reuses the serialized `NodeDef` of each operation across calls, except for
+    operations whose `NodeDef` was handed out by their `node_def` property.
+
+    This method is thread-safe.
+
+    Args:
+      from_version: Optional.  If this is set, returns a `GraphDef`
+        containing only the nodes that were added to this graph since
+        its `version` property had the given value.
+
+    Returns:
+      A tuple containing the serialized `GraphDef` as a byte string, and the
+      version of the graph to which that `GraphDef` corresponds.
+
+    Raises:
+      ValueError: If the `graph_def` would be too large.
+    """
+    with self._lock:
+      # pylint: disable=protected-access
+      chunks = [op._graph_def_bytes() for op in self._ops_since(from_version)]
+      # pylint: enable=protected-access
+      bytesize = sum(len(chunk) for chunk in chunks)
+      if bytesize >= (1 << 31):
+        raise ValueError("GraphDef cannot be larger than 2GB.")
+      graph = graph_pb2.GraphDef()
+      graph.versions.CopyFrom(self._graph_def_versions)
+      self._add_functions_to_graph_def(graph, bytesize)
+      chunks.append(graph.SerializeToString())
+      return b"".join(chunks), self._version
+
+  def _ops_since(self, from_version):
+    """Returns the ops added since the graph had version `from_version`.
+
+    Must be called with `self._lock` held. Only the ops added since then are
+    visited, so this takes time proportional to their number.
+
+    Args:
+      from_version: A value of the `version` property, or None for all ops.
+
+    Returns:
+      A list of `Operation`s with an id greater than `from_version`, sorted by
+      id.
+    """
+    if from_version is None:
+      return [self._nodes_by_id[op_id] for op_id in sorted(self._nodes_by_id)]
+    # Every op added before the version first exceeded `from_version` has an
+    # id of at most `from_version`.
+    start = bisect.bisect_right(self._version_log, from_version)
+    # pylint: disable=protected-access
+    ops = [op for op in self._op_log[start:] if op._id > from_version]
+    ops.sort(key=lambda op: op._id)
+    # pylint: enable=protected-access
+    return ops
+
+  def _add_functions_to_graph_def(self, graph, bytesize):
+    """Adds the functions defined in this graph to the library of `graph`.
+
+    Args:
+      graph: A `GraphDef`.
+      bytesize: The size in bytes of the nodes already in `graph`.
+
+    Raises:
+      ValueError: If the `graph_def` would be too large.
+    """
+    for f in self._functions.values():
+      bytesize += f.definition.ByteSize()
+      if bytesize >= (1 << 31) or bytesize < 0:
+        raise ValueError("GraphDef cannot be larger than 2GB.")
+      graph.library.function.extend([f.definition])
+      if f.grad_func_name:
+        grad_def = function_pb2.GradientDef()
+        grad_def.function_name = f.name
+        grad_def.gradient_func = f.grad_func_name
+        graph.library.gradient.extend([grad_def])
+
   def as_graph_def(self, from_version=None, add_shapes=False):
     """Returns a serialized `GraphDef` representation of this graph.
 
@@ -2383,8 +2733,9 @@ class Graph(object):
             ret._set_device(colocation_op.device)
 
       all_colocation_groups = sorted(set(all_colocation_groups))
-      ret.node_def.attr["_class"].CopyFrom(attr_value_pb2.AttrValue(
+      ret._node_def.attr["_class"].CopyFrom(attr_value_pb2.AttrValue(
           list=attr_value_pb2.AttrValue.ListValue(s=all_colocation_groups)))
+      ret._node_def_bytes = None
 
     # Sets "container" attribute if
     # (1) self._container is not None
@@ -2394,10 +2745,11 @@ class Graph(object):
     if (self._container and
         op_type in self._registered_ops and
         self._registered_ops[op_type].is_stateful and
-        "container" in ret.node_def.attr and
-        not ret.node_def.attr["container"].s):
-      ret.node_def.attr["container"].CopyFrom(
+        "container" in ret._node_def.attr and
+        not ret._node_def.attr["container"].s):
+      ret._node_def.attr["container"].CopyFrom(
           attr_value_pb2.AttrValue(s=compat.as_bytes(self._container)))
+      ret._node_def_bytes = None
 
     return ret
 
@@ -2693,6 +3045,8 @@ class Graph(object):
       if coll_list is None:
         coll_list = []
         self._collections[name] = coll_list
+      self._collections_by_ref.add(name)
+      self._collection_indices.pop(name, None)
       return coll_list
 
   def get_collection(self, name, scope=None):
@@ -2723,13 +3077,13 @@ class Graph(object):
         return []
       if scope is None:
         return list(coll_list)
-      else:
-        c = []
-        regex = re.compile(scope)
-        for item in coll_list:
-          if hasattr(item, "name") and regex.match(item.name):
-            c.append(item)
-        return c
+      if name in self._collections_by_ref:
+        return _filter_by_scope(coll_list, scope)
+      index = self._collection_indices.get(name)
+      if index is None:
+        index = _CollectionIndex()
+        self._collection_indices[name] = index
+      return index.get(coll_list, scope)
 
   def get_all_collection_keys(self):
     """Returns a list of collections used in this graph."""
@@ -2747,6 +3101,8 @@ class Graph(object):
     with self._lock:
       if name in self._collections:
         del self._collections[name]
+      self._collection_indices.pop(name, None)
+      self._collections_by_ref.discard(name)
 
   @tf_contextlib.contextmanager
   def _original_op(self, op):
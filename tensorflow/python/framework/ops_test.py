@@ -19,9 +19,11 @@ from __future__ import division
 from __future__ import print_function
 
 import gc
+import time
 import weakref
 
 from tensorflow.core.framework import attr_value_pb2
+from tensorflow.core.framework import graph_pb2
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.python.client import session
 from tensorflow.python.framework import common_shapes
@@ -914,6 +916,35 @@ class CollectionTest(test_util.TensorFlowTestCase):
     empty_coll_ref3 = g.get_collection_ref("empty")
     self.assertTrue(empty_coll_ref3 is empty_coll_ref)
 
+  def test_get_collection_with_scope(self):
+    g = ops.Graph()
+    a = ObjectWithName("a/foo")
+    ab = ObjectWithName("a/b/foo")
+    b = ObjectWithName("b/foo")
+    a2 = ObjectWithName("a/bar")
+    for value in [b, a, 27, ab]:
+      g.add_to_collection("blah", value)
+    self.assertEqual([a, ab], g.get_collection("blah", "a/"))
+    self.assertEqual([ab], g.get_collection("blah", "a/b"))
+    self.assertEqual([b, ab], g.get_collection("blah", ".*b"))
+    self.assertEqual([b, a, ab], g.get_collection("blah", ""))
+    self.assertEqual([], g.get_collection("blah", "c"))
+
+    # Scoped queries reflect the values added since the last query.
+    g.add_to_collection("blah", a2)
+    self.assertEqual([a, ab, a2], g.get_collection("blah", "a/"))
+    self.assertEqual([b, ab, a2], g.get_collection("blah", ".*b"))
+    g.clear_collection("blah")
+    g.add_to_collection("blah", ab)
+    self.assertEqual([ab], g.get_collection("blah", "a/"))
+    self.assertEqual([ab], g.get_collection("blah", ".*b"))
+
+    # Collections can be modified in place through get_collection_ref().
+    coll_ref = g.get_collection_ref("blah")
+    coll_ref[:] = [b, a]
+    self.assertEqual([a], g.get_collection("blah", "a/"))
+    self.assertEqual([b], g.get_collection("blah", ".*b"))
+
   def test_add_to_collections_uniquify(self):
     g = ops.Graph()
     g.add_to_collections([1, 2, 1], "key")
@@ -1449,6 +1480,50 @@ class AsGraphDefTest(test_util.TensorFlowTestCase):
       }
       """, gd)
 
+  def testAsGraphDefFromVersion(self):
+    with ops.Graph().as_default() as g:
+      _apply_op(g, "an_op", [], [dtypes.float32], name="a")
+      _, version = g._as_graph_def()
+      _apply_op(g, "an_op", [], [dtypes.float32], name="b")
+      _apply_op(g, "an_op", [], [dtypes.float32], name="c")
+      gd, new_version = g._as_graph_def(from_version=version)
+      self.assertEqual(["b", "c"], [node.name for node in gd.node])
+      self.assertEqual(g.version, new_version)
+      gd, _ = g._as_graph_def(from_version=new_version)
+      self.assertEqual([], list(gd.node))
+
+  def testAsGraphDefBytes(self):
+
+    def assert_bytes_match(from_version=None):
+      data, version = g._as_graph_def_bytes(from_version=from_version)
+      expected, expected_version = g._as_graph_def(from_version=from_version)
+      gd = graph_pb2.GraphDef()
+      gd.ParseFromString(data)
+      self.assertProtoEquals(expected, gd)
+      self.assertEqual(expected_version, version)
+
+    with ops.Graph().as_default() as g:
+      a = _apply_op(g, "an_op", [], [dtypes.float32], name="a")
+      b = _apply_op(g, "an_op", [a], [dtypes.float32], name="b")
+      assert_bytes_match()
+      _, version = g._as_graph_def()
+      c = _apply_op(g, "an_op", [a, b], [dtypes.float32], name="c")
+      assert_bytes_match()
+      assert_bytes_match(version)
+
+      # Changes to a NodeDef invalidate its cached serialization.
+      b.op._add_control_input(a.op)
+      b.op._set_device("/cpu:0")
+      a.op.node_def.attr["_kernel"].CopyFrom(
+          attr_value_pb2.AttrValue(s=b"label"))
+      assert_bytes_match()
+
+      # A NodeDef kept by the caller may change after it was serialized.
+      node_def = c.op.node_def
+      assert_bytes_match()
+      node_def.attr["_kernel"].CopyFrom(attr_value_pb2.AttrValue(s=b"label"))
+      assert_bytes_match()
+
 
 @ops.RegisterStatistics("a", "flops")
 def _calc_a_forward_flops(unused_graph, unused_node):
@@ -1724,6 +1799,74 @@ class TracebackTest(test_util.TensorFlowTestCase):
           self.assertEquals(5, len(frame_with_start_line))
           self.assertEquals(frame, frame_with_start_line[:-1])
 
+  def _assertTracebackEndsHere(self, op):
+    filename, _, name, _ = op.traceback[-1]
+    self.assertTrue(filename.endswith("ops_test.py"))
+    self.assertEqual("testTracebackPolicy", name)
+
+  def testTracebackPolicy(self):
+    g = ops.Graph()
+    with g.as_default():
+      full_op = constant_op.constant(1.0).op
+      self.assertGreater(len(full_op.traceback), 1)
+      self.assertEqual("__init__", full_op.traceback[-1][2])
+
+      g.set_traceback_policy("user_frame")
+      user_ops = []
+      for _ in range(2):
+        user_ops.append(constant_op.constant(1.0).op)
+      for op in user_ops:
+        self.assertEqual(1, len(op.traceback))
+        self._assertTracebackEndsHere(op)
+        self.assertEqual(1, len(op.traceback_with_start_lines))
+      # Identical stacks are interned.
+      self.assertIs(user_ops[0]._traceback, user_ops[1]._traceback)
+
+      g.set_traceback_policy("sampled", sample_interval=2)
+      sampled_ops = []
+      for _ in range(4):
+        sampled_ops.append(constant_op.constant(1.0).op)
+      self.assertEqual([len(full_op.traceback), 1] * 2,
+                       [len(op.traceback) for op in sampled_ops])
+      for op in sampled_ops[1::2]:
+        self._assertTracebackEndsHere(op)
+
+      with self.assertRaisesRegexp(ValueError, "Unknown traceback policy"):
+        g.set_traceback_policy("none")
+      with self.assertRaisesRegexp(ValueError, "must be positive"):
+        g.set_traceback_policy("sampled", sample_interval=0)
+
+
+class GraphDefSerializationBenchmark(googletest.Benchmark):
+  """Benchmarks extracting the `GraphDef` of a large graph."""
+
+  def _report(self, name, fn, num_iters):
+    start = time.time()
+    for _ in range(num_iters):
+      fn()
+    wall_time = (time.time() - start) / num_iters
+    self.report_benchmark(iters=num_iters, wall_time=wall_time, name=name)
+
+  def benchmarkAsGraphDef(self, num_nodes=200000, delta_nodes=10):
+    with ops.Graph().as_default() as g:
+      for _ in range(num_nodes):
+        control_flow_ops.no_op()
+
+      def add_nodes_and_extract_delta():
+        version = g.version
+        for _ in range(delta_nodes):
+          control_flow_ops.no_op()
+        g._as_graph_def_bytes(from_version=version)
+
+      self._report("delta_%d_of_%d_nodes" % (delta_nodes, num_nodes),
+                   add_nodes_and_extract_delta, num_iters=100)
+      self._report("full_proto_%d_nodes" % num_nodes,
+                   lambda: g._as_graph_def()[0].SerializeToString(),
+                   num_iters=3)
+      g._as_graph_def_bytes()
+      self._report("full_cached_bytes_%d_nodes" % num_nodes,
+                   g._as_graph_def_bytes, num_iters=3)
+
 
 if __name__ == "__main__":
   googletest.main()
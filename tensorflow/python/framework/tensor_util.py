@@ -45,8 +45,8 @@ def ExtractBitsFromFloat16(x):
 
 
 def SlowAppendFloat16ArrayToTensorProto(tensor_proto, proto_values):
-  tensor_proto.half_val.extend([
-      ExtractBitsFromFloat16(x) for x in proto_values])
+  tensor_proto.half_val.extend(
+      np.asarray(proto_values, dtype=np.float16).view(np.uint16).tolist())
 
 if _FAST_TENSOR_UTIL_AVAILABLE:
   _NP_TO_APPEND_FN = {
@@ -81,35 +81,35 @@ if _FAST_TENSOR_UTIL_AVAILABLE:
 else:
 
   def SlowAppendFloat32ArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.float_val.extend([np.asscalar(x) for x in proto_values])
+    tensor_proto.float_val.extend(proto_values.tolist())
 
   def SlowAppendFloat64ArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.double_val.extend([np.asscalar(x) for x in proto_values])
+    tensor_proto.double_val.extend(proto_values.tolist())
 
   def SlowAppendIntArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.int_val.extend([np.asscalar(x) for x in proto_values])
+    tensor_proto.int_val.extend(proto_values.tolist())
 
   def SlowAppendQIntArrayToTensorProto(tensor_proto, proto_values):
     tensor_proto.int_val.extend([np.asscalar(x[0]) for x in proto_values])
 
   def SlowAppendInt64ArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.int64_val.extend([np.asscalar(x) for x in proto_values])
+    tensor_proto.int64_val.extend(proto_values.tolist())
 
+  # The real and imaginary parts of a complex array are interleaved in memory,
+  # as scomplex_val and dcomplex_val expect.
   def SlowAppendComplex64ArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.scomplex_val.extend([np.asscalar(v)
-                                      for x in proto_values
-                                      for v in [x.real, x.imag]])
+    tensor_proto.scomplex_val.extend(
+        np.ascontiguousarray(proto_values).view(np.float32).tolist())
 
   def SlowAppendComplex128ArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.dcomplex_val.extend([np.asscalar(v)
-                                      for x in proto_values
-                                      for v in [x.real, x.imag]])
+    tensor_proto.dcomplex_val.extend(
+        np.ascontiguousarray(proto_values).view(np.float64).tolist())
 
   def SlowAppendObjectArrayToTensorProto(tensor_proto, proto_values):
     tensor_proto.string_val.extend([compat.as_bytes(x) for x in proto_values])
 
   def SlowAppendBoolArrayToTensorProto(tensor_proto, proto_values):
-    tensor_proto.bool_val.extend([np.asscalar(x) for x in proto_values])
+    tensor_proto.bool_val.extend(proto_values.tolist())
 
   _NP_TO_APPEND_FN = {
       np.float16: SlowAppendFloat16ArrayToTensorProto,
@@ -187,9 +187,10 @@ def _FlattenToStrings(nested_strings):
 
 
 _TENSOR_CONTENT_TYPES = frozenset([
-    dtypes.float32, dtypes.float64, dtypes.int32, dtypes.uint8, dtypes.int16,
-    dtypes.int8, dtypes.int64, dtypes.qint8, dtypes.quint8, dtypes.qint16,
-    dtypes.quint16, dtypes.qint32,
+    dtypes.float16, dtypes.float32, dtypes.float64, dtypes.int32, dtypes.uint8,
+    dtypes.uint16, dtypes.int16, dtypes.int8, dtypes.int64, dtypes.qint8,
+    dtypes.quint8, dtypes.qint16, dtypes.quint16, dtypes.qint32,
+    dtypes.complex64, dtypes.complex128, dtypes.bool,
 ])
 
 
@@ -302,6 +303,79 @@ def _AssertCompatible(values, dtype):
                       (dtype.name, repr(mismatch), type(mismatch).__name__))
 
 
+# The kinds of the numpy arrays inferred from Python values that are accepted
+# for a dtype, matching the checks of `_TF_TO_IS_OK`. Values for other dtypes in
+# `_TF_TO_IS_OK` are always checked element by element, and values for dtypes
+# not in it are accepted unless they are inferred as objects.
+_TF_TO_NUMPY_KINDS = {
+    dtypes.bool: "b",
+    dtypes.complex128: "biufc",
+    dtypes.complex64: "biufc",
+    dtypes.float16: "biuf",
+    dtypes.float32: "biuf",
+    dtypes.float64: "biuf",
+    dtypes.int16: "biu",
+    dtypes.int32: "biu",
+    dtypes.int64: "biu",
+    dtypes.int8: "biu",
+    dtypes.uint16: "biu",
+    dtypes.uint8: "biu",
+}
+_NOT_OBJECT_NUMPY_KINDS = "biufcmMSUV"
+
+
+def _IntegersFit(nparray, np_dt):
+  """Returns False if `nparray` has integers out of the range of `np_dt`."""
+  if (np_dt is None or nparray.dtype.kind not in "iu" or
+      np.dtype(np_dt).kind not in "iu" or
+      np.can_cast(nparray.dtype, np_dt) or not nparray.size):
+    return True
+  info = np.iinfo(np_dt)
+  return nparray.min() >= info.min and nparray.max() <= info.max
+
+
+def _ConvertNestedListToArray(values, dtype, np_dt):
+  """Converts a (nested) list of Python values to a numpy array.
+
+  The values are converted with a single call to `np.array`, and their types
+  are checked on the kind of the resulting array. Only if that check fails,
+  e.g. because the values were inferred as objects, are they walked by
+  `_AssertCompatible`, to report the incompatible value, and converted to
+  `np_dt` directly. This is also the case for integers that do not fit in
+  `np_dt`, so that numpy handles them as it would without the inference.
+
+  Args:
+    values: A Python scalar, or a (nested) list or tuple of them.
+    dtype: The `DType` of the tensor, or None.
+    np_dt: The numpy dtype to convert the values to, or None to infer it.
+
+  Returns:
+    A numpy array of the values.
+
+  Raises:
+    TypeError: If the values are not compatible with `dtype`.
+  """
+  if dtype in _TF_TO_NUMPY_KINDS:
+    kinds = _TF_TO_NUMPY_KINDS[dtype]
+  elif dtype in _TF_TO_IS_OK:
+    kinds = ""
+  else:
+    kinds = _NOT_OBJECT_NUMPY_KINDS
+  nparray = None
+  if kinds:
+    try:
+      nparray = np.array(values)
+    except (TypeError, ValueError):
+      pass
+  if (nparray is None or nparray.dtype.kind not in kinds or
+      not _IntegersFit(nparray, np_dt)):
+    _AssertCompatible(values, dtype)
+    return np.array(values, dtype=np_dt)
+  if np_dt is not None:
+    nparray = nparray.astype(np_dt, copy=False)
+  return nparray
+
+
 def make_tensor_proto(values, dtype=None, shape=None, verify_shape=False):
   """Create a TensorProto.
 
@@ -352,7 +426,7 @@ def make_tensor_proto(values, dtype=None, shape=None, verify_shape=False):
   # We first convert value to a numpy array or scalar.
   if isinstance(values, (np.ndarray, np.generic)):
     if dtype:
-      nparray = values.astype(dtype.as_numpy_dtype)
+      nparray = values.astype(dtype.as_numpy_dtype, copy=False)
     else:
       nparray = values
   elif callable(getattr(values, "__array__", None)):
@@ -371,8 +445,7 @@ def make_tensor_proto(values, dtype=None, shape=None, verify_shape=False):
     if np.prod(shape) == 0:
       nparray = np.empty(shape, dtype=np_dt)
     else:
-      _AssertCompatible(values, dtype)
-      nparray = np.array(values, dtype=np_dt)
+      nparray = _ConvertNestedListToArray(values, dtype, np_dt)
       # check to them.
       # We need to pass in quantized values as tuples, so don't apply the shape
       if (list(nparray.shape) != _GetDenseDimensions(values) and
@@ -19,6 +19,8 @@ from __future__ import division
 from __future__ import print_function
 
 import sys
+import time
+
 import numpy as np
 
 from tensorflow.python.framework import constant_op
@@ -200,16 +202,18 @@ class TensorUtilTest(test.TestCase):
 
   def testHalf(self):
     t = tensor_util.make_tensor_proto(np.array([10.0, 20.0], dtype=np.float16))
-    self.assertProtoEquals("""
-      dtype: DT_HALF
-      tensor_shape {
-        dim {
-          size: 2
-        }
-      }
-      half_val: 18688
-      half_val: 19712
-      """, t)
+    if sys.byteorder == "big":
+      self.assertProtoEquals("""
+        dtype: DT_HALF
+        tensor_shape { dim { size: 2 } }
+        tensor_content: "I\000M\000"
+        """, t)
+    else:
+      self.assertProtoEquals("""
+        dtype: DT_HALF
+        tensor_shape { dim { size: 2 } }
+        tensor_content: "\000I\000M"
+        """, t)
 
     a = tensor_util.MakeNdarray(t)
     self.assertEquals(np.float16, a.dtype)
@@ -549,16 +553,12 @@ class TensorUtilTest(test.TestCase):
   def testComplex64N(self):
     t = tensor_util.make_tensor_proto(
         [(1 + 2j), (3 + 4j), (5 + 6j)], shape=[1, 3], dtype=dtypes.complex64)
-    self.assertProtoEquals("""
-      dtype: DT_COMPLEX64
-      tensor_shape { dim { size: 1 } dim { size: 3 } }
-      scomplex_val: 1
-      scomplex_val: 2
-      scomplex_val: 3
-      scomplex_val: 4
-      scomplex_val: 5
-      scomplex_val: 6
-      """, t)
+    self.assertEquals(dtypes.complex64, t.dtype)
+    self.assertProtoEquals("dim { size: 1 } dim { size: 3 }", t.tensor_shape)
+    # The real and imaginary parts are interleaved in tensor_content.
+    self.assertEquals(
+        np.array([1, 2, 3, 4, 5, 6], dtype=np.float32).tostring(),
+        t.tensor_content)
     a = tensor_util.MakeNdarray(t)
     self.assertEquals(np.complex64, a.dtype)
     self.assertAllEqual(np.array([[(1 + 2j), (3 + 4j), (5 + 6j)]]), a)
@@ -566,16 +566,12 @@ class TensorUtilTest(test.TestCase):
   def testComplex128N(self):
     t = tensor_util.make_tensor_proto(
         [(1 + 2j), (3 + 4j), (5 + 6j)], shape=[1, 3], dtype=dtypes.complex128)
-    self.assertProtoEquals("""
-      dtype: DT_COMPLEX128
-      tensor_shape { dim { size: 1 } dim { size: 3 } }
-      dcomplex_val: 1
-      dcomplex_val: 2
-      dcomplex_val: 3
-      dcomplex_val: 4
-      dcomplex_val: 5
-      dcomplex_val: 6
-      """, t)
+    self.assertEquals(dtypes.complex128, t.dtype)
+    self.assertProtoEquals("dim { size: 1 } dim { size: 3 }", t.tensor_shape)
+    # The real and imaginary parts are interleaved in tensor_content.
+    self.assertEquals(
+        np.array([1, 2, 3, 4, 5, 6], dtype=np.float64).tostring(),
+        t.tensor_content)
     a = tensor_util.MakeNdarray(t)
     self.assertEquals(np.complex128, a.dtype)
     self.assertAllEqual(np.array([[(1 + 2j), (3 + 4j), (5 + 6j)]]), a)
@@ -584,19 +580,12 @@ class TensorUtilTest(test.TestCase):
     t = tensor_util.make_tensor_proto(
         np.array([[(1 + 2j), (3 + 4j)], [(5 + 6j), (7 + 8j)]]),
         dtype=dtypes.complex64)
-    # scomplex_val are real_0, imag_0, real_1, imag_1, ...
-    self.assertProtoEquals("""
-      dtype: DT_COMPLEX64
-      tensor_shape { dim { size: 2 } dim { size: 2 } }
-      scomplex_val: 1
-      scomplex_val: 2
-      scomplex_val: 3
-      scomplex_val: 4
-      scomplex_val: 5
-      scomplex_val: 6
-      scomplex_val: 7
-      scomplex_val: 8
-      """, t)
+    self.assertEquals(dtypes.complex64, t.dtype)
+    self.assertProtoEquals("dim { size: 2 } dim { size: 2 }", t.tensor_shape)
+    # The real and imaginary parts are interleaved in tensor_content.
+    self.assertEquals(
+        np.array([1, 2, 3, 4, 5, 6, 7, 8], dtype=np.float32).tostring(),
+        t.tensor_content)
     a = tensor_util.MakeNdarray(t)
     self.assertEquals(np.complex64, a.dtype)
     self.assertAllEqual(
@@ -606,19 +595,12 @@ class TensorUtilTest(test.TestCase):
     t = tensor_util.make_tensor_proto(
         np.array([[(1 + 2j), (3 + 4j)], [(5 + 6j), (7 + 8j)]]),
         dtype=dtypes.complex128)
-    # scomplex_val are real_0, imag_0, real_1, imag_1, ...
-    self.assertProtoEquals("""
-      dtype: DT_COMPLEX128
-      tensor_shape { dim { size: 2 } dim { size: 2 } }
-      dcomplex_val: 1
-      dcomplex_val: 2
-      dcomplex_val: 3
-      dcomplex_val: 4
-      dcomplex_val: 5
-      dcomplex_val: 6
-      dcomplex_val: 7
-      dcomplex_val: 8
-      """, t)
+    self.assertEquals(dtypes.complex128, t.dtype)
+    self.assertProtoEquals("dim { size: 2 } dim { size: 2 }", t.tensor_shape)
+    # The real and imaginary parts are interleaved in tensor_content.
+    self.assertEquals(
+        np.array([1, 2, 3, 4, 5, 6, 7, 8], dtype=np.float64).tostring(),
+        t.tensor_content)
     a = tensor_util.MakeNdarray(t)
     self.assertEquals(np.complex128, a.dtype)
     self.assertAllEqual(
@@ -637,6 +619,33 @@ class TensorUtilTest(test.TestCase):
     with self.assertRaisesRegexp(TypeError, "Failed to convert object"):
       tensor_util.make_tensor_proto([tensor_shape.Dimension(1)])
 
+  def testNestedListTypeErrors(self):
+    with self.assertRaisesRegexp(TypeError, "Expected int32, got 2.5"):
+      tensor_util.make_tensor_proto([[1, 2], [3, 2.5]], dtype=dtypes.int32)
+    with self.assertRaisesRegexp(TypeError, "Expected float32, got 'a'"):
+      tensor_util.make_tensor_proto([[1.0], ["a"]], dtype=dtypes.float32)
+    with self.assertRaisesRegexp(TypeError, "Expected bool, got 1"):
+      tensor_util.make_tensor_proto([True, 1], dtype=dtypes.bool)
+    with self.assertRaisesRegexp(TypeError, "Expected float32, got None"):
+      tensor_util.make_tensor_proto([1.0, None], dtype=dtypes.float32)
+    with self.assertRaisesRegexp(TypeError, "list containing Tensors"):
+      tensor_util.make_tensor_proto(
+          [1.0, constant_op.constant(2.0)], dtype=dtypes.float32)
+
+  def testNumericTypesUseTensorContent(self):
+    for dtype in [dtypes.float16, dtypes.float32, dtypes.float64,
+                  dtypes.int8, dtypes.int16, dtypes.int32, dtypes.int64,
+                  dtypes.uint8, dtypes.uint16, dtypes.complex64,
+                  dtypes.complex128, dtypes.bool]:
+      values = [[1, 0, 1], [0, 1, 1]]
+      if dtype == dtypes.bool:
+        values = [[bool(x) for x in row] for row in values]
+      t = tensor_util.make_tensor_proto(values, dtype=dtype)
+      self.assertEquals(
+          np.array(values, dtype=dtype.as_numpy_dtype).tostring(),
+          t.tensor_content)
+      self.assertAllEqual(values, tensor_util.MakeNdarray(t))
+
   def testTensorShapeVerification(self):
     array = np.array([[1], [2]])
     correct_shape = (2, 1)
@@ -833,5 +842,28 @@ class ConstantValueAsShapeTest(test.TestCase):
     self.assertEqual([16, 37, None, 48], c_val.as_list())
 
 
+class MakeTensorProtoBenchmark(test.Benchmark):
+  """Benchmarks `make_tensor_proto` for large values."""
+
+  def _benchmark(self, name, values, dtype, num_iters=3):
+    tensor_util.make_tensor_proto(values, dtype=dtype)  # Warm-up run.
+    start = time.time()
+    for _ in range(num_iters):
+      tensor_util.make_tensor_proto(values, dtype=dtype)
+    wall_time = (time.time() - start) / num_iters
+    self.report_benchmark(iters=num_iters, wall_time=wall_time, name=name)
+
+  def benchmarkMakeTensorProto(self):
+    for dtype in [dtypes.float16, dtypes.float32, dtypes.float64, dtypes.int32,
+                  dtypes.int64, dtypes.uint16, dtypes.complex64, dtypes.bool]:
+      for size in [1 << 10, 1 << 20]:
+        nparray = (np.random.rand(size // 64, 64) > 0.5).astype(
+            dtype.as_numpy_dtype)
+        self._benchmark("make_tensor_proto_ndarray_%s_%d" % (dtype.name, size),
+                        nparray, dtype)
+        self._benchmark("make_tensor_proto_list_%s_%d" % (dtype.name, size),
+                        nparray.tolist(), dtype)
+
+
 if __name__ == "__main__":
   test.main()
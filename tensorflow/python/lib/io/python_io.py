@@ -19,6 +19,9 @@ See the @{$python/python_io} guide.
 
 @@TFRecordWriter
 @@tf_record_iterator
+@@TFRecordIndexedReader
+@@build_tf_record_index
+@@tf_record_index_path
 @@TFRecordCompressionType
 @@TFRecordOptions
 """
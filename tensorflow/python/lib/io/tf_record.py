@@ -19,10 +19,23 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import struct
+
 from tensorflow.python import pywrap_tensorflow
 from tensorflow.python.framework import errors
+from tensorflow.python.lib.io import file_io
 from tensorflow.python.util import compat
 
+# Every record is framed by a uint64 length, a uint32 CRC of the length and a
+# uint32 CRC of the data.
+_RECORD_OVERHEAD_BYTES = 16
+
+# An index file starts with a magic string, the size of the indexed file and
+# the number of records, followed by the uint64 offset of every record.
+_INDEX_MAGIC = b"TFRINDX1"
+_INDEX_HEADER_FORMAT = "<8sQQ"
+_INDEX_HEADER_SIZE = struct.calcsize(_INDEX_HEADER_FORMAT)
+
 
 class TFRecordCompressionType(object):
   """The type of compression for the record."""
@@ -51,6 +64,17 @@ class TFRecordOptions(object):
     return cls.compression_type_map[options.compression_type]
 
 
+def _new_record_reader(path, start_offset=0, compression_type=""):
+  """Returns a `PyRecordReader` positioned at `start_offset` in `path`."""
+  with errors.raise_exception_on_not_ok_status() as status:
+    reader = pywrap_tensorflow.PyRecordReader_New(
+        compat.as_bytes(path), start_offset, compat.as_bytes(compression_type),
+        status)
+  if reader is None:
+    raise IOError("Could not open %s." % path)
+  return reader
+
+
 def tf_record_iterator(path, options=None):
   """An iterator that read the records from a TFRecords file.
 
@@ -65,12 +89,7 @@ def tf_record_iterator(path, options=None):
     IOError: If `path` cannot be opened for reading.
   """
   compression_type = TFRecordOptions.get_compression_type_string(options)
-  with errors.raise_exception_on_not_ok_status() as status:
-    reader = pywrap_tensorflow.PyRecordReader_New(
-        compat.as_bytes(path), 0, compat.as_bytes(compression_type), status)
-
-  if reader is None:
-    raise IOError("Could not open %s." % path)
+  reader = _new_record_reader(path, 0, compression_type)
   while True:
     try:
       with errors.raise_exception_on_not_ok_status() as status:
@@ -89,21 +108,30 @@ class TFRecordWriter(object):
   """
 
   # TODO(josh11b): Support appending?
-  def __init__(self, path, options=None):
+  def __init__(self, path, options=None, write_index=False):
     """Opens file `path` and creates a `TFRecordWriter` writing to it.
 
     Args:
       path: The path to the TFRecords file.
       options: (optional) A TFRecordOptions object.
+      write_index: (optional) If True, an index of the record offsets is
+        written next to the file on `close()`, so that the records can be read
+        with `TFRecordIndexedReader`. Only supported for uncompressed files.
 
     Raises:
       IOError: If `path` cannot be opened for writing.
+      ValueError: If `write_index` is set for a compressed file.
     """
     compression_type = TFRecordOptions.get_compression_type_string(options)
+    if write_index and compression_type:
+      raise ValueError("Compressed TFRecord files cannot be indexed.")
 
     with errors.raise_exception_on_not_ok_status() as status:
       self._writer = pywrap_tensorflow.PyRecordWriter_New(
           compat.as_bytes(path), compat.as_bytes(compression_type), status)
+    self._path = path
+    self._offsets = [] if write_index else None
+    self._size = 0
 
   def __enter__(self):
     """Enter a `with` block."""
@@ -120,7 +148,209 @@ class TFRecordWriter(object):
       record: str
     """
     self._writer.WriteRecord(record)
+    if self._offsets is not None:
+      self._offsets.append(self._size)
+      self._size += len(compat.as_bytes(record)) + _RECORD_OVERHEAD_BYTES
 
   def close(self):
     """Close the file."""
     self._writer.Close()
+    if self._offsets is not None:
+      _write_index(tf_record_index_path(self._path), self._size, self._offsets)
+      self._offsets = None
+
+
+def tf_record_index_path(path):
+  """Returns the path of the index of the TFRecords file at `path`."""
+  return path + ".index"
+
+
+def _write_index(index_path, file_size, offsets):
+  """Writes an index of the record offsets of a TFRecords file."""
+  header = struct.pack(_INDEX_HEADER_FORMAT, _INDEX_MAGIC, file_size,
+                       len(offsets))
+  file_io.atomic_write_string_to_file(
+      index_path, header + struct.pack("<%dQ" % len(offsets), *offsets))
+
+
+def build_tf_record_index(path, options=None):
+  """Indexes an existing uncompressed TFRecords file.
+
+  This reads the whole file once and writes the offset of every record to
+  `tf_record_index_path(path)`, for use by `TFRecordIndexedReader`. Files
+  written by a `TFRecordWriter` with `write_index=True` need no separate
+  indexing pass.
+
+  Args:
+    path: The path to the TFRecords file.
+    options: (optional) A TFRecordOptions object. Only uncompressed files can
+      be indexed.
+
+  Returns:
+    The number of records in the file.
+
+  Raises:
+    IOError: If `path` cannot be opened for reading.
+    ValueError: If `options` describe a compressed file.
+  """
+  if TFRecordOptions.get_compression_type_string(options):
+    raise ValueError("Compressed TFRecord files cannot be indexed.")
+  reader = _new_record_reader(path)
+  offsets = []
+  offset = 0
+  while True:
+    try:
+      with errors.raise_exception_on_not_ok_status() as status:
+        reader.GetNext(status)
+    except errors.OutOfRangeError:
+      break
+    offsets.append(offset)
+    offset = reader.offset()
+  reader.Close()
+  _write_index(tf_record_index_path(path), offset, offsets)
+  return len(offsets)
+
+
+class TFRecordIndexedReader(object):
+  """Random access to the records of an indexed TFRecords file.
+
+  The offsets of the records are read from the index written by
+  `TFRecordWriter(..., write_index=True)` or by `build_tf_record_index`, so any
+  record can be read without reading the records before it. This allows
+  sampling records from large files, and splitting a single file between
+  several workers by record count:
+
+  ```python
+  reader = tf.python_io.TFRecordIndexedReader(path)
+  for record in reader.shard(num_workers, worker_index):
+    ...
+  ```
+
+  This class implements `__enter__` and `__exit__`, and can be used in `with`
+  blocks like a normal file.
+  """
+
+  def __init__(self, path):
+    """Opens the index of the TFRecords file at `path`.
+
+    Args:
+      path: The path to an uncompressed TFRecords file that has an index.
+
+    Raises:
+      NotFoundError: If there is no index for `path`.
+      ValueError: If the index is corrupt, or does not match the file because
+        the file changed after it was indexed.
+    """
+    self._path = path
+    index_path = tf_record_index_path(path)
+    data = file_io.read_file_to_string(index_path, binary_mode=True)
+    if len(data) < _INDEX_HEADER_SIZE:
+      raise ValueError("Index %s is truncated." % index_path)
+    magic, file_size, num_records = struct.unpack(
+        _INDEX_HEADER_FORMAT, data[:_INDEX_HEADER_SIZE])
+    if magic != _INDEX_MAGIC:
+      raise ValueError("%s is not a TFRecord index." % index_path)
+    if len(data) != _INDEX_HEADER_SIZE + 8 * num_records:
+      raise ValueError("Index %s is truncated." % index_path)
+    if file_io.stat(path).length != file_size:
+      raise ValueError("Index %s is out of date; rebuild it with "
+                       "build_tf_record_index." % index_path)
+    self._offsets = struct.unpack("<%dQ" % num_records,
+                                  data[_INDEX_HEADER_SIZE:])
+
+  def __enter__(self):
+    """Enter a `with` block."""
+    return self
+
+  def __exit__(self, unused_type, unused_value, unused_traceback):
+    """Exit a `with` block."""
+    self.close()
+
+  def __len__(self):
+    """Returns the number of records in the file."""
+    return len(self._offsets)
+
+  def read(self, i):
+    """Returns the record with index `i`.
+
+    Args:
+      i: The index of the record. Negative indices count from the end.
+
+    Returns:
+      The record, as a byte string.
+
+    Raises:
+      IndexError: If `i` is out of range.
+    """
+    if not -len(self._offsets) <= i < len(self._offsets):
+      raise IndexError("Record %d out of range; the file has %d records." %
+                       (i, len(self._offsets)))
+    return next(self.read_range(i % len(self._offsets), None))
+
+  def read_range(self, start=0, stop=None):
+    """Yields the records with indices in `[start, stop)`.
+
+    The file is opened once and read sequentially from the first record of the
+    range.
+
+    Args:
+      start: The index of the first record.
+      stop: The index after the last record, or None to read to the end.
+
+    Yields:
+      The records, as byte strings.
+    """
+    start, stop, _ = slice(start, stop).indices(len(self._offsets))
+    if start >= stop:
+      return
+    reader = _new_record_reader(self._path, self._offsets[start])
+    try:
+      for _ in range(stop - start):
+        with errors.raise_exception_on_not_ok_status() as status:
+          reader.GetNext(status)
+        yield reader.record()
+    finally:
+      reader.Close()
+
+  def shard_range(self, num_shards, shard_index):
+    """Returns the record range of one of `num_shards` equal shards.
+
+    The shards are contiguous, cover every record exactly once, and differ in
+    size by at most one record.
+
+    Args:
+      num_shards: The number of shards to split the file into.
+      shard_index: The index of the shard, in `[0, num_shards)`.
+
+    Returns:
+      A `(start, stop)` tuple of record indices.
+
+    Raises:
+      ValueError: If `shard_index` is not in `[0, num_shards)`.
+    """
+    if not 0 <= shard_index < num_shards:
+      raise ValueError("shard_index must be in [0, %d), but is %d." %
+                       (num_shards, shard_index))
+    num_records = len(self._offsets)
+    return (num_records * shard_index // num_shards,
+            num_records * (shard_index + 1) // num_shards)
+
+  def shard(self, num_shards, shard_index):
+    """Reads one of `num_shards` equal shards of the records.
+
+    Args:
+      num_shards: The number of shards to split the file into.
+      shard_index: The index of the shard, in `[0, num_shards)`.
+
+    Returns:
+      An iterator over the records of the shard, as byte strings.
+
+    Raises:
+      ValueError: If `shard_index` is not in `[0, num_shards)`.
+    """
+    start, stop = self.shard_range(num_shards, shard_index)
+    return self.read_range(start, stop)
+
+  def close(self):
+    """Releases the index."""
+    self._offsets = ()
@@ -0,0 +1,108 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# =============================================================================
+"""Tests for the TFRecord index in tf_record.py."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os.path
+
+from tensorflow.python.framework import errors
+from tensorflow.python.lib.io import file_io
+from tensorflow.python.lib.io import tf_record
+from tensorflow.python.platform import test
+
+
+class TFRecordIndexTest(test.TestCase):
+
+  def setUp(self):
+    self._base_dir = os.path.join(self.get_temp_dir(), "tf_record_index")
+    file_io.recursive_create_dir(self._base_dir)
+    self._path = os.path.join(self._base_dir, "records")
+    # Records of varying length, so that offsets are not simply multiples.
+    self._records = [("record %d " % i).encode("ascii") * (i % 7 + 1)
+                     for i in range(100)]
+
+  def tearDown(self):
+    file_io.delete_recursively(self._base_dir)
+
+  def _Write(self, write_index):
+    with tf_record.TFRecordWriter(self._path, write_index=write_index) as w:
+      for record in self._records:
+        w.write(record)
+
+  def testWriterIndexAllowsRandomAccess(self):
+    self._Write(write_index=True)
+    with tf_record.TFRecordIndexedReader(self._path) as reader:
+      self.assertEqual(len(self._records), len(reader))
+      self.assertEqual(self._records[0], reader.read(0))
+      self.assertEqual(self._records[57], reader.read(57))
+      self.assertEqual(self._records[-1], reader.read(-1))
+      with self.assertRaises(IndexError):
+        reader.read(len(self._records))
+
+  def testBuiltIndexMatchesWriterIndex(self):
+    self._Write(write_index=True)
+    index_path = tf_record.tf_record_index_path(self._path)
+    written = file_io.read_file_to_string(index_path, binary_mode=True)
+    file_io.delete_file(index_path)
+    self.assertEqual(len(self._records),
+                     tf_record.build_tf_record_index(self._path))
+    self.assertEqual(written,
+                     file_io.read_file_to_string(index_path, binary_mode=True))
+
+  def testReadRange(self):
+    self._Write(write_index=True)
+    reader = tf_record.TFRecordIndexedReader(self._path)
+    self.assertEqual(self._records[10:20], list(reader.read_range(10, 20)))
+    self.assertEqual(self._records[95:], list(reader.read_range(95)))
+    self.assertEqual([], list(reader.read_range(20, 10)))
+
+  def testShardsCoverAllRecordsOnce(self):
+    self._Write(write_index=True)
+    reader = tf_record.TFRecordIndexedReader(self._path)
+    shards = [list(reader.shard(7, i)) for i in range(7)]
+    self.assertEqual(self._records, sum(shards, []))
+    sizes = [len(shard) for shard in shards]
+    self.assertLessEqual(max(sizes) - min(sizes), 1)
+    with self.assertRaises(ValueError):
+      reader.shard_range(7, 7)
+
+  def testMissingIndex(self):
+    self._Write(write_index=False)
+    with self.assertRaises(errors.NotFoundError):
+      tf_record.TFRecordIndexedReader(self._path)
+
+  def testStaleIndex(self):
+    self._Write(write_index=True)
+    index_path = tf_record.tf_record_index_path(self._path)
+    index = file_io.read_file_to_string(index_path, binary_mode=True)
+    self._records.append(b"one more")
+    self._Write(write_index=False)
+    file_io.write_string_to_file(index_path, index)
+    with self.assertRaises(ValueError):
+      tf_record.TFRecordIndexedReader(self._path)
+
+  def testCompressedFilesCannotBeIndexed(self):
+    options = tf_record.TFRecordOptions(tf_record.TFRecordCompressionType.GZIP)
+    with self.assertRaises(ValueError):
+      tf_record.TFRecordWriter(self._path, options, write_index=True)
+    with self.assertRaises(ValueError):
+      tf_record.build_tf_record_index(self._path, options)
+
+
+if __name__ == "__main__":
+  test.main()
@@ -0,0 +1,100 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for summary_iterator."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os.path
+
+from tensorflow.core.framework import summary_pb2
+from tensorflow.core.util import event_pb2
+from tensorflow.python.lib.io import tf_record
+from tensorflow.python.platform import test
+from tensorflow.python.summary import summary_iterator
+
+
+def _ScalarEvent(wall_time, step, **values):
+  return event_pb2.Event(
+      wall_time=wall_time,
+      step=step,
+      summary=summary_pb2.Summary(value=[
+          summary_pb2.Summary.Value(tag=tag, simple_value=value)
+          for tag, value in sorted(values.items())
+      ]))
+
+
+class PeekStepTest(test.TestCase):
+
+  def testMatchesParsedStep(self):
+    for wall_time in (0, 1.5):
+      for step in (0, 1, 127, 128, 2**40, -1, -2**40):
+        event = _ScalarEvent(wall_time, step, loss=1.0)
+        self.assertEqual(
+            step, summary_iterator._peek_step(event.SerializeToString()))
+
+  def testEventWithoutStep(self):
+    event = event_pb2.Event(wall_time=3, file_version="brain.Event:2")
+    self.assertEqual(0, summary_iterator._peek_step(event.SerializeToString()))
+
+
+class MultiFileSummaryIteratorTest(test.TestCase):
+
+  def _WriteEvents(self, name, events):
+    path = os.path.join(self.get_temp_dir(), name)
+    with tf_record.TFRecordWriter(path) as writer:
+      for event in events:
+        writer.write(event.SerializeToString())
+    return path
+
+  def testMergesFilesInTimeOrder(self):
+    a = self._WriteEvents("a", [_ScalarEvent(t, t, loss=t) for t in (1, 4, 5)])
+    b = self._WriteEvents("b", [_ScalarEvent(t, t, loss=t) for t in (2, 3, 6)])
+    result = list(summary_iterator.multi_file_summary_iterator([a, b]))
+    self.assertEqual([1, 2, 3, 4, 5, 6], [e.step for _, e in result])
+    self.assertEqual([a, b, b, a, a, b], [path for path, _ in result])
+
+  def testSortsEventsWithinAFile(self):
+    a = self._WriteEvents("a", [_ScalarEvent(t, t, loss=t) for t in (3, 1, 2)])
+    result = list(summary_iterator.multi_file_summary_iterator([a]))
+    self.assertEqual([1, 2, 3], [e.step for _, e in result])
+
+  def testStepRange(self):
+    a = self._WriteEvents("a", [_ScalarEvent(t, t, loss=t) for t in range(10)])
+    b = self._WriteEvents("b", [_ScalarEvent(t, t, loss=t) for t in range(10)])
+    result = list(summary_iterator.multi_file_summary_iterator(
+        [a, b], min_step=3, max_step=5))
+    self.assertEqual([3, 3, 4, 4, 5, 5], [e.step for _, e in result])
+
+  def testTagFilter(self):
+    a = self._WriteEvents("a", [
+        event_pb2.Event(wall_time=0, file_version="brain.Event:2"),
+        _ScalarEvent(1, 1, loss=1.0, accuracy=0.5),
+        _ScalarEvent(2, 2, accuracy=0.6),
+        _ScalarEvent(3, 3, loss=0.8),
+    ])
+    result = list(summary_iterator.multi_file_summary_iterator(
+        [a], tags=["loss"]))
+    self.assertEqual([1, 3], [e.step for _, e in result])
+    for _, event in result:
+      self.assertEqual(["loss"], [v.tag for v in event.summary.value])
+
+  def testNoPaths(self):
+    self.assertEqual([], list(summary_iterator.multi_file_summary_iterator([])))
+
+
+if __name__ == "__main__":
+  test.main()
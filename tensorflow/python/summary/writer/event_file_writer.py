@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import os.path
 import threading
 import time
@@ -30,6 +31,12 @@ from tensorflow.python.platform import gfile
 from tensorflow.python.util import compat
 
 
+EventFileWriterStats = collections.namedtuple(
+    "EventFileWriterStats",
+    ["queue_depth", "max_queue_depth", "blocked_secs", "events_written",
+     "bytes_written", "batches_written"])
+
+
 class EventFileWriter(object):
   """Writes `Event` protocol buffers to an event file.
 
@@ -39,7 +46,7 @@ class EventFileWriter(object):
   """
 
   def __init__(self, logdir, max_queue=10, flush_secs=120,
-               filename_suffix=None):
+               filename_suffix=None, max_batch_bytes=None):
     """Creates a `EventFileWriter` and an event file to write to.
 
     On construction the summary writer creates a new event file in `logdir`.
@@ -53,6 +60,11 @@ class EventFileWriter(object):
        and events to disk.
     *  `max_queue`: Maximum number of summaries or events pending to be
        written to disk before one of the 'add' calls block.
+    *  `max_batch_bytes`: If set, events are serialized by the caller of
+       `add_event` and coalesced into batches of about this many bytes, and
+       `max_queue` bounds the number of pending batches instead of events.
+       This makes blocking much rarer when many or large summaries are
+       written. A partial batch is written once it is `flush_secs` old.
 
     Args:
       logdir: A string. Directory where event file will be written.
@@ -61,7 +73,16 @@ class EventFileWriter(object):
         pending events and summaries to disk.
       filename_suffix: A string. Every event file's name is suffixed with
         `filename_suffix`.
+      max_batch_bytes: Integer or None. Serialized size at which a batch of
+        events is handed to the writer thread, or None to hand over every
+        event on its own.
+
+    Raises:
+      ValueError: If `max_batch_bytes` is not positive.
     """
+    if max_batch_bytes is not None and max_batch_bytes <= 0:
+      raise ValueError("max_batch_bytes must be positive, but is %d" %
+                       max_batch_bytes)
     self._logdir = logdir
     if not gfile.IsDirectory(self._logdir):
       gfile.MakeDirs(self._logdir)
@@ -73,11 +94,24 @@ class EventFileWriter(object):
     if filename_suffix:
       self._ev_writer.InitWithSuffix(compat.as_bytes(filename_suffix))
     self._closed = False
-    self._worker = _EventLoggerThread(self._event_queue, self._ev_writer,
-                                      self._flush_secs, self._sentinel_event)
+    self._max_batch_bytes = max_batch_bytes
+    # The serialized events not yet handed to the writer thread in batched
+    # mode, guarded by _batch_lock.
+    self._batch = []
+    self._batch_bytes = 0
+    self._batch_lock = threading.Lock()
+    self._stats = _WriterStats()
+    self._worker = self._create_worker()
 
     self._worker.start()
 
+  def _create_worker(self):
+    """Creates the thread that writes queued events to the event file."""
+    take_batch = self._take_batch_if_idle if self._max_batch_bytes else None
+    return _EventLoggerThread(self._event_queue, self._ev_writer,
+                              self._flush_secs, self._sentinel_event,
+                              stats=self._stats, take_batch=take_batch)
+
   def _get_sentinel_event(self):
     """Generate a sentinel event for terminating worker."""
     return event_pb2.Event()
@@ -95,8 +129,7 @@ class EventFileWriter(object):
     Does nothing if the EventFileWriter was not closed.
     """
     if self._closed:
-      self._worker = _EventLoggerThread(self._event_queue, self._ev_writer,
-                                        self._flush_secs, self._sentinel_event)
+      self._worker = self._create_worker()
       self._worker.start()
       self._closed = False
 
@@ -106,8 +139,78 @@ class EventFileWriter(object):
     Args:
       event: An `Event` protocol buffer.
     """
-    if not self._closed:
-      self._event_queue.put(event)
+    if self._closed:
+      return
+    if not self._max_batch_bytes:
+      self._put(event)
+      return
+    data = event.SerializeToString()
+    with self._batch_lock:
+      self._batch.append(data)
+      self._batch_bytes += len(data)
+      if self._batch_bytes >= self._max_batch_bytes:
+        # The batch is enqueued while holding the lock, so that batches are
+        # enqueued in the order their events were added.
+        self._put(self._take_batch_locked())
+
+  def _put(self, item):
+    """Enqueues an event or a batch, accounting for the time spent blocked."""
+    start = time.time()
+    self._event_queue.put(item)
+    self._stats.record_put(time.time() - start, self._event_queue.qsize())
+
+  def _enqueue_batch(self):
+    """Hands the pending batch of serialized events to the writer thread."""
+    with self._batch_lock:
+      if self._batch:
+        self._put(self._take_batch_locked())
+
+  def _take_batch_if_idle(self):
+    """Returns the pending batch if the writer thread has caught up.
+
+    Called by the writer thread when the event file is due to be flushed. To
+    keep the events in order, nothing is taken while earlier events are still
+    queued, or while `add_event` is enqueuing a batch; the writer thread must
+    not block on `_batch_lock`, since `add_event` may hold it while waiting for
+    the writer thread to make room in the queue.
+
+    Returns:
+      A possibly empty list of serialized events.
+    """
+    if not self._batch_lock.acquire(False):
+      return []
+    try:
+      if not self._event_queue.empty():
+        return []
+      return self._take_batch_locked()
+    finally:
+      self._batch_lock.release()
+
+  def _take_batch_locked(self):
+    batch = self._batch
+    self._batch = []
+    self._batch_bytes = 0
+    return batch
+
+  def get_stats(self):
+    """Returns counters describing the write path of this writer.
+
+    The counters can be used to tell whether writing summaries slows down the
+    caller of `add_event`.
+
+    Returns:
+      An `EventFileWriterStats` namedtuple with these fields:
+        queue_depth: The number of events (or batches, when `max_batch_bytes`
+          is set) currently waiting for the writer thread.
+        max_queue_depth: The largest queue depth seen so far.
+        blocked_secs: The total time `add_event` spent waiting for room in the
+          queue.
+        events_written: The number of events written to the event file.
+        bytes_written: The total serialized size of the written events.
+        batches_written: The number of queue items written, which equals
+          `events_written` unless `max_batch_bytes` is set.
+    """
+    return self._stats.snapshot(self._event_queue.qsize())
 
   def flush(self):
     """Flushes the event file to disk.
@@ -115,6 +218,8 @@ class EventFileWriter(object):
     Call this method to make sure that all pending events have been written to
     disk.
     """
+    if self._max_batch_bytes and not self._closed:
+      self._enqueue_batch()
     self._event_queue.join()
     self._ev_writer.Flush()
 
@@ -123,27 +228,70 @@ class EventFileWriter(object):
 
     Call this method when you do not need the summary writer anymore.
     """
-    self.add_event(self._sentinel_event)
+    if not self._closed:
+      if self._max_batch_bytes:
+        self._enqueue_batch()
+      self._put(self._sentinel_event)
     self.flush()
     self._worker.join()
     self._ev_writer.Close()
     self._closed = True
 
 
+class _WriterStats(object):
+  """Thread-safe counters behind `EventFileWriter.get_stats`."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._max_queue_depth = 0
+    self._blocked_secs = 0.0
+    self._events_written = 0
+    self._bytes_written = 0
+    self._batches_written = 0
+
+  def record_put(self, blocked_secs, queue_depth):
+    with self._lock:
+      self._blocked_secs += blocked_secs
+      self._max_queue_depth = max(self._max_queue_depth, queue_depth)
+
+  def record_write(self, num_events, num_bytes):
+    with self._lock:
+      self._events_written += num_events
+      self._bytes_written += num_bytes
+      self._batches_written += 1
+
+  def snapshot(self, queue_depth):
+    with self._lock:
+      return EventFileWriterStats(
+          queue_depth=queue_depth,
+          max_queue_depth=self._max_queue_depth,
+          blocked_secs=self._blocked_secs,
+          events_written=self._events_written,
+          bytes_written=self._bytes_written,
+          batches_written=self._batches_written)
+
+
 class _EventLoggerThread(threading.Thread):
   """Thread that logs events."""
 
-  def __init__(self, queue, ev_writer, flush_secs, sentinel_event):
+  def __init__(self, queue, ev_writer, flush_secs, sentinel_event, stats=None,
+               take_batch=None):
     """Creates an _EventLoggerThread.
 
     Args:
-      queue: A Queue from which to dequeue events.
+      queue: A Queue from which to dequeue events, or lists of serialized
+        events.
       ev_writer: An event writer. Used to log brain events for
        the visualizer.
       flush_secs: How often, in seconds, to flush the
         pending file to disk.
       sentinel_event: A sentinel element in queue that tells this thread to
         terminate.
+      stats: A `_WriterStats` to record the written events in, or None.
+      take_batch: A function returning serialized events that have been added
+        but not yet enqueued, or None. If given, it is called whenever the file
+        is due to be flushed, so that partial batches do not stay in memory for
+        much longer than `flush_secs`.
     """
     threading.Thread.__init__(self)
     self.daemon = True
@@ -153,20 +301,49 @@ class _EventLoggerThread(threading.Thread):
     # The first event will be flushed immediately.
     self._next_event_flush_time = 0
     self._sentinel_event = sentinel_event
+    self._stats = stats or _WriterStats()
+    self._take_batch = take_batch
 
   def run(self):
     while True:
-      event = self._queue.get()
-      if event is self._sentinel_event:
+      if self._take_batch is None:
+        item = self._queue.get()
+      else:
+        try:
+          item = self._queue.get(
+              timeout=max(0, self._next_event_flush_time - time.time()))
+        except six.moves.queue.Empty:
+          self._maybe_flush()
+          continue
+      if item is self._sentinel_event:
         self._queue.task_done()
         break
       try:
-        self._ev_writer.WriteEvent(event)
-        # Flush the event writer every so often.
-        now = time.time()
-        if now > self._next_event_flush_time:
-          self._ev_writer.Flush()
-          # Do it again in two minutes.
-          self._next_event_flush_time = now + self._flush_secs
+        if isinstance(item, list):
+          self._write_batch(item)
+        else:
+          self._ev_writer.WriteEvent(item)
+          self._stats.record_write(1, item.ByteSize())
+        self._maybe_flush()
       finally:
         self._queue.task_done()
+
+  def _write_batch(self, batch):
+    """Writes a list of serialized events."""
+    if not batch:
+      return
+    # pylint: disable=protected-access
+    for data in batch:
+      self._ev_writer._WriteSerializedEvent(data)
+    # pylint: enable=protected-access
+    self._stats.record_write(len(batch), sum(len(data) for data in batch))
+
+  def _maybe_flush(self):
+    """Flushes the event writer every so often."""
+    now = time.time()
+    if now > self._next_event_flush_time:
+      if self._take_batch is not None:
+        self._write_batch(self._take_batch())
+      self._ev_writer.Flush()
+      # Do it again in two minutes.
+      self._next_event_flush_time = now + self._flush_secs
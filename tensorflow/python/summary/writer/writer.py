@@ -265,7 +265,8 @@ class FileWriter(SummaryToEventTransformer):
                max_queue=10,
                flush_secs=120,
                graph_def=None,
-               filename_suffix=None):
+               filename_suffix=None,
+               max_batch_bytes=None):
     """Creates a `FileWriter` and an event file.
 
     On construction the summary writer creates a new event file in `logdir`.
@@ -295,6 +296,9 @@ class FileWriter(SummaryToEventTransformer):
        and events to disk.
     *  `max_queue`: Maximum number of summaries or events pending to be
        written to disk before one of the 'add' calls block.
+    *  `max_batch_bytes`: If set, events are serialized by the caller and
+       coalesced into batches of about this many bytes, and `max_queue`
+       bounds the number of pending batches instead of events.
 
     Args:
       logdir: A string. Directory where event file will be written.
@@ -305,9 +309,11 @@ class FileWriter(SummaryToEventTransformer):
       graph_def: DEPRECATED: Use the `graph` argument instead.
       filename_suffix: A string. Every event file's name is suffixed with
         `suffix`.
+      max_batch_bytes: Integer or None. Serialized size of the batches events
+        are written in, or None to write every event on its own.
     """
     event_writer = EventFileWriter(logdir, max_queue, flush_secs,
-                                   filename_suffix)
+                                   filename_suffix, max_batch_bytes)
     super(FileWriter, self).__init__(event_writer, graph, graph_def)
 
   def get_logdir(self):
@@ -322,6 +328,14 @@ class FileWriter(SummaryToEventTransformer):
     """
     self.event_writer.add_event(event)
 
+  def get_stats(self):
+    """Returns counters describing the write path of this writer.
+
+    Returns:
+      An `EventFileWriterStats` namedtuple; see `EventFileWriter.get_stats`.
+    """
+    return self.event_writer.get_stats()
+
   def flush(self):
     """Flushes the event file to disk.
 
@@ -333,6 +333,50 @@ class SummaryWriterTestCase(test.TestCase):
     for filename in event_filenames:
       self.assertTrue(filename.endswith("_test_suffix"))
 
+  def testBatchedWritesKeepEventOrder(self):
+    test_dir = self._CleanTestDir("batched_writes")
+    sw = writer.FileWriter(test_dir, max_batch_bytes=100)
+    for step in range(50):
+      sw.add_session_log(event_pb2.SessionLog(status=SessionLog.START), step)
+    sw.close()
+
+    rr = self._EventsReader(test_dir)
+    self.assertEquals("brain.Event:2", next(rr).file_version)
+    self.assertEquals(list(range(50)), [ev.step for ev in rr])
+    stats = sw.get_stats()
+    self.assertEquals(50, stats.events_written)
+    self.assertLess(stats.batches_written, 50)
+    self.assertGreater(stats.bytes_written, 0)
+    self.assertEquals(0, stats.queue_depth)
+
+  def testBatchedWritesAreFlushed(self):
+    test_dir = self._CleanTestDir("batched_flush")
+    sw = writer.FileWriter(test_dir, max_batch_bytes=1 << 20)
+    sw.add_session_log(event_pb2.SessionLog(status=SessionLog.START), 1)
+    # The batch is far from full, but flush() must still write it.
+    sw.flush()
+    rr = self._EventsReader(test_dir)
+    next(rr)
+    self.assertEquals(1, next(rr).step)
+    sw.close()
+
+  def testStatsForUnbatchedWrites(self):
+    test_dir = self._CleanTestDir("unbatched_stats")
+    sw = writer.FileWriter(test_dir)
+    for step in range(3):
+      sw.add_session_log(event_pb2.SessionLog(status=SessionLog.START), step)
+    sw.flush()
+    stats = sw.get_stats()
+    self.assertEquals(3, stats.events_written)
+    self.assertEquals(3, stats.batches_written)
+    self.assertGreaterEqual(stats.blocked_secs, 0)
+    sw.close()
+
+  def testInvalidMaxBatchBytes(self):
+    test_dir = self._CleanTestDir("invalid_batch_bytes")
+    with self.assertRaises(ValueError):
+      writer.FileWriter(test_dir, max_batch_bytes=0)
+
 
 class SummaryWriterCacheTest(test.TestCase):
   """SummaryWriterCache tests."""
@@ -22,8 +22,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import csv
+import functools
 import imghdr
+import json
 import mimetypes
 import os
 import re
@@ -39,6 +42,8 @@ from werkzeug import wrappers
 
 from tensorflow.python.platform import resource_loader
 from tensorflow.python.platform import tf_logging as logging
+from tensorflow.python.util import compat
+from tensorflow.tensorboard.backend import downsampling
 from tensorflow.tensorboard.backend import http_util
 from tensorflow.tensorboard.backend import process_graph
 from tensorflow.tensorboard.backend.event_processing import event_accumulator
@@ -60,6 +65,7 @@ RUNS_ROUTE = '/runs'
 PLUGIN_PREFIX = '/plugin'
 PLUGINS_LISTING_ROUTE = '/plugins_listing'
 SCALARS_ROUTE = '/' + event_accumulator.SCALARS
+SCALARS_BATCH_ROUTE = '/scalarsBatch'
 IMAGES_ROUTE = '/' + event_accumulator.IMAGES
 AUDIO_ROUTE = '/' + event_accumulator.AUDIO
 HISTOGRAMS_ROUTE = '/' + event_accumulator.HISTOGRAMS
@@ -78,12 +84,98 @@ _IMGHDR_TO_MIMETYPE = {
 }
 _DEFAULT_IMAGE_MIMETYPE = 'application/octet-stream'
 
+# The maximum number of downsampled scalar series kept in memory.
+_DOWNSAMPLED_SCALARS_CACHE_SIZE = 1000
+
+# The maximum total size of the encoded responses kept in memory.
+_RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+
 
 def _content_type_for_image(encoded_image_string):
   image_type = imghdr.what(None, encoded_image_string)
   return _IMGHDR_TO_MIMETYPE.get(image_type, _DEFAULT_IMAGE_MIMETYPE)
 
 
+def _optional_int_arg(request, name):
+  """Parses an optional integer query parameter.
+
+  Args:
+    request: A werkzeug Request.
+    name: The name of the query parameter.
+
+  Returns:
+    The integer value of the parameter, or None if it is absent.
+
+  Raises:
+    ValueError: If the parameter is present but is not an integer.
+  """
+  value = request.args.get(name)
+  if value is None:
+    return None
+  try:
+    return int(value)
+  except ValueError:
+    raise ValueError('query parameter `%s` must be integer' % name)
+
+
+def _parse_downsampling_args(request):
+  """Parses the downsampling query parameters of a scalars request.
+
+  Args:
+    request: A werkzeug Request.
+
+  Returns:
+    A `(resolution, min_step, max_step)` tuple, where absent parameters are
+    None.
+
+  Raises:
+    ValueError: If a parameter is malformed.
+  """
+  resolution = _optional_int_arg(request, 'resolution')
+  if resolution is not None and resolution < 2:
+    raise ValueError('query parameter `resolution` must be at least 2')
+  return (resolution,
+          _optional_int_arg(request, 'min_step'),
+          _optional_int_arg(request, 'max_step'))
+
+
+def _cached_per_run(handler):
+  """Caches the encoded responses of a handler that serves data of one run.
+
+  The cache key is the path and the query parameters of the request, and an
+  entry is invalidated whenever new data is loaded for the run named by the
+  `run` query parameter. Responses carry an ETag, so that clients polling for
+  unchanged data get 304 responses.
+
+  Args:
+    handler: A method taking a werkzeug Request and returning a werkzeug
+      Response.
+
+  Returns:
+    The decorated method.
+  """
+  @functools.wraps(handler)
+  def wrapper(self, request):
+    if request.method != 'GET':
+      return handler(self, request)
+    try:
+      # Read the generation before the data, so that data loaded concurrently
+      # can only make the cached entry look older than it is.
+      generation = self._multiplexer.Generation(request.args.get('run'))
+    except KeyError:
+      return handler(self, request)
+    key = (request.path, tuple(sorted(request.args.items(multi=True))),
+           http_util.AcceptsGzip(request))
+    cached = self._response_cache.Get(key, generation)
+    if cached is None:
+      response = handler(self, request)
+      if response.status_code != 200:
+        return response
+      cached = self._response_cache.Put(key, generation, response)
+    return http_util.RespondCached(request, cached)
+  return wrapper
+
+
 class _OutputFormat(object):
   """An enum used to list the valid output formats for API calls.
 
@@ -98,7 +190,10 @@ def standard_tensorboard_wsgi(
     logdir,
     purge_orphaned_data,
     reload_interval,
-    plugins):
+    plugins,
+    max_reload_threads=1,
+    reload_timeout=None,
+    cache_dir=None):
   """Construct a TensorBoardWSGIApp with standard plugins and multiplexer.
 
   Args:
@@ -107,13 +202,21 @@ def standard_tensorboard_wsgi(
     reload_interval: The interval at which the backend reloads more data in
         seconds.
     plugins: A list of plugins for TensorBoard to initialize.
+    max_reload_threads: The maximum number of threads used to reload runs.
+    reload_timeout: If set, the maximum number of seconds a reload cycle waits
+        for slow runs.
+    cache_dir: If set, a directory in which to persist snapshots of the loaded
+        runs, so that restarts do not reload every event file from scratch.
 
   Returns:
     The new TensorBoard WSGI application.
   """
   multiplexer = event_multiplexer.EventMultiplexer(
       size_guidance=DEFAULT_SIZE_GUIDANCE,
-      purge_orphaned_data=purge_orphaned_data)
+      purge_orphaned_data=purge_orphaned_data,
+      max_reload_threads=max_reload_threads,
+      reload_timeout_secs=reload_timeout,
+      cache_dir=cache_dir)
 
   return TensorBoardWSGIApp(logdir, plugins, multiplexer, reload_interval)
 
@@ -150,6 +253,12 @@ class TensorBoardWSGIApp(object):
     self._plugins = plugins
     self._multiplexer = multiplexer
     self.tag = get_tensorboard_tag()
+    # An LRU cache mapping (run, tag, resolution, min_step, max_step) to a
+    # (generation, values) pair, where generation is the generation of the run
+    # that the values were computed from.
+    self._downsampled_scalars = collections.OrderedDict()
+    self._downsampled_scalars_lock = threading.Lock()
+    self._response_cache = http_util.ResponseCache(_RESPONSE_CACHE_BYTES)
 
     path_to_run = parse_event_files_spec(self._logdir)
     if reload_interval:
@@ -187,6 +296,8 @@ class TensorBoardWSGIApp(object):
             self._serve_runs,
         DATA_PREFIX + SCALARS_ROUTE:
             self._serve_scalars,
+        DATA_PREFIX + SCALARS_BATCH_ROUTE:
+            self._serve_scalars_batch,
     }
 
     # Serve the routes from the registered plugins using their name as the route
@@ -284,12 +395,22 @@ class TensorBoardWSGIApp(object):
         request, {'logdir': self._logdir}, 'application/json')
 
   @wrappers.Request.application
+  @_cached_per_run
   def _serve_scalars(self, request):
-    """Given a tag and single run, return array of ScalarEvents."""
+    """Given a tag and single run, return array of ScalarEvents.
+
+    The optional `min_step` and `max_step` query parameters restrict the
+    response to a range of steps, and `resolution` caps the number of events
+    returned (see `downsampling.downsample_scalars`).
+    """
     # TODO(cassandrax): return HTTP status code for malformed requests
     tag = request.args.get('tag')
     run = request.args.get('run')
-    values = self._multiplexer.Scalars(run, tag)
+    try:
+      resolution, min_step, max_step = _parse_downsampling_args(request)
+    except ValueError as e:
+      return http_util.Respond(request, str(e), 'text/plain', 400)
+    values = self._get_scalars(run, tag, resolution, min_step, max_step)
 
     if request.args.get('format') == _OutputFormat.CSV:
       string_io = StringIO()
@@ -301,6 +422,107 @@ class TensorBoardWSGIApp(object):
       return http_util.Respond(request, values, 'application/json')
 
   @wrappers.Request.application
+  def _serve_scalars_batch(self, request):
+    """Returns the ScalarEvents of many (run, tag) pairs in one response.
+
+    The request body is a JSON list of `[run, tag]` pairs, and the response is
+    a list with one entry per pair, in the same order. This saves the frontend
+    from issuing one `/data/scalars` request per pair. The `resolution`,
+    `min_step` and `max_step` query parameters apply to every pair.
+    """
+    if request.method != 'POST':
+      return http_util.Respond(request, 'expected a POST request',
+                               'text/plain', 405)
+    try:
+      resolution, min_step, max_step = _parse_downsampling_args(request)
+    except ValueError as e:
+      return http_util.Respond(request, str(e), 'text/plain', 400)
+    try:
+      pairs = json.loads(compat.as_text(request.get_data()))
+    except ValueError:
+      return http_util.Respond(request, 'request body must be JSON',
+                               'text/plain', 400)
+    if not isinstance(pairs, list) or not all(
+        isinstance(pair, list) and len(pair) == 2 and
+        all(isinstance(name, six.string_types) for name in pair)
+        for pair in pairs):
+      return http_util.Respond(
+          request, 'request body must be a list of [run, tag] pairs',
+          'text/plain', 400)
+
+    result = []
+    for run, tag in pairs:
+      entry = {'run': run, 'tag': tag}
+      try:
+        entry['scalars'] = self._get_scalars(run, tag, resolution, min_step,
+                                             max_step)
+      except KeyError as e:
+        # Runs may disappear between listing them and fetching their data, so
+        # a missing run or tag does not fail the other pairs.
+        entry['error'] = str(e)
+      result.append(entry)
+    return http_util.Respond(request, result, 'application/json')
+
+  def _get_scalars(self, run, tag, resolution, min_step, max_step):
+    """Returns the ScalarEvents of a run and tag, downsampled if requested.
+
+    Args:
+      run: The name of the run.
+      tag: The name of the tag.
+      resolution: The maximum number of events to return, or None.
+      min_step: The smallest step to return, or None.
+      max_step: The largest step to return, or None.
+
+    Returns:
+      A list of `ScalarEvent`s.
+
+    Raises:
+      KeyError: If the run or the tag is not found.
+    """
+    if resolution is None and min_step is None and max_step is None:
+      return self._multiplexer.Scalars(run, tag)
+    return self._get_downsampled_scalars(run, tag, resolution, min_step,
+                                         max_step)
+
+  def _get_downsampled_scalars(self, run, tag, resolution, min_step, max_step):
+    """Returns the downsampled scalars of a run and tag, using a cache.
+
+    Cached values are reused until the generation of the run changes, i.e.
+    until new data is loaded for it.
+
+    Args:
+      run: The name of the run.
+      tag: The name of the tag.
+      resolution: The maximum number of events to return, or None.
+      min_step: The smallest step to return, or None.
+      max_step: The largest step to return, or None.
+
+    Returns:
+      A list of `ScalarEvent`s.
+    """
+    key = (run, tag, resolution, min_step, max_step)
+    # Read the generation before the data, so that data loaded concurrently can
+    # only make the cached entry look older than it is.
+    generation = self._multiplexer.Generation(run)
+    with self._downsampled_scalars_lock:
+      cached = self._downsampled_scalars.pop(key, None)
+      if cached is not None and cached[0] == generation:
+        self._downsampled_scalars[key] = cached
+        return cached[1]
+
+    values = downsampling.filter_step_range(
+        self._multiplexer.Scalars(run, tag), min_step, max_step)
+    if resolution is not None:
+      values = downsampling.downsample_scalars(values, resolution)
+
+    with self._downsampled_scalars_lock:
+      self._downsampled_scalars[key] = (generation, values)
+      while len(self._downsampled_scalars) > _DOWNSAMPLED_SCALARS_CACHE_SIZE:
+        self._downsampled_scalars.popitem(last=False)
+    return values
+
+  @wrappers.Request.application
+  @_cached_per_run
   def _serve_graph(self, request):
     """Given a single run, return the graph definition in json format."""
     run = request.args.get('run', None)
@@ -333,6 +555,7 @@ class TensorBoardWSGIApp(object):
     return http_util.Respond(request, str(graph), 'text/x-protobuf')  # pbtxt
 
   @wrappers.Request.application
+  @_cached_per_run
   def _serve_run_metadata(self, request):
     """Given a tag and a TensorFlow run, return the session.run() metadata."""
     tag = request.args.get('tag', None)
@@ -352,6 +575,7 @@ class TensorBoardWSGIApp(object):
         request, str(run_metadata), 'text/x-protobuf')  # pbtxt
 
   @wrappers.Request.application
+  @_cached_per_run
   def _serve_histograms(self, request):
     """Given a tag and single run, return an array of histogram values."""
     tag = request.args.get('tag')
@@ -360,6 +584,7 @@ class TensorBoardWSGIApp(object):
     return http_util.Respond(request, values, 'application/json')
 
   @wrappers.Request.application
+  @_cached_per_run
   def _serve_compressed_histograms(self, request):
     """Given a tag and single run, return an array of compressed histograms."""
     tag = request.args.get('tag')
@@ -686,10 +911,13 @@ def reload_multiplexer(multiplexer, path_to_run):
   logging.info('TensorBoard reload process beginning')
   for (path, name) in six.iteritems(path_to_run):
     multiplexer.AddRunsFromDirectory(path, name)
+  discovery_duration = time.time() - start
   logging.info('TensorBoard reload process: Reload the whole Multiplexer')
   multiplexer.Reload()
   duration = time.time() - start
-  logging.info('TensorBoard done reloading. Load took %0.3f secs', duration)
+  logging.info('TensorBoard done reloading. Load took %0.3f secs '
+               '(%0.3f secs discovering runs, %0.3f secs loading events)',
+               duration, discovery_duration, duration - discovery_duration)
 
 
 def start_reloading_multiplexer(multiplexer, path_to_run, load_interval):
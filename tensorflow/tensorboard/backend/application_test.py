@@ -30,12 +30,15 @@ import shutil
 import socket
 import tempfile
 import threading
+import time
 
 from six import BytesIO
 from six.moves import http_client
 from six.moves import xrange  # pylint: disable=redefined-builtin
 
 from werkzeug import serving
+from werkzeug import test as test_client
+from werkzeug import wrappers
 from google.protobuf import text_format
 
 from tensorflow.core.framework import graph_pb2
@@ -47,6 +50,7 @@ from tensorflow.python.platform import test
 from tensorflow.python.summary.writer import writer as writer_lib
 from tensorflow.tensorboard import tensorboard
 from tensorflow.tensorboard.backend import application
+from tensorflow.tensorboard.backend.event_processing import event_accumulator
 from tensorflow.tensorboard.backend.event_processing import event_multiplexer
 from tensorflow.tensorboard.plugins import base_plugin
 
@@ -238,6 +242,86 @@ class TensorboardServerTest(test.TestCase):
     line_count = data.count('\n')
     self.assertEqual(line_count,self._SCALAR_COUNT + 1) # include 1 more line for header
 
+  def testScalarsWithResolution(self):
+    """Test that /data/scalars downsamples to the requested resolution."""
+    data = self._getJson(
+        '/data/scalars?run=run1&tag=simple_values&resolution=10')
+    self.assertLessEqual(len(data), 10)
+    steps = [step for _, step, _ in data]
+    self.assertEqual(steps, sorted(steps))
+    self.assertEqual(steps[0], 10)
+    self.assertEqual(steps[-1], 10 * self._SCALAR_COUNT)
+
+  def testScalarsWithStepRange(self):
+    """Test that /data/scalars honors min_step and max_step."""
+    data = self._getJson(
+        '/data/scalars?run=run1&tag=simple_values&min_step=100&max_step=200')
+    self.assertEqual([step for _, step, _ in data], list(range(100, 201, 10)))
+
+  def testScalarsWithInvalidResolution(self):
+    """Test that /data/scalars rejects malformed downsampling parameters."""
+    for query in ('resolution=1', 'resolution=many', 'min_step=first'):
+      response = self._get('/data/scalars?run=run1&tag=simple_values&' + query)
+      self.assertEqual(response.status, 400, msg=query)
+      response.read()
+
+  def testScalarsEtag(self):
+    """Test that unchanged /data/scalars responses are not sent again."""
+    path = '/data/scalars?run=run1&tag=simple_values'
+    response = self._get(path)
+    self.assertEqual(response.status, 200)
+    etag = response.getheader('ETag')
+    self.assertTrue(etag)
+    first_data = response.read()
+
+    response = self._get(path)
+    self.assertEqual(response.getheader('ETag'), etag)
+    self.assertEqual(response.read(), first_data)
+
+    response = self._get(path, {'If-None-Match': etag})
+    self.assertEqual(response.status, 304)
+    self.assertEqual(response.read(), b'')
+
+  def _postJson(self, path, body):
+    """Perform a POST request with a JSON body and decode the JSON result."""
+    self._connection.request('POST', path, json.dumps(body),
+                             {'Content-Type': 'application/json'})
+    response = self._connection.getresponse()
+    self.assertEqual(response.status, 200)
+    return json.loads(response.read().decode('utf-8'))
+
+  def testScalarsBatch(self):
+    """Test the format of /data/scalarsBatch."""
+    data = self._postJson('/data/scalarsBatch',
+                          [['run1', 'simple_values'], ['run1', 'nonexistent']])
+    self.assertEqual(len(data), 2)
+    self.assertEqual(data[0]['run'], 'run1')
+    self.assertEqual(data[0]['tag'], 'simple_values')
+    self.assertEqual(
+        data[0]['scalars'],
+        self._getJson('/data/scalars?run=run1&tag=simple_values'))
+    self.assertEqual(data[1]['tag'], 'nonexistent')
+    self.assertIn('error', data[1])
+    self.assertNotIn('scalars', data[1])
+
+  def testScalarsBatchWithResolution(self):
+    """Test that /data/scalarsBatch honors the downsampling parameters."""
+    data = self._postJson('/data/scalarsBatch?resolution=10',
+                          [['run1', 'simple_values']])
+    self.assertLessEqual(len(data[0]['scalars']), 10)
+
+  def testScalarsBatchRejectsMalformedRequests(self):
+    """Test that /data/scalarsBatch rejects bad methods and bodies."""
+    response = self._get('/data/scalarsBatch')
+    self.assertEqual(response.status, 405)
+    response.read()
+    for body in ('not json', '{"run1": "simple_values"}', '[["run1"]]',
+                 '[[["run1"], "simple_values"]]', '[["run1", 1]]'):
+      self._connection.request('POST', '/data/scalarsBatch', body)
+      response = self._connection.getresponse()
+      self.assertEqual(response.status, 400, msg=body)
+      response.read()
+
   def testHistograms(self):
     """Test the format of /data/histograms."""
     self.assertEqual(
@@ -569,6 +653,62 @@ class TensorboardSimpleServerConstructionTest(test.TestCase):
     self.assertTrue(one_passed)  # We expect either IPv4 or IPv6 to be supported
 
 
+class _FakeScalarsMultiplexer(object):
+  """A multiplexer that serves the same in-memory scalars for every pair."""
+
+  def __init__(self, num_scalars):
+    self._scalars = [
+        event_accumulator.ScalarEvent(wall_time=i, step=i, value=float(i))
+        for i in xrange(num_scalars)
+    ]
+
+  def Reload(self):
+    pass
+
+  def Generation(self, run):
+    del run  # Unused.
+    return 1
+
+  def Scalars(self, run, tag):
+    del run, tag  # Unused.
+    return self._scalars
+
+
+class ScalarsBatchBenchmark(test.Benchmark):
+  """Compares loading a dashboard page with and without /data/scalarsBatch."""
+
+  def _benchmarkPageLoad(self, num_runs, num_tags, num_scalars):
+    app = application.TensorBoardWSGIApp(
+        None, [], _FakeScalarsMultiplexer(num_scalars), 0)
+    client = test_client.Client(app, wrappers.Response)
+    headers = {'Accept-Encoding': 'gzip'}
+    pairs = [['run%d' % r, 'tag%d' % t]
+             for r in xrange(num_runs) for t in xrange(num_tags)]
+
+    start = time.time()
+    for run, tag in pairs:
+      response = client.get(
+          '/data/scalars', query_string={'run': run, 'tag': tag},
+          headers=headers)
+      assert response.status_code == 200
+    per_pair_secs = time.time() - start
+
+    start = time.time()
+    response = client.post('/data/scalarsBatch', data=json.dumps(pairs),
+                           headers=headers)
+    assert response.status_code == 200
+    batch_secs = time.time() - start
+
+    name = '%druns_%dtags_%dscalars' % (num_runs, num_tags, num_scalars)
+    self.report_benchmark(
+        name='per_pair_requests_' + name, iters=1, wall_time=per_pair_secs)
+    self.report_benchmark(
+        name='batch_request_' + name, iters=1, wall_time=batch_secs)
+
+  def benchmarkPageLoad(self):
+    self._benchmarkPageLoad(num_runs=50, num_tags=20, num_scalars=1000)
+
+
 class TensorBoardApplcationConstructionTest(test.TestCase):
 
   def testExceptions(self):
@@ -0,0 +1,78 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Server-side downsampling of scalar series for the TensorBoard frontend."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from six.moves import xrange  # pylint: disable=redefined-builtin
+
+
+def filter_step_range(events, min_step=None, max_step=None):
+  """Returns the events whose step lies within an inclusive range.
+
+  Args:
+    events: A list of events with a `step` attribute.
+    min_step: The smallest step to keep, or None for no lower bound.
+    max_step: The largest step to keep, or None for no upper bound.
+
+  Returns:
+    A list of the events in `[min_step, max_step]`, in their original order.
+  """
+  if min_step is None and max_step is None:
+    return events
+  return [event for event in events
+          if (min_step is None or event.step >= min_step) and
+          (max_step is None or event.step <= max_step)]
+
+
+def downsample_scalars(events, resolution):
+  """Reduces a scalar series to at most `resolution` points.
+
+  The first and last events are always kept, so the series keeps its extent
+  and its latest value. The events in between are split into buckets of
+  (nearly) equal size, and each bucket is represented by its minimum and
+  maximum value, so spikes survive downsampling. The result is in the same
+  order as the input.
+
+  Args:
+    events: A list of `ScalarEvent`s.
+    resolution: The maximum number of events to return. Must be at least 2.
+
+  Returns:
+    A list of at most `resolution` `ScalarEvent`s.
+
+  Raises:
+    ValueError: If `resolution` is less than 2.
+  """
+  if resolution < 2:
+    raise ValueError('resolution must be at least 2, but is %d' % resolution)
+  if len(events) <= resolution:
+    return events
+
+  interior = events[1:-1]
+  num_buckets = (resolution - 2) // 2
+  result = [events[0]]
+  for i in xrange(num_buckets):
+    start = i * len(interior) // num_buckets
+    stop = (i + 1) * len(interior) // num_buckets
+    indices = xrange(start, stop)
+    min_index = min(indices, key=lambda j: interior[j].value)
+    max_index = max(indices, key=lambda j: interior[j].value)
+    for j in sorted(set([min_index, max_index])):
+      result.append(interior[j])
+  result.append(events[-1])
+  return result
@@ -0,0 +1,87 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for downsampling."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+
+from six.moves import xrange  # pylint: disable=redefined-builtin
+
+from tensorflow.python.platform import googletest
+from tensorflow.tensorboard.backend import downsampling
+
+_Event = collections.namedtuple('_Event', ['wall_time', 'step', 'value'])
+
+
+def _Events(values):
+  return [_Event(wall_time=i, step=i, value=v) for i, v in enumerate(values)]
+
+
+class FilterStepRangeTest(googletest.TestCase):
+
+  def testNoBoundsReturnsAllEvents(self):
+    events = _Events([1, 2, 3])
+    self.assertEqual(downsampling.filter_step_range(events), events)
+
+  def testBoundsAreInclusive(self):
+    events = _Events(xrange(10))
+    self.assertEqual(
+        [e.step for e in downsampling.filter_step_range(events, 3, 6)],
+        [3, 4, 5, 6])
+
+  def testOpenEndedRanges(self):
+    events = _Events(xrange(10))
+    self.assertEqual(
+        [e.step for e in downsampling.filter_step_range(events, min_step=8)],
+        [8, 9])
+    self.assertEqual(
+        [e.step for e in downsampling.filter_step_range(events, max_step=1)],
+        [0, 1])
+
+
+class DownsampleScalarsTest(googletest.TestCase):
+
+  def testShortSeriesIsUnchanged(self):
+    events = _Events([3, 1, 2])
+    self.assertEqual(downsampling.downsample_scalars(events, 3), events)
+
+  def testKeepsEndpointsAndOrder(self):
+    events = _Events(xrange(1000))
+    result = downsampling.downsample_scalars(events, 50)
+    self.assertLessEqual(len(result), 50)
+    self.assertEqual(result[0], events[0])
+    self.assertEqual(result[-1], events[-1])
+    steps = [e.step for e in result]
+    self.assertEqual(steps, sorted(steps))
+
+  def testKeepsSpikes(self):
+    values = [0.0] * 1000
+    values[123] = 100.0
+    values[456] = -100.0
+    result = downsampling.downsample_scalars(_Events(values), 10)
+    result_values = [e.value for e in result]
+    self.assertIn(100.0, result_values)
+    self.assertIn(-100.0, result_values)
+
+  def testInvalidResolution(self):
+    with self.assertRaises(ValueError):
+      downsampling.downsample_scalars(_Events([1, 2, 3]), 1)
+
+
+if __name__ == '__main__':
+  googletest.main()
@@ -0,0 +1,234 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Reads and writes on-disk snapshots of `EventAccumulator` state.
+
+A snapshot file consists of a fixed-size header followed by the state encoded
+as JSON. The header holds a magic string, a format version and a CRC32 of the
+payload, so that truncated or corrupt snapshots are detected instead of being
+loaded. Snapshots are written to a temporary file and renamed into place, so a
+crash while writing never leaves a partial snapshot behind.
+
+The state may hold values that JSON has no type for: tuples, byte strings,
+dicts with non-string keys, namedtuples and protocol buffers. These are
+encoded as JSON objects tagged with their type. Decoding only ever builds the
+namedtuple and protocol buffer types passed in by the caller, so reading a
+snapshot planted by someone else cannot run code.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+import six
+
+from tensorflow.python.framework import errors
+from tensorflow.python.platform import gfile
+from tensorflow.python.util import compat
+
+_MAGIC = b'TBACCSNP'
+# Bump this whenever the layout of the encoded state changes.
+_VERSION = 2
+_HEADER_FORMAT = '<8sII'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+# The number of bytes before the resume offset of an event file whose checksum
+# is stored in the snapshot, to detect files that were replaced or rewritten.
+_FINGERPRINT_BYTES = 4096
+
+
+class CorruptSnapshotError(Exception):
+  """Raised when a snapshot file exists but cannot be decoded."""
+  pass
+
+
+def SnapshotPath(cache_dir, run_path):
+  """Returns the path of the snapshot for the run at `run_path`."""
+  digest = hashlib.sha1(compat.as_bytes(run_path)).hexdigest()
+  return os.path.join(cache_dir, digest + '.snapshot')
+
+
+def TailFingerprint(file_path, offset):
+  """Returns a checksum of the bytes of a file just before `offset`.
+
+  Args:
+    file_path: The path of the file.
+    offset: The position up to which the file has been read.
+
+  Returns:
+    The CRC32 of up to `_FINGERPRINT_BYTES` bytes preceding `offset`, or None
+    if the file is missing or shorter than `offset`.
+  """
+  start = max(0, offset - _FINGERPRINT_BYTES)
+  try:
+    with gfile.GFile(file_path, 'rb') as f:
+      f.seek(start)
+      data = f.read(offset - start)
+  except errors.OpError:
+    return None
+  if len(data) != offset - start:
+    return None
+  return zlib.crc32(data) & 0xffffffff
+
+
+def _TypeName(value_type):
+  """Returns the name under which instances of a type are encoded."""
+  descriptor = getattr(value_type, 'DESCRIPTOR', None)
+  if descriptor is not None:
+    return descriptor.full_name
+  return value_type.__name__
+
+
+def _Encode(value, types):
+  """Converts `value` into something `json.dumps` accepts.
+
+  Args:
+    value: The value to convert.
+    types: A dict mapping type names to the namedtuple and protocol buffer
+      types that may occur in `value`.
+
+  Returns:
+    A value made of JSON types only, which `_Decode` converts back.
+
+  Raises:
+    TypeError: If `value` holds a value of an unsupported type.
+  """
+  if value is None or isinstance(value, (bool, float) + six.integer_types):
+    return value
+  if isinstance(value, np.generic):
+    return value.item()
+  if isinstance(value, six.text_type):
+    return value
+  if isinstance(value, bytes):
+    return {'b': compat.as_text(base64.b64encode(value))}
+  if isinstance(value, list):
+    return [_Encode(v, types) for v in value]
+  if isinstance(value, dict):
+    return {'d': [[_Encode(k, types), _Encode(v, types)]
+                  for k, v in six.iteritems(value)]}
+  name = _TypeName(type(value))
+  if types.get(name) is type(value):
+    if hasattr(value, 'SerializeToString'):
+      return {'p': name,
+              'v': compat.as_text(base64.b64encode(value.SerializeToString()))}
+    return {'n': name, 'v': [_Encode(v, types) for v in value]}
+  if type(value) is tuple:
+    return {'t': [_Encode(v, types) for v in value]}
+  raise TypeError('Cannot encode a value of type %s in a snapshot' % name)
+
+
+def _Decode(value, types):
+  """Converts a value encoded by `_Encode` back.
+
+  Args:
+    value: A value returned by `_Encode`, after a round trip through JSON.
+    types: The dict of types that was passed to `_Encode`.
+
+  Returns:
+    The decoded value.
+
+  Raises:
+    ValueError: If `value` is malformed or names an unknown type.
+  """
+  if isinstance(value, list):
+    return [_Decode(v, types) for v in value]
+  if not isinstance(value, dict):
+    return value
+  if 'b' in value:
+    return base64.b64decode(compat.as_bytes(value['b']))
+  if 'd' in value:
+    return {_Decode(k, types): _Decode(v, types) for k, v in value['d']}
+  if 't' in value:
+    return tuple(_Decode(v, types) for v in value['t'])
+  if 'n' in value or 'p' in value:
+    name = value.get('n', value.get('p'))
+    value_type = types.get(name)
+    if value_type is None:
+      raise ValueError('Unknown type %s' % name)
+    if 'p' in value:
+      message = value_type()
+      message.ParseFromString(base64.b64decode(compat.as_bytes(value['v'])))
+      return message
+    return value_type(*[_Decode(v, types) for v in value['v']])
+  raise ValueError('Malformed value %r' % value)
+
+
+def WriteSnapshot(snapshot_path, state, types=()):
+  """Atomically writes `state` to `snapshot_path`.
+
+  Args:
+    snapshot_path: The path to write the snapshot to.
+    state: A value made of `None`, bools, numbers, strings, byte strings,
+      lists, tuples, dicts and instances of `types`.
+    types: The namedtuple and protocol buffer types that may occur in `state`.
+
+  Raises:
+    TypeError: If `state` holds a value of any other type.
+  """
+  types = {_TypeName(t): t for t in types}
+  payload = compat.as_bytes(json.dumps(_Encode(state, types)))
+  header = struct.pack(_HEADER_FORMAT, _MAGIC, _VERSION,
+                       zlib.crc32(payload) & 0xffffffff)
+  temp_path = snapshot_path + '.tmp'
+  with gfile.GFile(temp_path, 'wb') as f:
+    f.write(header)
+    f.write(payload)
+  gfile.Rename(temp_path, snapshot_path, overwrite=True)
+
+
+def ReadSnapshot(snapshot_path, types=()):
+  """Reads a snapshot written by `WriteSnapshot`.
+
+  Args:
+    snapshot_path: The path of the snapshot.
+    types: The namedtuple and protocol buffer types that were passed to
+      `WriteSnapshot`. No other types are ever instantiated.
+
+  Returns:
+    The snapshotted state, or None if there is no snapshot at the path.
+
+  Raises:
+    CorruptSnapshotError: If the snapshot is truncated, fails its checksum, was
+      written by an incompatible version or cannot be decoded.
+  """
+  if not gfile.Exists(snapshot_path):
+    return None
+  with gfile.GFile(snapshot_path, 'rb') as f:
+    data = f.read()
+  if len(data) < _HEADER_SIZE:
+    raise CorruptSnapshotError('Snapshot %s is truncated' % snapshot_path)
+  magic, version, checksum = struct.unpack(_HEADER_FORMAT,
+                                           data[:_HEADER_SIZE])
+  if magic != _MAGIC:
+    raise CorruptSnapshotError('%s is not a snapshot' % snapshot_path)
+  if version != _VERSION:
+    raise CorruptSnapshotError('Snapshot %s has version %d, expected %d' %
+                               (snapshot_path, version, _VERSION))
+  payload = data[_HEADER_SIZE:]
+  if zlib.crc32(payload) & 0xffffffff != checksum:
+    raise CorruptSnapshotError('Snapshot %s fails its checksum' %
+                               snapshot_path)
+  types = {_TypeName(t): t for t in types}
+  try:
+    return _Decode(json.loads(compat.as_text(payload)), types)
+  except Exception as e:  # pylint: disable=broad-except
+    raise CorruptSnapshotError('Unable to decode snapshot %s: %s' %
+                               (snapshot_path, e))
@@ -0,0 +1,159 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Contains the implementation for the DirectoryIndex class."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import os
+import time
+
+from tensorflow.python.framework import errors
+from tensorflow.python.platform import gfile
+from tensorflow.tensorboard.backend.event_processing import io_wrapper
+
+# A directory modified less than this long before it was listed may be modified
+# again without its mtime changing, so its listing is not trusted.
+_RACY_WINDOW_NSEC = 2 * 10**9
+
+_DirectoryEntry = collections.namedtuple(
+    '_DirectoryEntry',
+    ['mtime_nsec', 'listed_at_nsec', 'subdirs', 'has_matching_files'])
+
+UpdateStats = collections.namedtuple(
+    'UpdateStats', ['num_listed', 'num_cached', 'duration_secs'])
+
+
+class DirectoryIndex(object):
+  """A DirectoryIndex finds the directories in a tree that contain files.
+
+  Listing every directory of a large tree on every scan is expensive, so the
+  index remembers the listing of each directory along with its mtime. Adding or
+  removing an entry in a directory changes the directory's mtime, so a later
+  `Update` only lists the directories whose mtime changed and reuses the cached
+  listing for the rest. Every directory is still `Stat`ed once per `Update`.
+
+  Object stores such as GCS have no meaningful directory mtimes, so for those
+  paths every directory is listed on every `Update`.
+  """
+
+  def __init__(self, top, path_filter=lambda x: True):
+    """Constructs a new DirectoryIndex.
+
+    Args:
+      top: The root of the directory tree to index.
+      path_filter: Only directories containing at least one file whose path
+        matches this filter are reported by `Update`.
+
+    Raises:
+      ValueError: If top is None.
+    """
+    if top is None:
+      raise ValueError('A directory is required')
+    self._top = top
+    self._path_filter = path_filter
+    self._use_mtimes = not io_wrapper.IsGCSPath(top)
+    # Maps a directory path to its _DirectoryEntry.
+    self._entries = {}
+    self.last_update_stats = None
+
+  def Update(self):
+    """Rescans the tree and returns the directories with matching files.
+
+    Directories that no longer exist are dropped from the index. If `top` does
+    not exist, this returns an empty list.
+
+    Returns:
+      A list of the paths of all directories in the tree that contain at least
+      one file matching `path_filter`, in depth-first order.
+    """
+    start = time.time()
+    num_listed = 0
+    num_cached = 0
+    seen = set()
+    result = []
+    stack = [self._top]
+    while stack:
+      path = stack.pop()
+      entry, listed = self._GetEntry(path)
+      if entry is None:
+        continue
+      seen.add(path)
+      if listed:
+        num_listed += 1
+      else:
+        num_cached += 1
+      if entry.has_matching_files:
+        result.append(path)
+      stack.extend(os.path.join(path, subdir)
+                   for subdir in reversed(entry.subdirs))
+
+    for path in set(self._entries) - seen:
+      del self._entries[path]
+    self.last_update_stats = UpdateStats(
+        num_listed=num_listed,
+        num_cached=num_cached,
+        duration_secs=time.time() - start)
+    return result
+
+  def _GetEntry(self, path):
+    """Returns the entry for path, listing the directory if necessary.
+
+    Args:
+      path: The path of a directory in the tree.
+
+    Returns:
+      A tuple `(entry, listed)`, where `entry` is the `_DirectoryEntry` for the
+      path, or None if it is not a directory, and `listed` is whether the
+      directory had to be listed.
+    """
+    mtime_nsec = None
+    if self._use_mtimes:
+      try:
+        stat = gfile.Stat(path)
+      except errors.OpError:
+        self._entries.pop(path, None)
+        return None, False
+      if not stat.is_directory:
+        return None, False
+      mtime_nsec = stat.mtime_nsec
+      entry = self._entries.get(path)
+      if (entry is not None and entry.mtime_nsec == mtime_nsec and
+          entry.mtime_nsec < entry.listed_at_nsec - _RACY_WINDOW_NSEC):
+        return entry, False
+
+    listed_at_nsec = int(time.time() * 10**9)
+    try:
+      children = gfile.ListDirectory(path)
+    except errors.OpError:
+      self._entries.pop(path, None)
+      return None, False
+    subdirs = []
+    has_matching_files = False
+    for child in sorted(children):
+      child_path = os.path.join(path, child)
+      if gfile.IsDirectory(child_path):
+        subdirs.append(child)
+      elif not has_matching_files and self._path_filter(child_path):
+        has_matching_files = True
+    entry = _DirectoryEntry(
+        mtime_nsec=mtime_nsec,
+        listed_at_nsec=listed_at_nsec,
+        subdirs=subdirs,
+        has_matching_files=has_matching_files)
+    self._entries[path] = entry
+    return entry, True
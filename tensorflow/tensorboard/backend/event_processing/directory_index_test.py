@@ -0,0 +1,113 @@
+# Copyright 2017 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for directory_index."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import time
+
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import googletest
+from tensorflow.tensorboard.backend.event_processing import directory_index
+
+
+def _IsEventsFile(path):
+  return 'tfevents' in os.path.basename(path)
+
+
+class DirectoryIndexTest(test_util.TensorFlowTestCase):
+
+  def setUp(self):
+    self._directory = os.path.join(self.get_temp_dir(), 'index_dir')
+    os.mkdir(self._directory)
+    self._index = directory_index.DirectoryIndex(self._directory,
+                                                 _IsEventsFile)
+
+  def tearDown(self):
+    shutil.rmtree(self._directory, ignore_errors=True)
+
+  def _Path(self, *parts):
+    return os.path.join(self._directory, *parts)
+
+  def _AddFile(self, *parts):
+    path = self._Path(*parts)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+      f.write('')
+
+  def _AgeAllDirectories(self):
+    """Moves every mtime out of the racy window."""
+    old = time.time() - 60
+    for dir_path, _, _ in os.walk(self._directory):
+      os.utime(dir_path, (old, old))
+
+  def testNonexistentDirectory(self):
+    index = directory_index.DirectoryIndex(self._Path('nonexistent'))
+    self.assertEqual(index.Update(), [])
+    self.assertEqual(index.last_update_stats.num_listed, 0)
+
+  def testFindsDirectoriesWithMatchingFiles(self):
+    self._AddFile('events.out.tfevents.1')
+    self._AddFile('a', 'events.out.tfevents.2')
+    self._AddFile('a', 'b', 'events.out.tfevents.3')
+    self._AddFile('c', 'not_an_event_file')
+    self.assertEqual(self._index.Update(),
+                     [self._directory, self._Path('a'), self._Path('a', 'b')])
+
+  def testUnchangedDirectoriesAreNotListedAgain(self):
+    self._AddFile('a', 'events.out.tfevents.1')
+    self._AddFile('b', 'events.out.tfevents.2')
+    self._AgeAllDirectories()
+    self._index.Update()
+    self.assertEqual(self._index.last_update_stats.num_listed, 3)
+
+    self._index.Update()
+    self.assertEqual(self._index.last_update_stats.num_listed, 0)
+    self.assertEqual(self._index.last_update_stats.num_cached, 3)
+
+  def testChangedSubtreeIsListedAgain(self):
+    self._AddFile('a', 'events.out.tfevents.1')
+    self._AddFile('b', 'other')
+    self._AgeAllDirectories()
+    self.assertEqual(self._index.Update(), [self._Path('a')])
+
+    self._AddFile('b', 'events.out.tfevents.2')
+    self.assertEqual(self._index.Update(), [self._Path('a'), self._Path('b')])
+    self.assertEqual(self._index.last_update_stats.num_listed, 1)
+
+  def testRecentlyModifiedDirectoriesAreNotTrusted(self):
+    self._AddFile('a', 'other')
+    self.assertEqual(self._index.Update(), [])
+    # The directory was modified within the racy window of the previous
+    # listing, so the new file is found even if the mtime did not change.
+    self._AddFile('a', 'events.out.tfevents.1')
+    self.assertEqual(self._index.Update(), [self._Path('a')])
+
+  def testDeletedDirectoriesAreDropped(self):
+    self._AddFile('a', 'events.out.tfevents.1')
+    self._AddFile('b', 'events.out.tfevents.2')
+    self.assertEqual(self._index.Update(), [self._Path('a'), self._Path('b')])
+    shutil.rmtree(self._Path('b'))
+    self.assertEqual(self._index.Update(), [self._Path('a')])
+
+
+if __name__ == '__main__':
+  googletest.main()
@@ -161,6 +161,38 @@ class DirectoryWatcher(object):
     """
     return self._ooo_writes_detected
 
+  def GetState(self):
+    """Returns a snapshot of how far the watcher has read.
+
+    The loaders created by `loader_factory` must have an `Offset` method
+    returning the position just past the last value they yielded.
+
+    Returns:
+      A dict suitable for passing to `RestoreState`, or None if the watcher has
+      not started loading yet.
+    """
+    if self._loader is None:
+      return None
+    return {
+        'path': self._path,
+        'offset': self._loader.Offset(),
+        'finalized_sizes': dict(self._finalized_sizes),
+        'ooo_writes_detected': self._ooo_writes_detected,
+    }
+
+  def RestoreState(self, state):
+    """Resumes loading from a snapshot returned by `GetState`.
+
+    The `loader_factory` must accept the start offset as a second argument.
+
+    Args:
+      state: A dict returned by `GetState`.
+    """
+    self._path = state['path']
+    self._loader = self._loader_factory(state['path'], state['offset'])
+    self._finalized_sizes = dict(state['finalized_sizes'])
+    self._ooo_writes_detected = state['ooo_writes_detected']
+
   def _InitializeLoader(self):
     path = self._GetNextPath()
     if path:
@@ -32,9 +32,9 @@ from tensorflow.tensorboard.backend.event_processing import io_wrapper
 class _ByteLoader(object):
   """A loader that loads individual bytes from a file."""
 
-  def __init__(self, path):
+  def __init__(self, path, start_offset=0):
     self._f = open(path)
-    self.bytes_read = 0
+    self.bytes_read = start_offset
 
   def Load(self):
     while True:
@@ -46,6 +46,9 @@ class _ByteLoader(object):
       else:
         return
 
+  def Offset(self):
+    return self.bytes_read
+
 
 class DirectoryWatcherTest(test_util.TensorFlowTestCase):
 
@@ -122,6 +125,25 @@ class DirectoryWatcherTest(test_util.TensorFlowTestCase):
     self.assertWatcherYields(['b', 'c'])
     self.assertFalse(self._watcher.OutOfOrderWritesDetected())
 
+  def testRestoreStateResumesWhereSnapshotWasTaken(self):
+    self._WriteToFile('a', 'ab')
+    self._WriteToFile('b', 'c')
+    self.assertWatcherYields(['a', 'b', 'c'])
+    state = self._watcher.GetState()
+    self.assertEqual(state['path'], os.path.join(self._directory, 'b'))
+    self.assertEqual(state['offset'], 1)
+
+    self._WriteToFile('b', 'd')
+    self._WriteToFile('c', 'e')
+    self._watcher = directory_watcher.DirectoryWatcher(self._directory,
+                                                       _ByteLoader)
+    self._watcher.RestoreState(state)
+    self.assertWatcherYields(['d', 'e'])
+    self.assertFalse(self._watcher.OutOfOrderWritesDetected())
+
+  def testGetStateBeforeLoading(self):
+    self.assertIsNone(self._watcher.GetState())
+
   def testIntermediateEmptyFiles(self):
     self._WriteToFile('a', 'a')
     self._WriteToFile('b', '')
@@ -18,19 +18,26 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import functools
+import itertools
 import os
 import re
 import threading
+import time
 
 import numpy as np
 
 from tensorflow.core.framework import graph_pb2
+from tensorflow.core.framework import tensor_pb2
 from tensorflow.core.protobuf import meta_graph_pb2
 from tensorflow.core.protobuf.config_pb2 import RunMetadata
 from tensorflow.core.util.event_pb2 import SessionLog
+from tensorflow.python.framework import errors
 from tensorflow.python.framework import tensor_util
+from tensorflow.python.platform import gfile
 from tensorflow.python.platform import tf_logging as logging
 from tensorflow.python.util import compat
+from tensorflow.tensorboard.backend.event_processing import accumulator_cache
 from tensorflow.tensorboard.backend.event_processing import directory_watcher
 from tensorflow.tensorboard.backend.event_processing import event_file_loader
 from tensorflow.tensorboard.backend.event_processing import plugin_asset_util
@@ -115,11 +122,44 @@ STORE_EVERYTHING_SIZE_GUIDANCE = {
     TENSORS: 0,
 }
 
+# Source of the values returned by `EventAccumulator.Generation`. Sharing one
+# counter makes generations unique across accumulators, so a run whose
+# accumulator is replaced never reports a generation it had before.
+_GENERATION_COUNTER = itertools.count(1)
+
+# The tag types whose events can be stored column-wise in typed arrays, mapped
+# to their event namedtuple and the array typecode of each of its fields.
+_COMPACT_COLUMNS = {
+    SCALARS: (ScalarEvent, (reservoir.FLOAT64_TYPECODE,
+                            reservoir.INT64_TYPECODE,
+                            reservoir.FLOAT64_TYPECODE)),
+}
+
+# The tag types that are stored compactly unless specified otherwise.
+DEFAULT_COMPACT_TAG_TYPES = frozenset([SCALARS])
+
 # The tag that values containing health pills have. Health pill data is stored
 # in tensors. In order to distinguish health pill values from scalar values, we
 # rely on how health pill values have this special tag value.
 HEALTH_PILL_EVENT_TAG = '__health_pill__'
 
+# When a cache directory is given, the accumulator state is snapshotted at most
+# this often, and only if new events were loaded since the last snapshot.
+_SNAPSHOT_INTERVAL_SECS = 60
+
+# The reservoirs and plain attributes of an accumulator that are saved in its
+# snapshot.
+_SNAPSHOT_RESERVOIRS = ('_scalars', '_health_pills', '_histograms',
+                        '_compressed_histograms', '_images', '_audio',
+                        '_tensors')
+_SNAPSHOT_ATTRS = ('_first_event_timestamp', '_graph', '_graph_from_metagraph',
+                   '_meta_graph', '_tagged_metadata', 'most_recent_step',
+                   'most_recent_wall_time', 'file_version')
+# The types other than plain Python values that occur in snapshots.
+_SNAPSHOT_TYPES = (ScalarEvent, HealthPillEvent, CompressedHistogramEvent,
+                   CompressedHistogramValue, HistogramEvent, HistogramValue,
+                   ImageEvent, AudioEvent, TensorEvent, tensor_pb2.TensorProto)
+
 
 def IsTensorFlowEventsFile(path):
   """Check the path name to see if it is probably a TF Events file.
@@ -159,6 +199,13 @@ class EventAccumulator(object):
 
   Histograms, audio, and images are very large, so storing all of them is not
   recommended.
+
+  If a `cache_dir` is given, the accumulator periodically snapshots its state
+  (the sampled events and how far each event file has been read) into that
+  directory. A new accumulator for the same path restores the snapshot and only
+  reads the events written after it was taken. Snapshots that are corrupt, that
+  were taken with different settings, or whose event files have changed are
+  discarded and rebuilt from scratch.
   @@Tensors
   """
 
@@ -166,7 +213,9 @@ class EventAccumulator(object):
                path,
                size_guidance=DEFAULT_SIZE_GUIDANCE,
                compression_bps=NORMAL_HISTOGRAM_BPS,
-               purge_orphaned_data=True):
+               purge_orphaned_data=True,
+               cache_dir=None,
+               compact_tag_types=DEFAULT_COMPACT_TAG_TYPES):
     """Construct the `EventAccumulator`.
 
     Args:
@@ -183,7 +232,20 @@ class EventAccumulator(object):
         `ProcessCompressedHistogram`).
       purge_orphaned_data: Whether to discard any events that were "orphaned" by
         a TensorFlow restart.
+      cache_dir: If not None, a directory in which to persist snapshots of the
+        accumulator state, so that it can be restored without reloading all
+        events from the start of the event files.
+      compact_tag_types: A collection of `tagType`s whose events are stored in
+        memory-compact typed arrays instead of as one namedtuple per event.
+        Only `SCALARS` is supported. This does not change the values returned.
+
+    Raises:
+      ValueError: If `compact_tag_types` contains an unsupported `tagType`.
     """
+    unsupported = set(compact_tag_types) - set(_COMPACT_COLUMNS)
+    if unsupported:
+      raise ValueError('Compact storage is not supported for %s' %
+                       sorted(unsupported))
     sizes = {}
     for key in DEFAULT_SIZE_GUIDANCE:
       if key in size_guidance:
@@ -192,7 +254,9 @@ class EventAccumulator(object):
         sizes[key] = DEFAULT_SIZE_GUIDANCE[key]
 
     self._first_event_timestamp = None
-    self._scalars = reservoir.Reservoir(size=sizes[SCALARS])
+    self._scalars = reservoir.Reservoir(
+        size=sizes[SCALARS],
+        items_factory=_ItemsFactory(SCALARS, compact_tag_types))
 
     # Unlike the other reservoir, the reservoir for health pills is keyed by the
     # name of the op instead of the tag. This lets us efficiently obtain the
@@ -226,6 +290,14 @@ class EventAccumulator(object):
                               '_compressed_histograms', '_images', '_audio')
     self._tensor_summaries = {}
 
+    self._generation = next(_GENERATION_COUNTER)
+    self._sizes = sizes
+    self._cache_dir = cache_dir
+    self._events_since_snapshot = 0
+    self._last_snapshot_time = 0
+    if cache_dir is not None:
+      self._RestoreSnapshot()
+
   def Reload(self):
     """Loads all events added since the last call to `Reload`.
 
@@ -237,8 +309,120 @@ class EventAccumulator(object):
     with self._generator_mutex:
       for event in self._generator.Load():
         self._ProcessEvent(event)
+      if (self._cache_dir is not None and self._events_since_snapshot and
+          time.time() - self._last_snapshot_time >= _SNAPSHOT_INTERVAL_SECS):
+        self._WriteSnapshot()
     return self
 
+  def WriteSnapshot(self):
+    """Writes a snapshot of the accumulator state to the cache directory.
+
+    `Reload` already writes snapshots periodically; this forces one to be
+    written now, e.g. before shutting down. Does nothing if the accumulator has
+    no cache directory or has not loaded any events yet.
+    """
+    if self._cache_dir is None:
+      return
+    with self._generator_mutex:
+      self._WriteSnapshot()
+
+  def _SnapshotConfig(self):
+    """Returns the settings that a snapshot is only valid for."""
+    return (sorted(self._sizes.items()), tuple(self._compression_bps),
+            self.purge_orphaned_data)
+
+  def _GeneratorState(self):
+    """Returns how far the event files have been read, or None if not at all."""
+    if isinstance(self._generator, directory_watcher.DirectoryWatcher):
+      return self._generator.GetState()
+    return {'path': self.path, 'offset': self._generator.Offset(),
+            'finalized_sizes': {}}
+
+  def _WriteSnapshot(self):
+    """Writes a snapshot. Must be called with `_generator_mutex` held."""
+    generator_state = self._GeneratorState()
+    if generator_state is None:
+      return
+    state = {
+        'path': self.path,
+        'config': self._SnapshotConfig(),
+        'generator': generator_state,
+        'fingerprint': accumulator_cache.TailFingerprint(
+            generator_state['path'], generator_state['offset']),
+        'reservoirs': {name: getattr(self, name).GetState()
+                       for name in _SNAPSHOT_RESERVOIRS},
+        'attrs': {name: getattr(self, name) for name in _SNAPSHOT_ATTRS},
+    }
+    snapshot_path = accumulator_cache.SnapshotPath(self._cache_dir, self.path)
+    try:
+      if not gfile.IsDirectory(self._cache_dir):
+        gfile.MakeDirs(self._cache_dir)
+      accumulator_cache.WriteSnapshot(snapshot_path, state, _SNAPSHOT_TYPES)
+    except (errors.OpError, IOError, TypeError) as e:
+      logging.error('Unable to write snapshot for %s to %s: %s', self.path,
+                    snapshot_path, e)
+      return
+    self._events_since_snapshot = 0
+    self._last_snapshot_time = time.time()
+
+  def _RestoreSnapshot(self):
+    """Restores the accumulator state from its snapshot, if there is one."""
+    snapshot_path = accumulator_cache.SnapshotPath(self._cache_dir, self.path)
+    try:
+      state = accumulator_cache.ReadSnapshot(snapshot_path, _SNAPSHOT_TYPES)
+    except (accumulator_cache.CorruptSnapshotError, errors.OpError) as e:
+      logging.warning('Discarding snapshot for %s: %s', self.path, e)
+      _DeleteSnapshot(snapshot_path)
+      return
+    if state is None:
+      return
+    reason = self._SnapshotStaleReason(state)
+    if reason is not None:
+      logging.warning('Discarding stale snapshot for %s: %s', self.path, reason)
+      _DeleteSnapshot(snapshot_path)
+      return
+
+    generator_state = state['generator']
+    if isinstance(self._generator, directory_watcher.DirectoryWatcher):
+      self._generator.RestoreState(generator_state)
+    else:
+      self._generator = event_file_loader.EventFileLoader(
+          self.path, generator_state['offset'])
+    for name, reservoir_state in state['reservoirs'].items():
+      getattr(self, name).RestoreState(reservoir_state)
+    for name, value in state['attrs'].items():
+      setattr(self, name, value)
+    self._generation = next(_GENERATION_COUNTER)
+    self._last_snapshot_time = time.time()
+    logging.info('Restored %s from snapshot; resuming %s at offset %d',
+                 self.path, generator_state['path'], generator_state['offset'])
+
+  def _SnapshotStaleReason(self, state):
+    """Checks whether a snapshot still matches the accumulator and its files.
+
+    Args:
+      state: The snapshotted state dict.
+
+    Returns:
+      A string explaining why the snapshot cannot be used, or None if it can.
+    """
+    if state['path'] != self.path:
+      return 'snapshot is for %s' % state['path']
+    if state['config'] != self._SnapshotConfig():
+      return 'size guidance or purge settings changed'
+    generator_state = state['generator']
+    fingerprint = accumulator_cache.TailFingerprint(generator_state['path'],
+                                                    generator_state['offset'])
+    if fingerprint is None or fingerprint != state['fingerprint']:
+      return '%s is missing or was rewritten' % generator_state['path']
+    for path, size in generator_state['finalized_sizes'].items():
+      try:
+        if gfile.Stat(path).length != size:
+          return '%s changed size' % path
+      except errors.OpError:
+        return '%s is missing' % path
+    return None
+
   def PluginAssets(self, plugin_name):
     """Return a list of all plugin assets for the given plugin.
 
@@ -292,8 +476,21 @@ class EventAccumulator(object):
       except StopIteration:
         raise ValueError('No event timestamp could be found')
 
+  def Generation(self):
+    """Returns a number that changes whenever the accumulated data changes.
+
+    Callers can use it to invalidate anything they derived from the data, e.g.
+    cached responses. Generations are unique across all accumulators.
+
+    Returns:
+      An integer generation.
+    """
+    return self._generation
+
   def _ProcessEvent(self, event):
     """Called whenever an event is loaded."""
+    self._generation = next(_GENERATION_COUNTER)
+    self._events_since_snapshot += 1
     if self._first_event_timestamp is None:
       self._first_event_timestamp = event.wall_time
 
@@ -772,6 +969,22 @@ def _GeneratorFromPath(path):
         path, event_file_loader.EventFileLoader, IsTensorFlowEventsFile)
 
 
+def _ItemsFactory(tag_type, compact_tag_types):
+  """Returns the reservoir `items_factory` to use for a tag type."""
+  if tag_type not in compact_tag_types:
+    return list
+  item_type, typecodes = _COMPACT_COLUMNS[tag_type]
+  return functools.partial(reservoir.ColumnarItems, item_type, typecodes)
+
+
+def _DeleteSnapshot(snapshot_path):
+  """Deletes a snapshot file, logging instead of raising on failure."""
+  try:
+    gfile.Remove(snapshot_path)
+  except errors.OpError as e:
+    logging.error('Unable to delete snapshot %s: %s', snapshot_path, e)
+
+
 def _ParseFileVersion(file_version):
   """Convert the string file_version in event.proto into a float.
 
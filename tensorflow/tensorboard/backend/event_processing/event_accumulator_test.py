@@ -17,7 +17,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
+import struct
+import zlib
 
 import numpy as np
 import six
@@ -41,6 +44,8 @@ from tensorflow.python.summary import summary as summary_lib
 from tensorflow.python.summary.writer import writer as writer_lib
 from tensorflow.python.summary.writer.writer import SummaryToEventTransformer
 from tensorflow.python.training import saver
+from tensorflow.python.util import compat
+from tensorflow.tensorboard.backend.event_processing import accumulator_cache
 from tensorflow.tensorboard.backend.event_processing import event_accumulator as ea
 
 
@@ -280,6 +285,41 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     self.assertEqual(acc.Scalars('s1'), [s1])
     self.assertEqual(acc.Scalars('s2'), [s2])
 
+  def testGenerationChangesWhenDataIsLoaded(self):
+    gen = _EventGenerator(self)
+    acc = ea.EventAccumulator(gen)
+    other_acc = ea.EventAccumulator(_EventGenerator(self))
+    self.assertNotEqual(acc.Generation(), other_acc.Generation())
+
+    generation = acc.Generation()
+    acc.Reload()
+    self.assertEqual(generation, acc.Generation())
+    gen.AddScalar('s1', wall_time=1, step=10, value=32)
+    acc.Reload()
+    self.assertGreater(acc.Generation(), generation)
+
+  def testScalarsWithoutCompactStorage(self):
+    """Scalars are the same whether or not they are stored compactly."""
+    gen = _EventGenerator(self)
+    for step in xrange(100):
+      gen.AddScalar('s1', wall_time=step * 1.5, step=step, value=step / 3.0)
+    compact_acc = ea.EventAccumulator(gen, size_guidance={ea.SCALARS: 10})
+    compact_acc.Reload()
+
+    gen = _EventGenerator(self)
+    for step in xrange(100):
+      gen.AddScalar('s1', wall_time=step * 1.5, step=step, value=step / 3.0)
+    list_acc = ea.EventAccumulator(
+        gen, size_guidance={ea.SCALARS: 10}, compact_tag_types=())
+    list_acc.Reload()
+
+    self.assertEqual(10, len(compact_acc.Scalars('s1')))
+    self.assertEqual(list_acc.Scalars('s1'), compact_acc.Scalars('s1'))
+
+  def testCompactStorageRejectsUnsupportedTagTypes(self):
+    with self.assertRaises(ValueError):
+      ea.EventAccumulator(_EventGenerator(self), compact_tag_types=[ea.IMAGES])
+
   def _compareHealthPills(self, expected_event, gotten_event):
     """Compares 2 health pills.
 
@@ -991,5 +1031,110 @@ class RealisticEventAccumulatorTest(EventAccumulatorTest):
     self.assertProtoEquals(meta_graph_def, acc.MetaGraph())
 
 
+class SnapshotEventAccumulatorTest(EventAccumulatorTest):
+
+  def setUp(self):
+    super(SnapshotEventAccumulatorTest, self).setUp()
+    self._directory = os.path.join(self.get_temp_dir(), 'snapshot_values_dir')
+    self._cache_dir = os.path.join(self.get_temp_dir(), 'snapshot_cache_dir')
+    for directory in (self._directory, self._cache_dir):
+      if gfile.IsDirectory(directory):
+        gfile.DeleteRecursively(directory)
+    gfile.MkDir(self._directory)
+    self._writer = writer_lib.FileWriter(self._directory, max_queue=100)
+
+  def tearDown(self):
+    self._writer.close()
+    super(SnapshotEventAccumulatorTest, self).tearDown()
+
+  def _WriteScalars(self, start, stop):
+    for i in xrange(start, stop):
+      value = summary_pb2.Summary.Value(tag='id', simple_value=i)
+      self._writer.add_summary(summary_pb2.Summary(value=[value]), i)
+    self._writer.flush()
+
+  def _SnapshotPaths(self):
+    if not gfile.IsDirectory(self._cache_dir):
+      return []
+    return gfile.ListDirectory(self._cache_dir)
+
+  def testRestoreFromSnapshotOnlyLoadsNewEvents(self):
+    self._WriteScalars(0, 10)
+    acc = ea.EventAccumulator(self._directory, cache_dir=self._cache_dir)
+    acc.Reload()
+    self.assertEqual(1, len(self._SnapshotPaths()))
+
+    self._WriteScalars(10, 15)
+    restored = ea.EventAccumulator(self._directory, cache_dir=self._cache_dir)
+    # The snapshot is restored without loading anything from disk.
+    self.assertEqual(list(range(10)),
+                     [e.step for e in restored.Scalars('id')])
+    self.assertIsNotNone(restored.FirstEventTimestamp())
+    restored.Reload()
+    self.assertEqual(list(range(15)),
+                     [e.step for e in restored.Scalars('id')])
+
+  def testCorruptSnapshotIsRebuilt(self):
+    self._WriteScalars(0, 10)
+    ea.EventAccumulator(self._directory, cache_dir=self._cache_dir).Reload()
+    snapshot_path = os.path.join(self._cache_dir, self._SnapshotPaths()[0])
+    with open(snapshot_path, 'r+b') as f:
+      f.seek(-1, os.SEEK_END)
+      last_byte = f.read(1)
+      f.seek(-1, os.SEEK_END)
+      f.write(b'\x01' if last_byte == b'\x00' else b'\x00')
+
+    acc = ea.EventAccumulator(self._directory, cache_dir=self._cache_dir)
+    self.assertEqual([], self._SnapshotPaths())
+    acc.Reload()
+    self.assertEqual(list(range(10)), [e.step for e in acc.Scalars('id')])
+    self.assertEqual(1, len(self._SnapshotPaths()))
+
+  def testSnapshotWithUnknownTypeIsDiscarded(self):
+    self._WriteScalars(0, 10)
+    ea.EventAccumulator(self._directory, cache_dir=self._cache_dir).Reload()
+    # A well-formed snapshot naming a type outside the accumulator's own.
+    payload = compat.as_bytes(json.dumps({'n': 'posix.system', 'v': ['true']}))
+    header = struct.pack(accumulator_cache._HEADER_FORMAT,
+                         accumulator_cache._MAGIC, accumulator_cache._VERSION,
+                         zlib.crc32(payload) & 0xffffffff)
+    snapshot_path = os.path.join(self._cache_dir, self._SnapshotPaths()[0])
+    with open(snapshot_path, 'wb') as f:
+      f.write(header + payload)
+
+    acc = ea.EventAccumulator(self._directory, cache_dir=self._cache_dir)
+    self.assertEqual([], self._SnapshotPaths())
+    acc.Reload()
+    self.assertEqual(list(range(10)), [e.step for e in acc.Scalars('id')])
+
+  def testStaleSnapshotIsDiscarded(self):
+    self._WriteScalars(0, 10)
+    ea.EventAccumulator(self._directory, cache_dir=self._cache_dir).Reload()
+
+    # Rewriting the run with different data makes the snapshot stale.
+    self._writer.close()
+    gfile.DeleteRecursively(self._directory)
+    gfile.MkDir(self._directory)
+    self._writer = writer_lib.FileWriter(self._directory, max_queue=100)
+    self._WriteScalars(100, 103)
+
+    acc = ea.EventAccumulator(self._directory, cache_dir=self._cache_dir)
+    acc.Reload()
+    self.assertEqual([100, 101, 102], [e.step for e in acc.Scalars('id')])
+
+  def testSnapshotWithDifferentSizeGuidanceIsDiscarded(self):
+    self._WriteScalars(0, 10)
+    ea.EventAccumulator(self._directory, cache_dir=self._cache_dir).Reload()
+
+    acc = ea.EventAccumulator(
+        self._directory,
+        size_guidance={ea.SCALARS: 5},
+        cache_dir=self._cache_dir)
+    with self.assertRaises(KeyError):
+      acc.Scalars('id')
+    acc.Reload()
+    self.assertEqual(5, len(acc.Scalars('id')))
+
+
 if __name__ == '__main__':
   test.main()
@@ -30,14 +30,26 @@ from tensorflow.python.util import compat
 class EventFileLoader(object):
   """An EventLoader is an iterator that yields Event protos."""
 
-  def __init__(self, file_path):
+  def __init__(self, file_path, start_offset=0):
+    """Constructs an EventFileLoader.
+
+    Args:
+      file_path: The path of the event file to read.
+      start_offset: The byte offset of the first record to read. This must be
+        the offset of a record boundary, such as one returned by `Offset`.
+
+    Raises:
+      ValueError: If file_path is None.
+      IOError: If the file could not be opened.
+    """
     if file_path is None:
       raise ValueError('A file path is required')
     file_path = resource_loader.readahead_file_path(file_path)
     logging.debug('Opening a record reader pointing at %s', file_path)
     with errors.raise_exception_on_not_ok_status() as status:
       self._reader = pywrap_tensorflow.PyRecordReader_New(
-          compat.as_bytes(file_path), 0, compat.as_bytes(''), status)
+          compat.as_bytes(file_path), start_offset, compat.as_bytes(''),
+          status)
     # Store it for logging purposes.
     self._file_path = file_path
     if not self._reader:
@@ -66,6 +78,10 @@ class EventFileLoader(object):
       yield event
     logging.debug('No more events in %s', self._file_path)
 
+  def Offset(self):
+    """Returns the byte offset just past the last event that was loaded."""
+    return self._reader.offset()
+
 
 def main(argv):
   if len(argv) != 2:
@@ -87,6 +87,19 @@ class EventFileLoaderTest(test_util.TensorFlowTestCase):
     loader = self._LoaderForTestFile(filename)
     self.assertEqual(len(list(loader.Load())), 2)
 
+  def testResumeFromOffset(self):
+    filename = tempfile.NamedTemporaryFile(dir=self.get_temp_dir()).name
+    self._WriteToFile(filename, EventFileLoaderTest.RECORD)
+    loader = self._LoaderForTestFile(filename)
+    self.assertEqual(loader.Offset(), 0)
+    self.assertEqual(len(list(loader.Load())), 1)
+    self.assertEqual(loader.Offset(), len(EventFileLoaderTest.RECORD))
+
+    self._WriteToFile(filename, EventFileLoaderTest.RECORD)
+    resumed = event_file_loader.EventFileLoader(
+        os.path.join(self.get_temp_dir(), filename), loader.Offset())
+    self.assertEqual(len(list(resumed.Load())), 1)
+
 
 if __name__ == '__main__':
   googletest.main()
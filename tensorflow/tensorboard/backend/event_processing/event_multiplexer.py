@@ -18,17 +18,26 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import os
 import threading
+import time
 
 import six
+from six.moves import queue
+from six.moves import xrange  # pylint: disable=redefined-builtin
 
 from tensorflow.python.platform import gfile
 from tensorflow.python.platform import tf_logging as logging
+from tensorflow.tensorboard.backend.event_processing import directory_index
 from tensorflow.tensorboard.backend.event_processing import directory_watcher
 from tensorflow.tensorboard.backend.event_processing import event_accumulator
 from tensorflow.tensorboard.backend.event_processing import io_wrapper
 
+RunReloadStats = collections.namedtuple(
+    'RunReloadStats',
+    ['last_duration_secs', 'total_duration_secs', 'num_reloads',
+     'num_skipped'])
 
 class EventMultiplexer(object):
   """An `EventMultiplexer` manages access to multiple `EventAccumulator`s.
@@ -65,13 +74,24 @@ class EventMultiplexer(object):
   If you would like to watch `/parent/directory/path`, wait for it to be created
     (if necessary) and then periodically pick up new runs, use
     `AutoloadingMultiplexer`
+
+  By default `Reload` reloads the runs one after another on the calling
+  thread. With `max_reload_threads > 1` the runs are reloaded by a pool of
+  worker threads instead, and `reload_timeout_secs` bounds how long a single
+  `Reload` call waits for slow runs. A run that is still loading when the
+  timeout expires keeps loading in the background and is skipped by later
+  `Reload` calls until it finishes.
   @@Tensors
   """
 
   def __init__(self,
                run_path_map=None,
                size_guidance=event_accumulator.DEFAULT_SIZE_GUIDANCE,
-               purge_orphaned_data=True):
+               purge_orphaned_data=True,
+               max_reload_threads=1,
+               reload_timeout_secs=None,
+               cache_dir=None,
+               compact_tag_types=event_accumulator.DEFAULT_COMPACT_TAG_TYPES):
     """Constructor for the `EventMultiplexer`.
 
     Args:
@@ -83,14 +103,46 @@ class EventMultiplexer(object):
         `event_accumulator.EventAccumulator` for details.
       purge_orphaned_data: Whether to discard any events that were "orphaned" by
         a TensorFlow restart.
+      max_reload_threads: The maximum number of threads used to reload runs
+        concurrently. A value of 1 reloads runs serially on the calling thread.
+      reload_timeout_secs: If not None, the maximum number of seconds a call to
+        `Reload` waits for runs to finish reloading. Runs that are still
+        reloading continue in the background.
+      cache_dir: If not None, a directory in which each `EventAccumulator`
+        persists snapshots of its state, so that restarts only need to load
+        the events written since the last snapshot.
+      compact_tag_types: The `tagType`s whose events each `EventAccumulator`
+        stores in memory-compact typed arrays. See
+        `event_accumulator.EventAccumulator` for details.
+
+    Raises:
+      ValueError: If `max_reload_threads` is less than 1, or if
+        `reload_timeout_secs` is not positive.
     """
+    if max_reload_threads < 1:
+      raise ValueError('max_reload_threads must be at least 1, got %d' %
+                       max_reload_threads)
+    if reload_timeout_secs is not None and reload_timeout_secs <= 0:
+      raise ValueError('reload_timeout_secs must be positive, got %s' %
+                       reload_timeout_secs)
     logging.info('Event Multiplexer initializing.')
     self._accumulators_mutex = threading.Lock()
     self._accumulators = {}
+    # Names of runs whose accumulator is currently being reloaded, and timing
+    # statistics of finished reloads. Both are guarded by _accumulators_mutex.
+    self._reloading_runs = set()
+    self._reload_stats = {}
+    self._max_reload_threads = max_reload_threads
+    self._reload_timeout_secs = reload_timeout_secs
+    # Maps each directory passed to AddRunsFromDirectory to the
+    # DirectoryIndex that caches its listing between calls.
+    self._directory_indexes = {}
     self._paths = {}
     self._reload_called = False
     self._size_guidance = size_guidance
     self.purge_orphaned_data = purge_orphaned_data
+    self._cache_dir = cache_dir
+    self._compact_tag_types = compact_tag_types
     if run_path_map is not None:
       logging.info('Event Multplexer doing initialization load for %s',
                    run_path_map)
@@ -131,7 +183,9 @@ class EventMultiplexer(object):
         accumulator = event_accumulator.EventAccumulator(
             path,
             size_guidance=self._size_guidance,
-            purge_orphaned_data=self.purge_orphaned_data)
+            purge_orphaned_data=self.purge_orphaned_data,
+            cache_dir=self._cache_dir,
+            compact_tag_types=self._compact_tag_types)
         self._accumulators[name] = accumulator
         self._paths[name] = path
     if accumulator:
@@ -152,6 +206,10 @@ class EventMultiplexer(object):
 
     If the `EventMultiplexer` is already loaded this will cause
     the newly created accumulators to `Reload()`.
+
+    The listing of the directory tree is cached between calls, so calling this
+    repeatedly for the same path only lists the subdirectories that changed.
+
     Args:
       path: A string path to a directory to load runs from.
       name: Optionally, what name to apply to the runs. If name is provided
@@ -167,38 +225,145 @@ class EventMultiplexer(object):
       The `EventMultiplexer`.
     """
     logging.info('Starting AddRunsFromDirectory: %s', path)
-    for subdir in GetLogdirSubdirectories(path):
+    if gfile.Exists(path) and not gfile.IsDirectory(path):
+      raise ValueError('AddRunsFromDirectory: path exists and is not a '
+                       'directory, %s' % path)
+    index = self._directory_indexes.get(path)
+    if index is None:
+      index = directory_index.DirectoryIndex(
+          path, event_accumulator.IsTensorFlowEventsFile)
+      self._directory_indexes[path] = index
+    for subdir in index.Update():
       logging.info('Adding events from directory %s', subdir)
       rpath = os.path.relpath(subdir, path)
       subname = os.path.join(name, rpath) if name else rpath
       self.AddRun(subdir, name=subname)
-    logging.info('Done with AddRunsFromDirectory: %s', path)
+    stats = index.last_update_stats
+    logging.info('Done with AddRunsFromDirectory: %s (listed %d directories, '
+                 'reused %d cached listings in %0.3f secs)', path,
+                 stats.num_listed, stats.num_cached, stats.duration_secs)
     return self
 
+  def DiscoveryStats(self):
+    """Returns statistics about the last scan of each logdir.
+
+    Returns:
+      A dict mapping each path passed to `AddRunsFromDirectory` to the
+      `directory_index.UpdateStats` of its most recent scan.
+    """
+    return {path: index.last_update_stats
+            for path, index in six.iteritems(self._directory_indexes)}
+
   def Reload(self):
-    """Call `Reload` on every `EventAccumulator`."""
+    """Call `Reload` on every `EventAccumulator`.
+
+    Runs whose accumulator is still being reloaded by an earlier call (because
+    that call timed out) are skipped.
+
+    Returns:
+      The `EventMultiplexer`.
+    """
     logging.info('Beginning EventMultiplexer.Reload()')
+    start = time.time()
     self._reload_called = True
     # Build a list so we're safe even if the list of accumulators is modified
     # even while we're reloading.
     with self._accumulators_mutex:
       items = list(self._accumulators.items())
+    items_queue = queue.Queue()
+    for item in items:
+      items_queue.put(item)
+
+    # Once set, workers stop picking up new runs. Runs that are already
+    # reloading are not interrupted.
+    cycle_abandoned = threading.Event()
+
+    def Worker():
+      """Keeps reloading accumulators until none are left."""
+      while not cycle_abandoned.is_set():
+        try:
+          name, accumulator = items_queue.get(block=False)
+        except queue.Empty:
+          break
+        self._ReloadAccumulator(name, accumulator)
+
+    if self._max_reload_threads > 1 or self._reload_timeout_secs is not None:
+      num_threads = max(1, min(self._max_reload_threads, len(items)))
+      logging.info('Starting %d threads to reload runs', num_threads)
+      threads = []
+      for i in xrange(num_threads):
+        thread = threading.Thread(target=Worker, name='Reloader %d' % i)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+      for thread in threads:
+        if self._reload_timeout_secs is None:
+          thread.join()
+        else:
+          thread.join(max(0, start + self._reload_timeout_secs - time.time()))
+      if any(thread.is_alive() for thread in threads):
+        cycle_abandoned.set()
+        with self._accumulators_mutex:
+          slow_runs = sorted(self._reloading_runs)
+        logging.warning('EventMultiplexer.Reload() timed out after %0.3f secs; '
+                        'runs still reloading in the background: %s',
+                        self._reload_timeout_secs, slow_runs)
+    else:
+      Worker()
+
+    logging.info('Finished with EventMultiplexer.Reload() in %0.3f secs',
+                 time.time() - start)
+    return self
 
-    names_to_delete = set()
-    for name, accumulator in items:
-      try:
-        accumulator.Reload()
-      except (OSError, IOError) as e:
-        logging.error("Unable to reload accumulator '%s': %s", name, e)
-      except directory_watcher.DirectoryDeletedError:
-        names_to_delete.add(name)
+  def _ReloadAccumulator(self, name, accumulator):
+    """Reloads a single accumulator and records how long it took.
 
+    Args:
+      name: The name of the run.
+      accumulator: The `EventAccumulator` for the run.
+    """
     with self._accumulators_mutex:
-      for name in names_to_delete:
-        logging.warning("Deleting accumulator '%s'", name)
-        del self._accumulators[name]
-    logging.info('Finished with EventMultiplexer.Reload()')
-    return self
+      if name in self._reloading_runs:
+        logging.info("Skipping run '%s'; it is still reloading", name)
+        # The run may not have finished its first reload yet.
+        stats = self._reload_stats.get(name, RunReloadStats(0.0, 0.0, 0, 0))
+        self._reload_stats[name] = stats._replace(
+            num_skipped=stats.num_skipped + 1)
+        return
+      self._reloading_runs.add(name)
+
+    start = time.time()
+    deleted = False
+    try:
+      accumulator.Reload()
+    except (OSError, IOError) as e:
+      logging.error("Unable to reload accumulator '%s': %s", name, e)
+    except directory_watcher.DirectoryDeletedError:
+      deleted = True
+    finally:
+      duration = time.time() - start
+      with self._accumulators_mutex:
+        self._reloading_runs.discard(name)
+        stats = self._reload_stats.get(name, RunReloadStats(0.0, 0.0, 0, 0))
+        self._reload_stats[name] = stats._replace(
+            last_duration_secs=duration,
+            total_duration_secs=stats.total_duration_secs + duration,
+            num_reloads=stats.num_reloads + 1)
+        # The run may have been replaced by a new accumulator in the meantime.
+        if deleted and self._accumulators.get(name) is accumulator:
+          logging.warning("Deleting accumulator '%s'", name)
+          del self._accumulators[name]
+          del self._reload_stats[name]
+
+  def ReloadStats(self):
+    """Returns timing statistics about the reloads of each run.
+
+    Returns:
+      A dict mapping run names to `RunReloadStats`. `num_skipped` counts the
+      `Reload` calls that skipped the run because it was still reloading.
+    """
+    with self._accumulators_mutex:
+      return dict(self._reload_stats)
 
   def PluginAssets(self, plugin_name):
     """Get index of runs and assets for a given plugin.
@@ -253,6 +418,24 @@ class EventMultiplexer(object):
     accumulator = self._GetAccumulator(run)
     return accumulator.FirstEventTimestamp()
 
+  def Generation(self, run):
+    """Returns the generation of the data of a run.
+
+    The generation changes whenever new data is loaded for the run, so it can
+    be used to invalidate caches of data derived from the run.
+
+    Args:
+      run: A string name of the run.
+
+    Raises:
+      KeyError: If the run is not found.
+
+    Returns:
+      An integer generation. See `EventAccumulator.Generation`.
+    """
+    accumulator = self._GetAccumulator(run)
+    return accumulator.Generation()
+
   def Scalars(self, run, tag):
     """Retrieve the scalar events associated with a run and tag.
 
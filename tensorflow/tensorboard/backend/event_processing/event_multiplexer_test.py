@@ -21,6 +21,8 @@ import functools
 import os
 import os.path
 import shutil
+import threading
+import time
 
 from tensorflow.python.framework import test_util
 from tensorflow.python.platform import gfile
@@ -103,12 +105,30 @@ class _FakeAccumulator(object):
     self.reload_called = True
 
 
+class _BlockingFakeAccumulator(_FakeAccumulator):
+  """A fake accumulator whose `Reload` blocks until `release` is set."""
+
+  def __init__(self, path, release):
+    super(_BlockingFakeAccumulator, self).__init__(path)
+    self._release = release
+    self.reload_count = 0
+
+  def Reload(self):
+    self._release.wait()
+    self.reload_count += 1
+    self.reload_called = True
+
+
 def _GetFakeAccumulator(path,
                         size_guidance=None,
                         compression_bps=None,
                         purge_orphaned_data=None,
+                        cache_dir=None,
+                        compact_tag_types=None,
                         health_pill_mapping=None):
-  del size_guidance, compression_bps, purge_orphaned_data  # Unused.
+  # Unused.
+  del size_guidance, compression_bps, purge_orphaned_data, cache_dir
+  del compact_tag_types
   return _FakeAccumulator(path, health_pill_mapping=health_pill_mapping)
 
 
@@ -144,6 +164,59 @@ class EventMultiplexerTest(test_util.TensorFlowTestCase):
     self.assertTrue(x._GetAccumulator('run1').reload_called)
     self.assertTrue(x._GetAccumulator('run2').reload_called)
 
+  def testReloadWithMultipleThreads(self):
+    """EventAccumulators should all Reload when using a worker pool."""
+    runs = {'run%d' % i: 'path%d' % i for i in range(10)}
+    x = event_multiplexer.EventMultiplexer(runs, max_reload_threads=4)
+    x.Reload()
+    for run in runs:
+      self.assertTrue(x._GetAccumulator(run).reload_called)
+
+  def testReloadRejectsInvalidOptions(self):
+    with self.assertRaises(ValueError):
+      event_multiplexer.EventMultiplexer(max_reload_threads=0)
+    with self.assertRaises(ValueError):
+      event_multiplexer.EventMultiplexer(reload_timeout_secs=0)
+
+  def testReloadStats(self):
+    x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'})
+    self.assertEqual(x.ReloadStats(), {})
+    x.Reload()
+    x.Reload()
+    stats = x.ReloadStats()
+    self.assertItemsEqual(stats.keys(), ['run1', 'run2'])
+    self.assertEqual(stats['run1'].num_reloads, 2)
+    self.assertEqual(stats['run1'].num_skipped, 0)
+    self.assertGreaterEqual(stats['run1'].total_duration_secs,
+                            stats['run1'].last_duration_secs)
+
+  def testReloadTimeoutDoesNotWaitForSlowRun(self):
+    release = threading.Event()
+    x = event_multiplexer.EventMultiplexer(
+        {'fast': 'path1'}, max_reload_threads=2, reload_timeout_secs=0.1)
+    slow = _BlockingFakeAccumulator('path2', release)
+    x._accumulators['slow'] = slow
+    x._paths['slow'] = 'path2'
+
+    x.Reload()
+    self.assertTrue(x._GetAccumulator('fast').reload_called)
+    self.assertFalse(slow.reload_called)
+
+    # The slow run is still reloading, so the next cycle skips it.
+    x.Reload()
+    self.assertEqual(x.ReloadStats()['fast'].num_reloads, 2)
+    # The skip is counted even though the run never finished a reload.
+    self.assertEqual(x.ReloadStats()['slow'].num_skipped, 1)
+    self.assertEqual(x.ReloadStats()['slow'].num_reloads, 0)
+
+    release.set()
+    while x.ReloadStats()['slow'].num_reloads < 1:
+      time.sleep(0.01)
+    x.Reload()
+    self.assertEqual(slow.reload_count, 2)
+    self.assertEqual(x.ReloadStats()['slow'].num_reloads, 2)
+    self.assertEqual(x.ReloadStats()['slow'].num_skipped, 1)
+
   def testScalars(self):
     """Tests Scalars function returns suitable values."""
     x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'})
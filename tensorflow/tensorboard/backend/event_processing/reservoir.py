@@ -19,10 +19,21 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import array
 import collections
 import random
 import threading
 
+from six.moves import zip  # pylint: disable=redefined-builtin
+
+FLOAT64_TYPECODE = 'd'
+try:
+  array.array('q')
+  INT64_TYPECODE = 'q'
+except ValueError:
+  # Python 2 has no 'q' typecode; 'l' is 64 bits wide on LP64 platforms.
+  INT64_TYPECODE = 'l'
+
 
 class Reservoir(object):
   """A map-to-arrays container, with deterministic Reservoir Sampling.
@@ -55,7 +66,7 @@ class Reservoir(object):
 
   """
 
-  def __init__(self, size, seed=0, always_keep_last=True):
+  def __init__(self, size, seed=0, always_keep_last=True, items_factory=list):
     """Creates a new reservoir.
 
     Args:
@@ -66,6 +77,9 @@ class Reservoir(object):
         input items.
       always_keep_last: Whether to always keep the latest seen item in the
         end of the reservoir. Defaults to True.
+      items_factory: A callable that takes an optional iterable of items and
+        returns the list-like container each bucket stores its items in, e.g.
+        `list` or a `functools.partial` of `ColumnarItems`.
 
     Raises:
       ValueError: If size is negative or not an integer.
@@ -73,7 +87,8 @@ class Reservoir(object):
     if size < 0 or size != round(size):
       raise ValueError('size must be nonegative integer, was %s' % size)
     self._buckets = collections.defaultdict(
-        lambda: _ReservoirBucket(size, random.Random(seed), always_keep_last))
+        lambda: _ReservoirBucket(size, random.Random(seed), always_keep_last,
+                                 items_factory))
     # _mutex guards the keys - creating new keys, retrieving by key, etc
     # the internal items are guarded by the ReservoirBuckets' internal mutexes
     self._mutex = threading.Lock()
@@ -131,6 +146,28 @@ class Reservoir(object):
       bucket = self._buckets[key]
     bucket.AddItem(item, f)
 
+  def GetState(self):
+    """Returns a snapshot of the contents of the reservoir.
+
+    Returns:
+      A dict mapping each key to the state of its bucket, suitable for passing
+      to `RestoreState`.
+    """
+    with self._mutex:
+      buckets = list(self._buckets.items())
+    return {key: bucket.GetState() for key, bucket in buckets}
+
+  def RestoreState(self, state):
+    """Replaces the contents of the reservoir with a snapshot.
+
+    Args:
+      state: A dict returned by `GetState`.
+    """
+    with self._mutex:
+      self._buckets.clear()
+      for key, bucket_state in state.items():
+        self._buckets[key].RestoreState(bucket_state)
+
   def FilterItems(self, filterFn, key=None):
     """Filter items within a Reservoir, using a filtering function.
 
@@ -159,7 +196,8 @@ class _ReservoirBucket(object):
   It always stores the most recent item as its final item.
   """
 
-  def __init__(self, _max_size, _random=None, always_keep_last=True):
+  def __init__(self, _max_size, _random=None, always_keep_last=True,
+               items_factory=list):
     """Create the _ReservoirBucket.
 
     Args:
@@ -169,13 +207,16 @@ class _ReservoirBucket(object):
         random.Random(0).
       always_keep_last: Whether the latest seen item should always be included
         in the end of the bucket.
+      items_factory: A callable returning the list-like container to store the
+        items in, given an optional iterable of initial items.
 
     Raises:
       ValueError: if the size is not a nonnegative integer.
     """
     if _max_size < 0 or _max_size != round(_max_size):
       raise ValueError('_max_size must be nonegative int, was %s' % _max_size)
-    self.items = []
+    self._items_factory = items_factory
+    self.items = items_factory()
     # This mutex protects the internal items, ensuring that calls to Items and
     # AddItem are thread-safe
     self._mutex = threading.Lock()
@@ -238,7 +279,7 @@ class _ReservoirBucket(object):
     """
     with self._mutex:
       size_before = len(self.items)
-      self.items = list(filter(filterFn, self.items))
+      self.items = self._items_factory(filter(filterFn, self.items))
       size_diff = size_before - len(self.items)
 
       # Estimate a correction the number of items seen
@@ -251,3 +292,70 @@ class _ReservoirBucket(object):
     """Get all the items in the bucket."""
     with self._mutex:
       return list(self.items)
+
+  def GetState(self):
+    """Returns a snapshot of the bucket, including its sampler."""
+    with self._mutex:
+      return (list(self.items), self._num_items_seen, self._random.getstate())
+
+  def RestoreState(self, state):
+    """Replaces the contents of the bucket with a snapshot from `GetState`."""
+    items, num_items_seen, random_state = state
+    with self._mutex:
+      self.items = self._items_factory(items)
+      self._num_items_seen = num_items_seen
+      self._random.setstate(random_state)
+
+
+class ColumnarItems(object):
+  """A list-like container that stores namedtuples column by column.
+
+  Each field of the namedtuples is kept in its own typed `array.array`, which
+  takes a few bytes per value instead of a separate Python object per value and
+  per tuple. Items are converted back to namedtuples when they are read.
+
+  Only the list operations used by `_ReservoirBucket` are supported.
+  """
+
+  def __init__(self, item_type, typecodes, items=()):
+    """Creates a new ColumnarItems.
+
+    Args:
+      item_type: The namedtuple class of the items.
+      typecodes: A sequence with the `array` typecode of each field of
+        `item_type`.
+      items: An optional iterable of initial items.
+
+    Raises:
+      ValueError: If the number of typecodes does not match the number of
+        fields of `item_type`.
+    """
+    if len(typecodes) != len(item_type._fields):
+      raise ValueError('Expected %d typecodes for %s, got %d' %
+                       (len(item_type._fields), item_type.__name__,
+                        len(typecodes)))
+    self._item_type = item_type
+    self._columns = tuple(array.array(typecode) for typecode in typecodes)
+    for item in items:
+      self.append(item)
+
+  def __len__(self):
+    return len(self._columns[0])
+
+  def __iter__(self):
+    make = self._item_type._make
+    return (make(row) for row in zip(*self._columns))
+
+  def __getitem__(self, index):
+    return self._item_type._make(column[index] for column in self._columns)
+
+  def __setitem__(self, index, item):
+    for column, value in zip(self._columns, item):
+      column[index] = value
+
+  def append(self, item):
+    for column, value in zip(self._columns, item):
+      column.append(value)
+
+  def pop(self, index=-1):
+    return self._item_type._make(column.pop(index) for column in self._columns)
@@ -17,11 +17,26 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import functools
+import sys
+
+from six.moves import cPickle as pickle
 from six.moves import xrange  # pylint: disable=redefined-builtin
 
 from tensorflow.python.platform import test
 from tensorflow.tensorboard.backend.event_processing import reservoir
 
+_Point = collections.namedtuple('_Point', ['wall_time', 'step', 'value'])
+_POINT_TYPECODES = (reservoir.FLOAT64_TYPECODE, reservoir.INT64_TYPECODE,
+                    reservoir.FLOAT64_TYPECODE)
+_ColumnarPoints = functools.partial(reservoir.ColumnarItems, _Point,
+                                    _POINT_TYPECODES)
+
+
+def _MakePoint(i):
+  return _Point(wall_time=1.5e9 + i, step=i, value=i / 7.0)
+
 
 class ReservoirTest(test.TestCase):
 
@@ -109,6 +124,24 @@ class ReservoirTest(test.TestCase):
     self.assertEqual(len(r.Items('key1')), 4)
     self.assertEqual(len(r.Items('key2')), 8)
 
+  def testRestoreStateContinuesSampling(self):
+    """Tests that a restored reservoir samples like the original one."""
+    original = reservoir.Reservoir(10)
+    for i in xrange(100):
+      original.AddItem('key1', i)
+      original.AddItem('key2', i)
+
+    restored = reservoir.Reservoir(10)
+    restored.AddItem('stale', 0)
+    restored.RestoreState(pickle.loads(pickle.dumps(original.GetState())))
+    self.assertItemsEqual(restored.Keys(), ['key1', 'key2'])
+
+    for i in xrange(100, 200):
+      original.AddItem('key1', i)
+      restored.AddItem('key1', i)
+    self.assertEqual(original.Items('key1'), restored.Items('key1'))
+    self.assertEqual(original.Items('key2'), restored.Items('key2'))
+
 
 class ReservoirBucketTest(test.TestCase):
 
@@ -275,5 +308,96 @@ class ReservoirBucketStatisticalDistributionTest(test.TestCase):
       self.AssertBinomialQuantity(modbin)
 
 
+class ColumnarItemsTest(test.TestCase):
+
+  def testListOperations(self):
+    items = _ColumnarPoints()
+    self.assertEqual(len(items), 0)
+    for i in xrange(5):
+      items.append(_MakePoint(i))
+    self.assertEqual(len(items), 5)
+    self.assertEqual(items[1], _MakePoint(1))
+    self.assertEqual(items.pop(1), _MakePoint(1))
+    items[-1] = _MakePoint(10)
+    self.assertEqual(list(items),
+                     [_MakePoint(0), _MakePoint(2), _MakePoint(3),
+                      _MakePoint(10)])
+    self.assertIsInstance(items[0].step, int)
+
+  def testConstructFromIterable(self):
+    points = [_MakePoint(i) for i in xrange(3)]
+    self.assertEqual(list(_ColumnarPoints(iter(points))), points)
+
+  def testRejectsWrongNumberOfTypecodes(self):
+    with self.assertRaises(ValueError):
+      reservoir.ColumnarItems(_Point, ('d', 'd'))
+
+  def testSamplesLikeListReservoir(self):
+    for always_keep_last in (True, False):
+      list_reservoir = reservoir.Reservoir(
+          10, always_keep_last=always_keep_last)
+      columnar_reservoir = reservoir.Reservoir(
+          10, always_keep_last=always_keep_last,
+          items_factory=_ColumnarPoints)
+      for i in xrange(1000):
+        list_reservoir.AddItem('key', _MakePoint(i))
+        columnar_reservoir.AddItem('key', _MakePoint(i))
+      self.assertEqual(list_reservoir.Items('key'),
+                       columnar_reservoir.Items('key'))
+
+      not_expired = lambda x: x.step < 500
+      self.assertEqual(list_reservoir.FilterItems(not_expired),
+                       columnar_reservoir.FilterItems(not_expired))
+      for i in xrange(1000, 1100):
+        list_reservoir.AddItem('key', _MakePoint(i))
+        columnar_reservoir.AddItem('key', _MakePoint(i))
+      self.assertEqual(list_reservoir.Items('key'),
+                       columnar_reservoir.Items('key'))
+
+  def testStateIsInterchangeableWithListReservoir(self):
+    columnar_reservoir = reservoir.Reservoir(10, items_factory=_ColumnarPoints)
+    for i in xrange(100):
+      columnar_reservoir.AddItem('key', _MakePoint(i))
+    list_reservoir = reservoir.Reservoir(10)
+    list_reservoir.RestoreState(columnar_reservoir.GetState())
+    self.assertEqual(list_reservoir.Items('key'),
+                     columnar_reservoir.Items('key'))
+
+
+def _DeepSizeOf(obj):
+  """Returns the approximate number of bytes used by a container of scalars."""
+  size = sys.getsizeof(obj)
+  if isinstance(obj, reservoir.ColumnarItems):
+    return size + sum(_DeepSizeOf(column) for column in obj._columns)
+  if isinstance(obj, (list, tuple)):
+    return size + sum(_DeepSizeOf(item) for item in obj)
+  return size
+
+
+class ReservoirMemoryBenchmark(test.Benchmark):
+  """Compares the memory used by list and columnar scalar buckets."""
+
+  def _ReportBucketSize(self, name, items_factory, num_items):
+    bucket = reservoir._ReservoirBucket(num_items, items_factory=items_factory)
+    for i in xrange(num_items):
+      bucket.AddItem(_MakePoint(i))
+    num_bytes = _DeepSizeOf(bucket.items)
+    self.report_benchmark(
+        name=name,
+        iters=num_items,
+        extras={'bytes': num_bytes,
+                'bytes_per_item': float(num_bytes) / num_items})
+    return num_bytes
+
+  def benchmarkScalarBucketMemory(self):
+    num_items = 10000
+    list_bytes = self._ReportBucketSize('list_scalar_bucket', list, num_items)
+    columnar_bytes = self._ReportBucketSize('columnar_scalar_bucket',
+                                            _ColumnarPoints, num_items)
+    print('%d scalar points: %d bytes as namedtuples, %d bytes as typed '
+          'arrays (%.1fx smaller)' % (num_items, list_bytes, columnar_bytes,
+                                      float(list_bytes) / columnar_bytes))
+
+
 if __name__ == '__main__':
   test.main()
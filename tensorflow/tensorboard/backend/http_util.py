@@ -19,9 +19,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import gzip
+import hashlib
 import json
 import re
+import threading
 import time
 import wsgiref.handlers
 
@@ -60,13 +63,24 @@ _JSON_MIMETYPES = set([
 ])
 
 
+CachedResponse = collections.namedtuple(
+    'CachedResponse', ['content', 'content_type', 'content_encoding', 'etag'])
+
+
+def AcceptsGzip(request):
+  """Returns whether the client accepts gzip-encoded responses."""
+  return bool(
+      _ALLOWS_GZIP_PATTERN.search(request.headers.get('Accept-Encoding', '')))
+
+
 def Respond(request,
             content,
             content_type,
             code=200,
             expires=0,
             content_encoding=None,
-            encoding='utf-8'):
+            encoding='utf-8',
+            etag=None):
   """Construct a werkzeug Response.
 
   Responses are transmitted to the browser with compression if: a) the browser
@@ -93,6 +107,10 @@ def Respond(request,
   content_type parameter explicitly defines a charset parameter, in which case
   the serialized JSON bytes will use that instead of escape sequences.
 
+  If an etag is given, it is sent in the ETag header, and a request whose
+  If-None-Match header matches it gets an empty 304 response instead, so that
+  polling clients do not download data they already have.
+
   Args:
     request: A werkzeug Request object. Used mostly to check the
       Accept-Encoding header.
@@ -102,11 +120,16 @@ def Respond(request,
     expires: Second duration for browser caching.
     content_encoding: Encoding if content is already encoded, e.g. 'gzip'.
     encoding: Input charset if content parameter has byte strings.
+    etag: Entity tag identifying the content, without quotes.
 
   Returns:
     A werkzeug Response object (a WSGI application).
   """
 
+  if etag is not None and request.if_none_match.contains(etag):
+    headers = [('ETag', '"%s"' % etag)] + _CachingHeaders(expires)
+    return wrappers.Response(status=304, headers=headers)
+
   mimetype = _EXTRACT_MIMETYPE_PATTERN.search(content_type).group(0)
   charset_match = _EXTRACT_CHARSET_PATTERN.search(content_type)
   charset = charset_match.group(1) if charset_match else encoding
@@ -122,10 +145,10 @@ def Respond(request,
   content = compat.as_bytes(content, charset)
   if textual and not charset_match and mimetype not in _JSON_MIMETYPES:
     content_type += '; charset=' + charset
-  if (not content_encoding and textual and
-      _ALLOWS_GZIP_PATTERN.search(request.headers.get('Accept-Encoding', ''))):
+  if not content_encoding and textual and AcceptsGzip(request):
     out = six.BytesIO()
-    f = gzip.GzipFile(fileobj=out, mode='wb', compresslevel=3)
+    # A fixed mtime keeps the compressed bytes, and so their ETag, stable.
+    f = gzip.GzipFile(fileobj=out, mode='wb', compresslevel=3, mtime=0)
     f.write(content)
     f.close()
     content = out.getvalue()
@@ -137,13 +160,108 @@ def Respond(request,
   headers.append(('Content-Length', str(len(content))))
   if content_encoding:
     headers.append(('Content-Encoding', content_encoding))
+  if etag is not None:
+    headers.append(('ETag', '"%s"' % etag))
+  headers.extend(_CachingHeaders(expires))
+
+  return wrappers.Response(
+      response=content, status=code, headers=headers, content_type=content_type)
+
+
+def _CachingHeaders(expires):
+  """Returns the headers controlling browser caching for Respond."""
   if expires > 0:
     e = wsgiref.handlers.format_date_time(time.time() + float(expires))
-    headers.append(('Expires', e))
-    headers.append(('Cache-Control', 'private, max-age=%d' % expires))
+    return [('Expires', e), ('Cache-Control', 'private, max-age=%d' % expires)]
   else:
-    headers.append(('Expires', '0'))
-    headers.append(('Cache-Control', 'no-cache, must-revalidate'))
+    return [('Expires', '0'), ('Cache-Control', 'no-cache, must-revalidate')]
 
-  return wrappers.Response(
-      response=content, status=code, headers=headers, content_type=content_type)
+
+class ResponseCache(object):
+  """A thread-safe LRU cache of encoded responses, bounded by total size.
+
+  Every entry is stored along with a generation, an opaque value describing
+  the state of the data the response was computed from. Looking an entry up
+  with a different generation evicts it, so entries are invalidated as soon as
+  their underlying data changes.
+  """
+
+  def __init__(self, max_bytes):
+    """Constructs a ResponseCache.
+
+    Args:
+      max_bytes: The maximum total size of the cached contents. Responses
+        larger than this are not cached.
+    """
+    self._max_bytes = max_bytes
+    self._num_bytes = 0
+    # Maps a key to a (generation, CachedResponse) pair, least recently used
+    # first.
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def Get(self, key, generation):
+    """Returns the cached response for key, or None if it is missing or stale.
+
+    Args:
+      key: A hashable key identifying the request.
+      generation: The current generation of the data behind the response.
+
+    Returns:
+      A `CachedResponse`, or None.
+    """
+    with self._lock:
+      entry = self._entries.pop(key, None)
+      if entry is None:
+        return None
+      if entry[0] != generation:
+        self._num_bytes -= len(entry[1].content)
+        return None
+      self._entries[key] = entry
+      return entry[1]
+
+  def Put(self, key, generation, response):
+    """Caches the body of a werkzeug Response.
+
+    Args:
+      key: A hashable key identifying the request.
+      generation: The generation of the data the response was computed from.
+      response: A werkzeug Response with status 200.
+
+    Returns:
+      The `CachedResponse` for the response, which is returned even if the
+      response was too large to be cached.
+    """
+    content = response.get_data()
+    cached = CachedResponse(
+        content=content,
+        content_type=response.headers.get('Content-Type'),
+        content_encoding=response.headers.get('Content-Encoding'),
+        etag=hashlib.sha1(content).hexdigest())
+    if len(content) > self._max_bytes:
+      return cached
+    with self._lock:
+      old = self._entries.pop(key, None)
+      if old is not None:
+        self._num_bytes -= len(old[1].content)
+      self._entries[key] = (generation, cached)
+      self._num_bytes += len(content)
+      while self._num_bytes > self._max_bytes:
+        _, (_, evicted) = self._entries.popitem(last=False)
+        self._num_bytes -= len(evicted.content)
+    return cached
+
+
+def RespondCached(request, cached):
+  """Constructs a werkzeug Response from a `CachedResponse`.
+
+  Args:
+    request: A werkzeug Request object.
+    cached: A `CachedResponse`.
+
+  Returns:
+    A werkzeug Response object, which has status 304 if the client already has
+    the cached content.
+  """
+  return Respond(request, cached.content, cached.content_type,
+                 content_encoding=cached.content_encoding, etag=cached.etag)
@@ -147,6 +147,82 @@ class RespondTest(test.TestCase):
     r = http_util.Respond(q, '<b>hello world</b>', 'text/html', expires=60)
     self.assertEqual(r.headers.get('Cache-Control'), 'private, max-age=60')
 
+  def testEtag_isSentAsHeader(self):
+    q = wrappers.Request(wtest.EnvironBuilder().get_environ())
+    r = http_util.Respond(q, 'hello', 'text/plain', etag='abc')
+    self.assertEqual(r.status_code, 200)
+    self.assertEqual(r.headers.get('ETag'), '"abc"')
+
+  def testMatchingIfNoneMatch_respondsNotModified(self):
+    e = wtest.EnvironBuilder(headers={'If-None-Match': '"abc"'}).get_environ()
+    r = http_util.Respond(
+        wrappers.Request(e), 'hello', 'text/plain', etag='abc')
+    self.assertEqual(r.status_code, 304)
+    self.assertEqual(r.get_data(), b'')
+    self.assertEqual(r.headers.get('ETag'), '"abc"')
+
+    e = wtest.EnvironBuilder(headers={'If-None-Match': '"xyz"'}).get_environ()
+    r = http_util.Respond(
+        wrappers.Request(e), 'hello', 'text/plain', etag='abc')
+    self.assertEqual(r.status_code, 200)
+
+  def testGzip_isDeterministic(self):
+    e = wtest.EnvironBuilder(headers={'Accept-Encoding': 'gzip'}).get_environ()
+    q = wrappers.Request(e)
+    r1 = http_util.Respond(q, 'hello', 'text/plain')
+    r2 = http_util.Respond(q, 'hello', 'text/plain')
+    self.assertEqual(r1.response[0], r2.response[0])
+
+
+class ResponseCacheTest(test.TestCase):
+
+  def _Response(self, content):
+    q = wrappers.Request(wtest.EnvironBuilder().get_environ())
+    return http_util.Respond(q, content, 'text/plain')
+
+  def testGetReturnsPutResponse(self):
+    cache = http_util.ResponseCache(100)
+    self.assertIsNone(cache.Get('key', 1))
+    put = cache.Put('key', 1, self._Response('hello'))
+    self.assertEqual(cache.Get('key', 1), put)
+    self.assertEqual(put.content, b'hello')
+    self.assertEqual(put.content_type, 'text/plain; charset=utf-8')
+
+  def testDifferentGenerationIsAMiss(self):
+    cache = http_util.ResponseCache(100)
+    cache.Put('key', 1, self._Response('hello'))
+    self.assertIsNone(cache.Get('key', 2))
+    # The stale entry is evicted.
+    self.assertIsNone(cache.Get('key', 1))
+
+  def testEvictsLeastRecentlyUsed(self):
+    cache = http_util.ResponseCache(10)
+    cache.Put('a', 1, self._Response('aaaa'))
+    cache.Put('b', 1, self._Response('bbbb'))
+    cache.Get('a', 1)
+    cache.Put('c', 1, self._Response('cccc'))
+    self.assertIsNotNone(cache.Get('a', 1))
+    self.assertIsNone(cache.Get('b', 1))
+    self.assertIsNotNone(cache.Get('c', 1))
+
+  def testOversizedResponsesAreNotCached(self):
+    cache = http_util.ResponseCache(3)
+    put = cache.Put('key', 1, self._Response('hello'))
+    self.assertEqual(put.content, b'hello')
+    self.assertIsNone(cache.Get('key', 1))
+
+  def testRespondCached_honorsIfNoneMatch(self):
+    cache = http_util.ResponseCache(100)
+    put = cache.Put('key', 1, self._Response('hello'))
+    q = wrappers.Request(wtest.EnvironBuilder().get_environ())
+    r = http_util.RespondCached(q, put)
+    self.assertEqual(r.get_data(), b'hello')
+    self.assertEqual(r.headers.get('Content-Type'), 'text/plain; charset=utf-8')
+    e = wtest.EnvironBuilder(
+        headers={'If-None-Match': '"%s"' % put.etag}).get_environ()
+    r = http_util.RespondCached(wrappers.Request(e), put)
+    self.assertEqual(r.status_code, 304)
+
 
 def _gunzip(bs):
   return gzip.GzipFile('', 'rb', 9, six.BytesIO(bs)).read()
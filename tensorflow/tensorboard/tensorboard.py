@@ -63,6 +63,20 @@ flags.DEFINE_boolean('purge_orphaned_data', True, 'Whether to purge data that '
 flags.DEFINE_integer('reload_interval', 5, 'How often the backend should load '
                      'more data.')
 
+flags.DEFINE_integer('max_reload_threads', 1, 'The maximum number of threads '
+                     'that TensorBoard can use to reload runs. Each thread '
+                     'reloads one run at a time.')
+
+flags.DEFINE_float('reload_timeout', 0, 'If positive, the maximum number of '
+                   'seconds a reload cycle waits for slow runs. Runs that are '
+                   'still loading when it expires keep loading in the '
+                   'background.')
+
+flags.DEFINE_string('cache_dir', '', 'If set, a directory in which TensorBoard '
+                    'persists snapshots of the data it has loaded, so that on '
+                    'restart it only needs to read events written since the '
+                    'last snapshot.')
+
 # Inspect Mode flags
 
 flags.DEFINE_boolean('inspect', False, """Use this flag to print out a digest
@@ -110,7 +124,10 @@ def create_tb_app(plugins):
       logdir=logdir,
       purge_orphaned_data=FLAGS.purge_orphaned_data,
       reload_interval=FLAGS.reload_interval,
-      plugins=plugins)
+      plugins=plugins,
+      max_reload_threads=FLAGS.max_reload_threads,
+      reload_timeout=FLAGS.reload_timeout or None,
+      cache_dir=os.path.expanduser(FLAGS.cache_dir) or None)
 
 
 def make_simple_server(tb_app, host, port):